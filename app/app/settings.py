@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
 import os
+from importlib.util import find_spec
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -49,6 +50,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "core.middleware.PrimaryStickinessMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -88,9 +90,47 @@ DATABASES = {
         "NAME": os.environ.get("DB_NAME"),
         "USER": os.environ.get("DB_USER"),
         "PASSWORD": os.environ.get("DB_PASSWORD"),
+        # Keep connections open between requests and check them before reuse
+        "CONN_MAX_AGE": int(os.environ.get("DB_CONN_MAX_AGE", 60)),
+        "CONN_HEALTH_CHECKS": (
+            os.environ.get("DB_CONN_HEALTH_CHECKS", "true").lower() == "true"
+        ),
     }
 }
 
+# Per-process pool of connections for ASGI and threaded servers, where
+# connections per thread can exhaust max_connections of the database.
+# Connections are returned to the pool at the end of each request
+if os.environ.get("DB_POOL_MAX_SIZE"):
+    DATABASES["default"].update(
+        {
+            "ENGINE": "core.db.backends.pooled_postgresql",
+            "CONN_MAX_AGE": 0,
+            "POOL": {
+                "MAX_SIZE": int(os.environ["DB_POOL_MAX_SIZE"]),
+                "TIMEOUT": float(os.environ.get("DB_POOL_TIMEOUT", 30)),
+                "MAX_LIFETIME": float(os.environ.get("DB_POOL_MAX_LIFETIME", 3600)),
+            },
+        }
+    )
+
+# Read replicas given as comma separated hosts. Reads go to a random
+# replica, while writes, transactions and requests which have just written
+# (for DB_PRIMARY_STICKY_SECONDS) use the primary
+DATABASE_REPLICAS = []
+for index, host in enumerate(os.environ.get("DB_REPLICA_HOSTS", "").split(",")):
+    if host.strip():
+        alias = f"replica{index + 1}"
+        DATABASES[alias] = {
+            **DATABASES["default"],
+            "HOST": host.strip(),
+            "TEST": {"MIRROR": "default"},
+        }
+        DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ["core.db.routers.PrimaryReplicaRouter"]
+DB_PRIMARY_STICKY_SECONDS = int(os.environ.get("DB_PRIMARY_STICKY_SECONDS", 5))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -138,15 +178,125 @@ MEDIA_ROOT = "/vol/web/media"
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
-    "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_SCHEMA_CLASS": "core.schema.AutoSchema",
     # Configure pagination
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.LimitOffsetPagination",
+    "DEFAULT_PAGINATION_CLASS": "core.pagination.EstimatedCountPagination",
     "PAGE_SIZE": 100,
+    # JSON is encoded and decoded with orjson when it's installed
+    "DEFAULT_RENDERER_CLASSES": [
+        "core.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "core.parsers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
+    # Login and registration are limited per client IP and per email
+    "DEFAULT_THROTTLE_RATES": {
+        "login_ip": os.environ.get("LOGIN_IP_RATE", "30/min"),
+        "login_email": os.environ.get("LOGIN_EMAIL_RATE", "5/min"),
+        "register_ip": os.environ.get("REGISTER_IP_RATE", "10/hour"),
+        "register_email": os.environ.get("REGISTER_EMAIL_RATE", "3/hour"),
+    },
 }
 
+# MessagePack is negotiated by "Accept: application/msgpack" when it's installed
+if find_spec("msgpack"):
+    REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"].append(
+        "core.renderers.MessagePackRenderer"
+    )
+    REST_FRAMEWORK["DEFAULT_PARSER_CLASSES"].append("core.parsers.MessagePackParser")
+
 SPECTACULAR_SETTINGS = {
     # This lets to use file input in swagger
     "COMPONENT_SPLIT_REQUEST": True,
 }
 
+# Unfiltered lists of tables with more rows than the threshold take estimated
+# row count, others count rows up to the cap past the offset
+PAGINATION_COUNT = {
+    "ESTIMATE_THRESHOLD": int(os.environ.get("PAGINATION_ESTIMATE_THRESHOLD", 100_000)),
+    "CAP": int(os.environ.get("PAGINATION_COUNT_CAP", 10_000)),
+}
+
+# Max number of sub-requests of the batch request and of threads
+# serving GET sub-requests concurrently
+BATCH_API = {
+    "MAX_REQUESTS": int(os.environ.get("BATCH_API_MAX_REQUESTS", 20)),
+    "MAX_WORKERS": int(os.environ.get("BATCH_API_MAX_WORKERS", 4)),
+}
+
+# Schema and swagger views are imported only when docs are enabled
+API_DOCS_ENABLED = os.environ.get("API_DOCS_ENABLED", "true").lower() == "true"
+
 AUTH_USER_MODEL = "user.User"
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+# Use redis when it's configured, otherwise local memory (e.g. for tests)
+if os.environ.get("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ.get("REDIS_URL"),
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# Serialized products and categories for detail reads
+OBJECT_CACHE = {
+    "CACHE_ALIAS": "default",
+    "TIMEOUT": int(os.environ.get("OBJECT_CACHE_TIMEOUT", 60 * 60)),
+}
+
+# Serve product list from JSON cards pre-rendered on product writes
+PRODUCT_CARDS_ENABLED = (
+    os.environ.get("PRODUCT_CARDS_ENABLED", "true").lower() == "true"
+)
+
+# Number of the most recent reviews on the product page
+PRODUCT_PAGE_REVIEWS = int(os.environ.get("PRODUCT_PAGE_REVIEWS", 5))
+
+# Guest (anonymous) carts are kept in the fast key-value storage
+# and are merged into the user's cart on login
+GUEST_CART_STORAGE = "user.cart_storage.CacheCartStorage"
+GUEST_CART_CACHE = "default"
+GUEST_CART_TIMEOUT = 60 * 60 * 24 * 14
+
+# Token authentication keeps recently authenticated users in the per-process
+# LRU to skip token and user queries. Snapshots are dropped when the token or
+# the user changes, but only in the process making the change. Set cache alias
+# when running several processes, so that they share one set of snapshots
+AUTH_TOKEN_CACHE = {
+    "MAX_SIZE": int(os.environ.get("AUTH_TOKEN_CACHE_MAX_SIZE", 10000)),
+    "TTL": int(os.environ.get("AUTH_TOKEN_CACHE_TTL", 60)),
+    "CACHE_ALIAS": os.environ.get("AUTH_TOKEN_CACHE_ALIAS"),
+}
+
+# "opaque" mode issues db tokens. "stateless" mode issues short-lived signed
+# access tokens, checked with no db query, along with db-backed refresh tokens.
+# Revoked access tokens are kept in the deny list cache until they expire
+AUTH_TOKEN_MODE = os.environ.get("AUTH_TOKEN_MODE", "opaque")
+SIGNED_TOKEN = {
+    "ACCESS_TTL": int(os.environ.get("ACCESS_TOKEN_TTL", 60 * 5)),
+    "REFRESH_TTL": int(os.environ.get("REFRESH_TOKEN_TTL", 60 * 60 * 24 * 30)),
+    "DENY_LIST_CACHE": "default",
+}
+
+# Password hashing runs in the bounded thread pool so slow hashers
+# don't block async views. Size it to the number of cores for hashing
+PASSWORD_HASHING_WORKERS = int(os.environ.get("PASSWORD_HASHING_WORKERS", 4))
+
+# Budget of the cold start imports checked by "check_import_time" command
+IMPORT_TIME_BUDGET_MS = int(os.environ.get("IMPORT_TIME_BUDGET_MS", 1500))
+
+# Serve hot read endpoints (products, categories, reviews) with async ORM.
+# Turn on when running under ASGI, under WSGI async views only add overhead
+ASYNC_READ_VIEWS = os.environ.get("ASYNC_READ_VIEWS", "false").lower() == "true"
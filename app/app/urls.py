@@ -19,17 +19,27 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
+from core.views import BatchAPIView, healthz, readyz
 
 urlpatterns = [
     path("admin/", admin.site.urls),
-    path("api/schema/", SpectacularAPIView.as_view(), name="api-schema"),
-    path("api/docs/", SpectacularSwaggerView.as_view(url_name="api-schema")),
+    path("healthz/", healthz, name="healthz"),
+    path("readyz/", readyz, name="readyz"),
     path("api/auth/", include("authentication.urls")),
     path("api/user/", include("user.urls")),
     path("api/product/", include("product.urls")),
+    path("api/batch/", BatchAPIView.as_view(), name="batch"),
 ]
 
+# Schema generation machinery is heavy, so it's not loaded when docs are off
+if settings.API_DOCS_ENABLED:
+    from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
+
+    urlpatterns += [
+        path("api/schema/", SpectacularAPIView.as_view(), name="api-schema"),
+        path("api/docs/", SpectacularSwaggerView.as_view(url_name="api-schema")),
+    ]
+
 # Add url to serve media files when debug mode
 if settings.DEBUG:
     urlpatterns += static(
@@ -0,0 +1,185 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models.fields.files import FieldFile
+from django.contrib.auth import get_user_model
+from rest_framework.authentication import (
+    BaseAuthentication,
+    TokenAuthentication,
+    get_authorization_header,
+)
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+from .tokens import read_access_token
+
+
+class TokenUserCache:
+    """
+    Bounded per-process LRU of token key -> user snapshot with TTL.
+    With cache alias snapshots are kept in the shared cache instead, so
+    that revoking them in one process takes effect in all of them.
+    Snapshots have no password hash, it's loaded from db on access
+    """
+
+    key_prefix = "auth-token"
+
+    def __init__(self, max_size, ttl, cache_alias=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.cache_alias = cache_alias
+        self._entries = OrderedDict()
+        self._user_keys = {}
+        self._lock = threading.Lock()
+
+    @property
+    def shared_cache(self):
+        return caches[self.cache_alias] if self.cache_alias else None
+
+    def get(self, key):
+        """Return cached user of the token or None"""
+        if self.shared_cache is not None:
+            return self.shared_cache.get(f"{self.key_prefix}:{key}")
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, user = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                return user
+            self._pop(key)
+        return None
+
+    def set(self, key, user):
+        user = self._make_snapshot(user)
+        if self.shared_cache is None:
+            self._set_local(key, user)
+            return
+        self.shared_cache.set_many(
+            {
+                f"{self.key_prefix}:{key}": user,
+                f"{self.key_prefix}-user:{user.pk}": key,
+            },
+            self.ttl,
+        )
+
+    def invalidate(self, key):
+        """Drop the snapshot of the token"""
+        with self._lock:
+            self._pop(key)
+        if self.shared_cache is not None:
+            self.shared_cache.delete(f"{self.key_prefix}:{key}")
+
+    def invalidate_user(self, user_id):
+        """Drop the snapshot of the user's token"""
+        with self._lock:
+            key = self._user_keys.get(user_id)
+            if key is not None:
+                self._pop(key)
+
+        if self.shared_cache is not None:
+            shared_key = self.shared_cache.get(f"{self.key_prefix}-user:{user_id}")
+            self.shared_cache.delete_many(
+                [
+                    f"{self.key_prefix}:{key}",
+                    f"{self.key_prefix}:{shared_key}",
+                    f"{self.key_prefix}-user:{user_id}",
+                ]
+            )
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._user_keys.clear()
+
+    @staticmethod
+    def _make_snapshot(user):
+        """Return copy of the user with deferred password"""
+        names = []
+        values = []
+        for field in user._meta.concrete_fields:
+            if field.attname == "password":
+                continue
+            value = getattr(user, field.attname)
+            # Files refer to the instance, they are copied by name
+            if isinstance(value, FieldFile):
+                value = value.name
+            names.append(field.attname)
+            values.append(value)
+        return type(user).from_db(user._state.db, names, values)
+
+    def _set_local(self, key, user):
+        with self._lock:
+            self._pop(key)
+            self._entries[key] = (time.monotonic() + self.ttl, user)
+            self._user_keys[user.pk] = key
+            # Evict least recently used snapshots
+            while len(self._entries) > self.max_size:
+                self._pop(next(iter(self._entries)))
+
+    def _pop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None and self._user_keys.get(entry[1].pk) == key:
+            del self._user_keys[entry[1].pk]
+
+
+token_user_cache = TokenUserCache(
+    max_size=settings.AUTH_TOKEN_CACHE["MAX_SIZE"],
+    ttl=settings.AUTH_TOKEN_CACHE["TTL"],
+    cache_alias=settings.AUTH_TOKEN_CACHE["CACHE_ALIAS"],
+)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Drop-in TokenAuthentication which keeps recently authenticated users
+    in the cache, so the common case needs no token and user query.
+    Snapshots are invalidated by signals when token or user changes
+    """
+
+    def authenticate_credentials(self, key):
+        user = token_user_cache.get(key)
+        if user is None:
+            user, token = super().authenticate_credentials(key)
+            token_user_cache.set(key, user)
+            return (user, token)
+
+        # Give each request its own copy since views may modify request.user
+        user = copy.copy(user)
+        return (user, Token(key=key, user=user))
+
+
+class SignedTokenAuthentication(BaseAuthentication):
+    """
+    Authenticate by signed access token ("Bearer <token>") with no db query.
+    request.user gets only id and staff flag from the token, the rest of
+    fields are deferred and loaded from db on access
+    """
+
+    keyword = "Bearer"
+
+    def authenticate(self, request):
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) != 2:
+            raise AuthenticationFailed("Invalid token header.")
+
+        payload = read_access_token(auth[1].decode(errors="ignore"))
+        if payload is None:
+            raise AuthenticationFailed("Invalid or expired token.")
+
+        user = get_user_model().from_db(
+            DEFAULT_DB_ALIAS,
+            ["id", "is_staff"],
+            [payload["uid"], payload["staff"]],
+        )
+        return (user, payload)
+
+    def authenticate_header(self, request):
+        return self.keyword
@@ -0,0 +1,72 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import authenticate, get_user_model
+from django.contrib.auth.hashers import check_password, make_password
+from django.contrib.auth.signals import user_login_failed
+
+MODEL_BACKEND = "django.contrib.auth.backends.ModelBackend"
+
+# Bounded pool so hashing bursts can't take more than its workers
+hashing_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASHING_WORKERS,
+    thread_name_prefix="password-hashing",
+)
+
+
+async def run_hashing(func, *args):
+    """Run password hashing function in the pool off the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(hashing_executor, partial(func, *args))
+
+
+async def amake_password(password):
+    return await run_hashing(make_password, password)
+
+
+async def aauthenticate(request, email, password):
+    """
+    Return the user with given credentials or None. With the default
+    ModelBackend only the password check runs in the hashing pool, db is
+    queried from the async context. Other backends run by authenticate()
+    """
+    if settings.AUTHENTICATION_BACKENDS != [MODEL_BACKEND]:
+        return await sync_to_async(authenticate)(
+            request, email=email, password=password
+        )
+
+    user = await _aauthenticate(email, password)
+    if user is None:
+        # As authenticate() does, with no password in the credentials
+        await sync_to_async(user_login_failed.send)(
+            sender=__name__, credentials={"email": email}, request=request
+        )
+    return user
+
+
+async def _aauthenticate(email, password):
+    UserModel = get_user_model()
+    try:
+        user = await UserModel._default_manager.aget(
+            **{UserModel.USERNAME_FIELD: email},
+        )
+    except UserModel.DoesNotExist:
+        # Run the hasher anyway to reduce the timing difference
+        # between existing and nonexistent users (as ModelBackend does)
+        await amake_password(password)
+        return None
+
+    outdated = []
+    is_correct = await run_hashing(
+        check_password, password, user.password, outdated.append
+    )
+    if not (is_correct and user.is_active):
+        return None
+
+    # Upgrade hash of the outdated hasher, as User.check_password() does
+    if outdated:
+        await run_hashing(user.set_password, password)
+        await user.asave(update_fields=["password"])
+    return user
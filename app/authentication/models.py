@@ -0,0 +1,22 @@
+import binascii
+import os
+from django.db import models
+from django.contrib.auth import get_user_model
+
+
+def generate_refresh_token_key():
+    return binascii.hexlify(os.urandom(20)).decode()
+
+
+class RefreshToken(models.Model):
+    """Long-lived token to obtain new signed access tokens"""
+
+    key = models.CharField(
+        max_length=40,
+        unique=True,
+        default=generate_refresh_token_key,
+    )
+    user = models.ForeignKey(to=get_user_model(), on_delete=models.CASCADE)
+    expires_at = models.DateTimeField()
+
+    created_at = models.DateTimeField(auto_now_add=True)
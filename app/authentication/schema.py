@@ -0,0 +1,11 @@
+from drf_spectacular.extensions import OpenApiAuthenticationExtension
+
+
+class SignedTokenScheme(OpenApiAuthenticationExtension):
+    """Describe signed access token authentication in api docs"""
+
+    target_class = "authentication.backends.SignedTokenAuthentication"
+    name = "signedTokenAuth"
+
+    def get_security_definition(self, auto_schema):
+        return {"type": "http", "scheme": "bearer"}
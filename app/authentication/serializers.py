@@ -1,16 +1,29 @@
+from django.utils import timezone
 from rest_framework import serializers
-from rest_framework.authentication import authenticate
+from .models import RefreshToken
 
 
 class AuthTokenSeralizer(serializers.Serializer):
+    """Login credentials. They are checked by the view off the event loop"""
+
     email = serializers.EmailField()
     password = serializers.CharField(trim_whitespace=False)
 
+
+class RefreshTokenSerializer(serializers.Serializer):
+    refresh = serializers.CharField()
+
     def validate(self, attrs):
-        email = attrs.get("email")
-        password = attrs.get("password")
-        user = authenticate(username=email, password=password)
-        if not user:
-            raise serializers.ValidationError("Incorrect credentials!")
-        attrs["user"] = user
+        refresh_token = (
+            RefreshToken.objects.select_related("user")
+            .filter(key=attrs.get("refresh"), expires_at__gt=timezone.now())
+            .first()
+        )
+        if not refresh_token:
+            raise serializers.ValidationError("Invalid or expired refresh token!")
+        attrs["refresh_token"] = refresh_token
         return attrs
+
+
+class RevokeTokenSerializer(serializers.Serializer):
+    refresh = serializers.CharField(required=False)
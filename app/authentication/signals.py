@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.dispatch import receiver
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save, post_delete
+from rest_framework.authtoken.models import Token
+from .backends import token_user_cache
+from .tokens import deny_user_access_tokens
+
+
+# Drop cached user of the deleted token
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    token_user_cache.invalidate(instance.key)
+
+
+# Drop cached user whenever it's changed (e.g. is_active or is_staff),
+# since views may output request.user as it is
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def invalidate_changed_user(sender, instance, **kwargs):
+    token_user_cache.invalidate_user(instance.pk)
+
+
+# Revoke signed access tokens carrying outdated staff flag. Stored flag is
+# the one loaded along with the user, so no query is needed
+@receiver(post_save, sender=get_user_model())
+def deny_outdated_access_tokens(sender, instance, created, **kwargs):
+    if created or settings.AUTH_TOKEN_MODE != "stateless":
+        return
+    if instance.has_changed("is_staff"):
+        deny_user_access_tokens(instance.pk)
+
+
+# Revoke signed access tokens of the deleted user
+@receiver(post_delete, sender=get_user_model())
+def deny_deleted_user_access_tokens(sender, instance, **kwargs):
+    deny_user_access_tokens(instance.pk)
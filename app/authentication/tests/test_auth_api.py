@@ -1,6 +1,10 @@
-from django.test import TestCase
+from unittest.mock import patch
+from django.test import TestCase, override_settings
+from django.core.cache import cache
 from django.urls import reverse
-from django.contrib.auth import get_user_model
+from django.contrib.auth import authenticate, get_user_model
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.signals import user_login_failed
 from rest_framework import status
 from rest_framework.test import APIClient
 from user.serializers import UserRegisterSerializer
@@ -15,6 +19,7 @@ class AuthAPITests(TestCase):
 
     # Set test environment
     def setUp(self):
+        cache.clear()
         # Client to simulate requests
         self.client = APIClient()
 
@@ -84,3 +89,115 @@ class AuthAPITests(TestCase):
 
         self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertNotIn("token", res.data)
+
+    def test_wrong_credentials_signal(self):
+        """Test failed login is signaled with no password"""
+        create_user(email="test@example.com", password="testpass")
+        failed = []
+
+        def receiver(sender, credentials, **kwargs):
+            failed.append(credentials)
+
+        user_login_failed.connect(receiver)
+        self.addCleanup(user_login_failed.disconnect, receiver)
+        self.client.post(
+            CREATE_TOKEN_URL, {"email": "test@example.com", "password": "wrong"}
+        )
+
+        self.assertEqual(failed, [{"email": "test@example.com"}])
+
+    def test_outdated_password_hash_upgraded(self):
+        """Test password hashed by outdated hasher is re-hashed on login"""
+        user = create_user(email="test@example.com")
+        user.password = make_password("testpass", hasher="pbkdf2_sha1")
+        user.save()
+
+        res = self.client.post(
+            CREATE_TOKEN_URL, {"email": "test@example.com", "password": "testpass"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith("pbkdf2_sha256$"))
+        self.assertTrue(user.check_password("testpass"))
+
+    @override_settings(
+        AUTHENTICATION_BACKENDS=[
+            "django.contrib.auth.backends.ModelBackend",
+            "django.contrib.auth.backends.RemoteUserBackend",
+        ]
+    )
+    def test_custom_authentication_backends(self):
+        """Test configured backends authenticate the user"""
+        credentials = {"email": "test@example.com", "password": "testpass"}
+        create_user(**credentials)
+
+        with patch(
+            "authentication.hashers.authenticate", wraps=authenticate
+        ) as mock_authenticate:
+            res = self.client.post(CREATE_TOKEN_URL, credentials)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        mock_authenticate.assert_called_once()
+
+
+class AuthThrottlingTests(TestCase):
+    """Test limits of login and registration attempts"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user_credentials = {
+            "email": "test@example.com",
+            "password": "testpass",
+        }
+        create_user(**self.user_credentials)
+
+    def test_login_throttled_per_email(self):
+        """Test failed logins for one email are limited regardless of IP"""
+        wrong_credentials = {"email": "Test@example.com", "password": "wrongpass"}
+        for i in range(5):
+            res = self.client.post(
+                CREATE_TOKEN_URL, wrong_credentials, REMOTE_ADDR=f"10.0.0.{i}"
+            )
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.client.post(CREATE_TOKEN_URL, self.user_credentials)
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertNotIn("token", res.data)
+
+    def test_throttled_login_skips_hashing(self):
+        """Test password is not checked once the limit is reached"""
+        for _ in range(5):
+            self.client.post(CREATE_TOKEN_URL, self.user_credentials)
+
+        with patch("authentication.hashers.check_password") as check_password:
+            res = self.client.post(CREATE_TOKEN_URL, self.user_credentials)
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        check_password.assert_not_called()
+
+    def test_login_of_other_email_not_throttled(self):
+        """Test limit of one email doesn't affect others"""
+        for _ in range(5):
+            self.client.post(CREATE_TOKEN_URL, self.user_credentials)
+        other_credentials = {"email": "other@example.com", "password": "testpass"}
+        create_user(**other_credentials)
+
+        res = self.client.post(CREATE_TOKEN_URL, other_credentials)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn("token", res.data)
+
+    def test_register_throttled_per_email(self):
+        """Test registration attempts for one email are limited"""
+        payload = {"email": "new@example.com", "password": "12"}
+        for _ in range(3):
+            self.client.post(CREATE_USER_URL, payload)
+
+        with patch("authentication.views.amake_password") as amake_password:
+            res = self.client.post(CREATE_USER_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        amake_password.assert_not_called()
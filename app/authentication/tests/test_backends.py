@@ -0,0 +1,128 @@
+import pickle
+from unittest.mock import patch
+from django.test import TestCase, SimpleTestCase
+from django.contrib.auth import get_user_model
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+from authentication.backends import (
+    CachedTokenAuthentication,
+    TokenUserCache,
+    token_user_cache,
+)
+from user.tests.test_models import create_user
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    """Test token authentication with cached users"""
+
+    def setUp(self):
+        token_user_cache.clear()
+        self.user = create_user(password="testpass")
+        self.token = Token.objects.create(user=self.user)
+        self.auth = CachedTokenAuthentication()
+
+    def test_cached_user_needs_no_query(self):
+        """Test repeated authentication doesn't hit the db"""
+        with self.assertNumQueries(1):
+            user, _ = self.auth.authenticate_credentials(self.token.key)
+        with self.assertNumQueries(0):
+            cached_user, token = self.auth.authenticate_credentials(self.token.key)
+
+        self.assertEqual(cached_user, user)
+        self.assertEqual(token.key, self.token.key)
+        # Ensure each request gets its own user object
+        self.assertIsNot(cached_user, user)
+
+    def test_cached_user_has_no_password(self):
+        """Test password hash isn't kept in the snapshot"""
+        self.auth.authenticate_credentials(self.token.key)
+        cached_user = token_user_cache.get(self.token.key)
+
+        self.assertIn("password", cached_user.get_deferred_fields())
+        self.assertNotIn(
+            self.user.password, pickle.dumps(cached_user).decode("latin-1")
+        )
+        # Password is loaded on access
+        self.assertTrue(cached_user.check_password("testpass"))
+
+    def test_invalid_token_error(self):
+        """Test unknown token isn't authenticated"""
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.authenticate_credentials("wrong-key")
+
+    def test_deleted_token_invalidated(self):
+        """Test deleted token is no longer authenticated"""
+        self.auth.authenticate_credentials(self.token.key)
+        self.token.delete()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.authenticate_credentials(self.token.key)
+
+    def test_changed_user_invalidated(self):
+        """Test saving user drops its cached snapshot"""
+        self.auth.authenticate_credentials(self.token.key)
+        self.user.name = "new name"
+        self.user.save()
+
+        with self.assertNumQueries(1):
+            user, _ = self.auth.authenticate_credentials(self.token.key)
+        self.assertEqual(user.name, "new name")
+
+    def test_deleted_user_invalidated(self):
+        """Test deleted user is no longer authenticated"""
+        self.auth.authenticate_credentials(self.token.key)
+        self.user.delete()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.authenticate_credentials(self.token.key)
+
+    def test_staff_change_invalidated(self):
+        """Test changing staff flag refreshes the cached user"""
+        self.auth.authenticate_credentials(self.token.key)
+        self.user.is_staff = True
+        self.user.save()
+
+        user, _ = self.auth.authenticate_credentials(self.token.key)
+
+        self.assertTrue(user.is_staff)
+
+
+class TokenUserCacheTests(SimpleTestCase):
+    """Test token user cache bounds"""
+
+    def setUp(self):
+        self.users = [get_user_model()(id=i) for i in range(3)]
+
+    def test_lru_eviction(self):
+        """Test least recently used snapshot is evicted"""
+        cache = TokenUserCache(max_size=2, ttl=60)
+        cache.set("a", self.users[0])
+        cache.set("b", self.users[1])
+        cache.get("a")
+        cache.set("c", self.users[2])
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), self.users[0])
+        self.assertEqual(cache.get("c"), self.users[2])
+
+    @patch("authentication.backends.time.monotonic")
+    def test_ttl_expiration(self, mock_monotonic):
+        """Test snapshot expires after ttl"""
+        cache = TokenUserCache(max_size=2, ttl=60)
+        mock_monotonic.return_value = 100
+        cache.set("a", self.users[0])
+
+        mock_monotonic.return_value = 159
+        self.assertEqual(cache.get("a"), self.users[0])
+        mock_monotonic.return_value = 161
+        self.assertIsNone(cache.get("a"))
+
+    def test_shared_cache(self):
+        """Test snapshots are shared between processes via cache"""
+        cache = TokenUserCache(max_size=2, ttl=60, cache_alias="default")
+        other_process_cache = TokenUserCache(max_size=2, ttl=60, cache_alias="default")
+        cache.set("a", self.users[0])
+
+        self.assertEqual(other_process_cache.get("a"), self.users[0])
+        other_process_cache.invalidate_user(self.users[0].pk)
+        self.assertIsNone(cache.get("a"))
@@ -0,0 +1,176 @@
+from unittest.mock import patch
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework.exceptions import AuthenticationFailed
+from authentication.backends import SignedTokenAuthentication
+from authentication.models import RefreshToken
+from authentication.serializers import RefreshTokenSerializer
+from authentication.tokens import make_access_token
+from user.serializers import UserSerializer
+from user.tests.test_models import create_address, create_user
+
+CREATE_TOKEN_URL = reverse("authentication:token")
+REFRESH_TOKEN_URL = reverse("authentication:token-refresh")
+REVOKE_TOKEN_URL = reverse("authentication:token-revoke")
+ME_URL = reverse("user:me")
+WISH_ITEM_LIST_URL = reverse("user:wishitem-list")
+
+
+@override_settings(AUTH_TOKEN_MODE="stateless")
+class SignedTokenAPITests(TestCase):
+    """Test stateless signed access tokens"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.credentials = {"email": "test@example.com", "password": "testpass"}
+        self.user = create_user(name="testname", **self.credentials)
+
+    def _obtain_tokens(self):
+        res = self.client.post(CREATE_TOKEN_URL, self.credentials)
+        return res.data["access"], res.data["refresh"]
+
+    def test_obtain_tokens(self):
+        """Test stateless mode issues access and refresh tokens"""
+        res = self.client.post(CREATE_TOKEN_URL, self.credentials)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn("access", res.data)
+        self.assertNotIn("token", res.data)
+        refresh_token = RefreshToken.objects.get(key=res.data["refresh"])
+        self.assertEqual(refresh_token.user, self.user)
+
+    def test_authenticate_without_queries(self):
+        """Test access token is checked with no db query"""
+        access = make_access_token(self.user)
+        request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {access}")
+
+        with self.assertNumQueries(0):
+            user, payload = SignedTokenAuthentication().authenticate(request)
+
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertFalse(user.is_staff)
+        self.assertEqual(payload["uid"], self.user.pk)
+
+    def test_request_with_access_token(self):
+        """Test access token authenticates API requests"""
+        access, _ = self._obtain_tokens()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        # Ensure all user fields are loaded
+        self.assertEqual(res.data["email"], self.user.email)
+        self.assertEqual(res.data["name"], self.user.name)
+
+    def test_profile_loaded_by_one_query(self):
+        """Test profile of user authenticated by access token takes one query"""
+        self.user.address = create_address()
+        self.user.save()
+        access = make_access_token(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+
+        with self.assertNumQueries(1):
+            res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, UserSerializer(self.user).data)
+
+    def test_tampered_token_error(self):
+        """Test token with broken signature is rejected"""
+        access, _ = self._obtain_tokens()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}x")
+
+        res = self.client.get(WISH_ITEM_LIST_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @patch("authentication.tokens.time.time")
+    def test_expired_token_error(self, mock_time):
+        """Test access token expires after ttl"""
+        mock_time.return_value = 1000
+        access = make_access_token(self.user)
+        request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {access}")
+
+        mock_time.return_value = 1000 + 60 * 5
+        with self.assertRaises(AuthenticationFailed):
+            SignedTokenAuthentication().authenticate(request)
+
+    def test_refresh_token(self):
+        """Test refresh token gives new tokens and can be used only once"""
+        _, refresh = self._obtain_tokens()
+
+        res = self.client.post(REFRESH_TOKEN_URL, {"refresh": refresh})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn("access", res.data)
+        self.assertNotEqual(res.data["refresh"], refresh)
+        res = self.client.post(REFRESH_TOKEN_URL, {"refresh": refresh})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_refresh_token_used_concurrently(self):
+        """Test token used by concurrent request after validation is rejected"""
+        _, refresh = self._obtain_tokens()
+        validate = RefreshTokenSerializer.validate
+
+        # Other request rotates the token right after this one validated it
+        def validate_and_use(serializer, attrs):
+            attrs = validate(serializer, attrs)
+            RefreshToken.objects.filter(key=refresh).delete()
+            return attrs
+
+        with patch.object(RefreshTokenSerializer, "validate", validate_and_use):
+            res = self.client.post(REFRESH_TOKEN_URL, {"refresh": refresh})
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(RefreshToken.objects.filter(user=self.user).count(), 0)
+
+    def test_revoke_token(self):
+        """Test revoked access and refresh tokens no longer work"""
+        access, refresh = self._obtain_tokens()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+
+        res = self.client.post(REVOKE_TOKEN_URL, {"refresh": refresh})
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        res = self.client.get(WISH_ITEM_LIST_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertFalse(RefreshToken.objects.filter(key=refresh).exists())
+
+    def test_staff_change_revokes_tokens(self):
+        """Test access tokens carrying outdated staff flag are revoked"""
+        access, _ = self._obtain_tokens()
+        self.user.is_staff = True
+        self.user.save()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+
+        res = self.client.get(WISH_ITEM_LIST_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        # Ensure new access token carries the new flag
+        new_access = make_access_token(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {new_access}")
+        res = self.client.get(WISH_ITEM_LIST_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_staff_flag_checked_with_no_query(self):
+        """Test saving user compares staff flag loaded along with it"""
+        access, _ = self._obtain_tokens()
+        user = get_user_model().objects.get(pk=self.user.pk)
+        user.surname = "new surname"
+        with self.assertNumQueries(1):
+            user.save(update_fields=["surname"])
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+        res = self.client.get(WISH_ITEM_LIST_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        user.is_staff = True
+        user.save()
+        res = self.client.get(WISH_ITEM_LIST_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
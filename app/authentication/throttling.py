@@ -0,0 +1,43 @@
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class IPRateThrottle(SimpleRateThrottle):
+    """
+    Limit requests per client IP. History of request times is kept
+    in the cache, so the limit applies to the sliding window
+    """
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {
+            "scope": self.scope,
+            "ident": self.get_ident(request),
+        }
+
+
+class EmailRateThrottle(SimpleRateThrottle):
+    """Limit requests per email given in the request data within sliding window"""
+
+    def get_cache_key(self, request, view):
+        email = request.data.get("email") if hasattr(request.data, "get") else None
+        if not email or not isinstance(email, str):
+            return None
+        return self.cache_format % {
+            "scope": self.scope,
+            "ident": email.strip().lower(),
+        }
+
+
+class LoginIPThrottle(IPRateThrottle):
+    scope = "login_ip"
+
+
+class LoginEmailThrottle(EmailRateThrottle):
+    scope = "login_email"
+
+
+class RegisterIPThrottle(IPRateThrottle):
+    scope = "register_ip"
+
+
+class RegisterEmailThrottle(EmailRateThrottle):
+    scope = "register_email"
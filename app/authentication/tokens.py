@@ -0,0 +1,70 @@
+import time
+from datetime import timedelta
+from uuid import uuid4
+from django.conf import settings
+from django.core import signing
+from django.core.cache import caches
+from django.utils import timezone
+from .models import RefreshToken
+
+ACCESS_TOKEN_SALT = "authentication.access_token"
+
+
+def get_deny_list():
+    return caches[settings.SIGNED_TOKEN["DENY_LIST_CACHE"]]
+
+
+def make_access_token(user):
+    """Return signed access token carrying user id, staff flag and expiry"""
+    issued_at = time.time()
+    payload = {
+        "uid": user.pk,
+        "staff": user.is_staff,
+        "iat": issued_at,
+        "exp": int(issued_at) + settings.SIGNED_TOKEN["ACCESS_TTL"],
+        "jti": uuid4().hex,
+    }
+    return signing.dumps(payload, salt=ACCESS_TOKEN_SALT, compress=True)
+
+
+def read_access_token(token):
+    """Return payload of valid, unexpired and not revoked token or None"""
+    try:
+        payload = signing.loads(token, salt=ACCESS_TOKEN_SALT)
+    except signing.BadSignature:
+        return None
+
+    if payload["exp"] <= time.time():
+        return None
+
+    # Check both the token and all tokens of its user with one cache call
+    token_key = f"deny-token:{payload['jti']}"
+    user_key = f"deny-user:{payload['uid']}"
+    denied = get_deny_list().get_many([token_key, user_key])
+    if token_key in denied or denied.get(user_key, 0) >= payload["iat"]:
+        return None
+    return payload
+
+
+def issue_tokens(user):
+    """Return new access token and db-backed refresh token of the user"""
+    expires_at = timezone.now() + timedelta(
+        seconds=settings.SIGNED_TOKEN["REFRESH_TTL"],
+    )
+    refresh_token = RefreshToken.objects.create(user=user, expires_at=expires_at)
+    return {"access": make_access_token(user), "refresh": refresh_token.key}
+
+
+def deny_access_token(payload):
+    """Revoke the access token until it expires by itself"""
+    timeout = max(int(payload["exp"] - time.time()), 1)
+    get_deny_list().set(f"deny-token:{payload['jti']}", True, timeout)
+
+
+def deny_user_access_tokens(user_id):
+    """Revoke all access tokens of the user issued up to now"""
+    get_deny_list().set(
+        f"deny-user:{user_id}",
+        time.time(),
+        settings.SIGNED_TOKEN["ACCESS_TTL"],
+    )
@@ -1,16 +1,119 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from rest_framework import views
+from rest_framework import permissions
+from rest_framework import status
 from rest_framework.generics import CreateAPIView
+from rest_framework.authtoken.models import Token
 from rest_framework.authtoken.views import ObtainAuthToken
-from .serializers import AuthTokenSeralizer
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from .backends import SignedTokenAuthentication
+from .models import RefreshToken
+from .serializers import (
+    AuthTokenSeralizer,
+    RefreshTokenSerializer,
+    RevokeTokenSerializer,
+)
+from .hashers import aauthenticate, amake_password
+from .throttling import (
+    LoginEmailThrottle,
+    LoginIPThrottle,
+    RegisterEmailThrottle,
+    RegisterIPThrottle,
+)
+from .tokens import issue_tokens, deny_access_token
+from core.views import AsyncAPIViewMixin
 from user.serializers import UserRegisterSerializer
+from user.cart_storage import GUEST_CART_COOKIE, merge_guest_cart
 
 
-class RegisterUserView(CreateAPIView):
+class RegisterUserView(AsyncAPIViewMixin, CreateAPIView):
     """Manage user creation"""
 
     serializer_class = UserRegisterSerializer
+    throttle_classes = [RegisterIPThrottle, RegisterEmailThrottle]
 
+    async def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        await sync_to_async(serializer.is_valid)(raise_exception=True)
 
-class ObtainTokenView(ObtainAuthToken):
+        # Hash password in the bounded pool instead of the event loop
+        password_hash = await amake_password(serializer.validated_data["password"])
+        await sync_to_async(serializer.save)(password_hash=password_hash)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+class ObtainTokenView(AsyncAPIViewMixin, ObtainAuthToken):
     """Manage token creation and obtaining"""
 
     serializer_class = AuthTokenSeralizer
+    throttle_classes = [LoginIPThrottle, LoginEmailThrottle]
+
+    async def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        # Throttles have already run, so failed attempts over the limit
+        # never reach the hasher
+        user = await aauthenticate(request, **serializer.validated_data)
+        if not user:
+            raise ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: ["Incorrect credentials!"]}
+            )
+        return await sync_to_async(self.get_token_response)(request, user)
+
+    def get_token_response(self, request, user):
+        # Issue signed access and refresh tokens instead of opaque one
+        if settings.AUTH_TOKEN_MODE == "stateless":
+            response = Response(issue_tokens(user))
+        else:
+            token, created = Token.objects.get_or_create(user=user)
+            response = Response({"token": token.key})
+
+        # Move items added to cart before login into the user's cart
+        if merge_guest_cart(request, user):
+            response.delete_cookie(GUEST_CART_COOKIE)
+        return response
+
+
+class RefreshTokenView(views.APIView):
+    """Manage obtaining new access token by refresh token"""
+
+    authentication_classes = []
+    permission_classes = []
+    serializer_class = RefreshTokenSerializer
+
+    def post(self, request):
+        serializer = self.serializer_class(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        refresh_token = serializer.validated_data["refresh_token"]
+
+        # Rotate refresh token so that it can be used only once. Concurrent
+        # requests with the same token race for deleting it, one wins
+        deleted, _ = RefreshToken.objects.filter(pk=refresh_token.pk).delete()
+        if not deleted:
+            return Response(
+                {"detail": "Refresh token has already been used."},
+                status.HTTP_401_UNAUTHORIZED,
+            )
+        return Response(issue_tokens(refresh_token.user), status.HTTP_200_OK)
+
+
+class RevokeTokenView(views.APIView):
+    """Manage revoking signed access token along with refresh token"""
+
+    authentication_classes = [SignedTokenAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = RevokeTokenSerializer
+
+    def post(self, request):
+        serializer = self.serializer_class(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        deny_access_token(request.auth)
+        refresh_key = serializer.validated_data.get("refresh")
+        if refresh_key:
+            RefreshToken.objects.filter(user=request.user, key=refresh_key).delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,150 @@
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from contextvars import copy_context
+from io import BytesIO
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import connections
+from django.http import Http404, JsonResponse
+from django.urls import resolve
+from .db.routers import use_primary
+from .renderers import FastJSONRenderer
+
+# Headers of the batch request which don't apply to sub-requests
+SKIPPED_META = {"CONTENT_TYPE", "CONTENT_LENGTH", "QUERY_STRING", "wsgi.input"}
+
+
+def make_sub_request(request, method, path, body=None):
+    """
+    Return Django request of the sub-request with headers of the batch
+    request (cookies, client address) and its authenticated user
+    """
+    path, _, query_string = path.partition("?")
+    content = b"" if body is None else FastJSONRenderer().render(body)
+    environ = {
+        key: value for key, value in request.META.items() if key not in SKIPPED_META
+    }
+    environ.update(
+        {
+            "REQUEST_METHOD": method,
+            "PATH_INFO": path,
+            "SCRIPT_NAME": "",
+            "QUERY_STRING": query_string,
+            "CONTENT_TYPE": "application/json",
+            "CONTENT_LENGTH": str(len(content)),
+            "wsgi.input": BytesIO(content),
+            "wsgi.url_scheme": request.scheme,
+        }
+    )
+    sub_request = WSGIRequest(environ)
+    # DRF views take the user as authenticated, with no token lookup
+    if request.user.is_authenticated:
+        sub_request._force_auth_user = request.user
+        sub_request._force_auth_token = request.auth
+    return sub_request
+
+
+def dispatch_sub_request(sub_request):
+    """Return response of the view resolved for the sub-request path"""
+    try:
+        match = resolve(sub_request.path_info)
+        response = match.func(sub_request, *match.args, **match.kwargs)
+    except Http404:
+        return JsonResponse({"detail": "Not found."}, status=404)
+
+    # Async views return coroutine
+    if asyncio.iscoroutine(response):
+        response = async_to_sync(await_coroutine)(response)
+    return response
+
+
+async def await_coroutine(coroutine):
+    return await coroutine
+
+
+def get_response_body(response):
+    """Return data of the response to embed in the batch response"""
+    # Data of DRF responses is embedded as it is, with no rendering
+    if hasattr(response, "data"):
+        return response.data
+    if not response.content:
+        return None
+    if response.get("Content-Type", "").startswith("application/json"):
+        return json.loads(response.content)
+    return response.content.decode(response.charset)
+
+
+def run_batch(request, sub_requests, concurrent=False):
+    """
+    Serve sub-requests in order and return their responses. When concurrent,
+    runs of consecutive GET sub-requests are served by a thread pool.
+    Reads from the first write on go to the primary, so they see its changes
+    """
+    responses = []
+    reads = []
+
+    def flush_reads():
+        if len(reads) > 1 and concurrent:
+            responses.extend(serve_concurrently(request, reads))
+        else:
+            responses.extend(serve(request, sub_request) for sub_request in reads)
+        reads.clear()
+
+    with ExitStack() as stack:
+        pinned = False
+        for sub_request in sub_requests:
+            if sub_request["method"] == "GET":
+                reads.append(sub_request)
+                continue
+            # Writes are barriers, reads after them see their changes
+            flush_reads()
+            if not pinned:
+                stack.enter_context(use_primary())
+                pinned = True
+            responses.append(serve(request, sub_request))
+        flush_reads()
+    return responses
+
+
+def has_writes(sub_requests, responses):
+    """Return whether some of the write sub-requests succeeded"""
+    return any(
+        sub_request["method"] != "GET" and response.status_code < 400
+        for sub_request, response in zip(sub_requests, responses)
+    )
+
+
+def serve(request, sub_request):
+    return dispatch_sub_request(
+        make_sub_request(
+            request,
+            sub_request["method"],
+            sub_request["path"],
+            sub_request.get("body"),
+        ),
+    )
+
+
+def serve_concurrently(request, sub_requests):
+    """Serve sub-requests in threads with their own db connections"""
+
+    def serve_in_thread(sub_request):
+        try:
+            return serve(request, sub_request)
+        finally:
+            connections.close_all()
+
+    # Threads don't inherit context, e.g. reading from the primary
+    contexts = [copy_context() for _ in sub_requests]
+    max_workers = min(settings.BATCH_API["MAX_WORKERS"], len(sub_requests))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(
+            executor.map(
+                lambda context, sub_request: context.run(serve_in_thread, sub_request),
+                contexts,
+                sub_requests,
+            )
+        )
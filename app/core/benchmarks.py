@@ -0,0 +1,231 @@
+import asyncio
+import math
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from io import BytesIO
+from asgiref.sync import ThreadSensitiveContext, sync_to_async
+from django.db import close_old_connections, connections
+from django.test import override_settings
+from rest_framework.test import APIRequestFactory
+
+# Registry of benchmark suites run by "benchmark" command
+SUITES = {}
+
+
+def suite(name):
+    def decorator(func):
+        SUITES[name] = func
+        return func
+
+    return decorator
+
+
+def summarize(name, latencies, elapsed):
+    """Return report line of the benchmark case"""
+    latencies = sorted(latencies)
+    p95 = latencies[math.ceil(len(latencies) * 0.95) - 1]
+    return (
+        f"{name:<40} {len(latencies) / elapsed:10.1f} req/s"
+        f"  p50 {statistics.median(latencies) * 1000:8.2f} ms"
+        f"  p95 {p95 * 1000:8.2f} ms"
+    )
+
+
+@contextmanager
+def db_latency(seconds):
+    """Simulate network round trip to db for queries of every connection"""
+
+    def wrapper(execute, sql, params, many, context):
+        time.sleep(seconds)
+        return execute(sql, params, many, context)
+
+    if not seconds:
+        yield
+        return
+    # execute_wrapper() is per connection, so install it on connection creation
+    from django.db.backends.signals import connection_created
+
+    def install(sender, connection, **kwargs):
+        connection.execute_wrappers.append(wrapper)
+
+    connection_created.connect(install)
+    try:
+        yield
+    finally:
+        connection_created.disconnect(install)
+        for conn in connections.all():
+            if wrapper in conn.execute_wrappers:
+                conn.execute_wrappers.remove(wrapper)
+
+
+def run_sync(view, make_request, requests, workers):
+    """Serve requests by sync view in thread pool like threaded WSGI server"""
+
+    def serve(_):
+        started_at = time.perf_counter()
+        view(make_request()).render()
+        latency = time.perf_counter() - started_at
+        # Django does it when request finishes, so it respects CONN_MAX_AGE
+        close_old_connections()
+        return latency
+
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        latencies = list(executor.map(serve, range(requests)))
+        # Close connections opened by worker threads
+        list(executor.map(lambda _: connections.close_all(), range(workers)))
+    return latencies, time.perf_counter() - started_at
+
+
+def run_async(view, make_request, requests, concurrency):
+    """Serve requests by async view on single event loop like ASGI server"""
+
+    async def serve(semaphore):
+        async with semaphore:
+            # Each request gets its own thread for sync code as in ASGIHandler,
+            # so its db connection doesn't outlive the request
+            async with ThreadSensitiveContext():
+                started_at = time.perf_counter()
+                response = await view(make_request())
+                response.render()
+                latency = time.perf_counter() - started_at
+                await sync_to_async(close_old_connections)()
+                return latency
+
+    async def main():
+        semaphore = asyncio.Semaphore(concurrency)
+        return await asyncio.gather(*[serve(semaphore) for _ in range(requests)])
+
+    started_at = time.perf_counter()
+    latencies = asyncio.run(main())
+    return latencies, time.perf_counter() - started_at
+
+
+@suite("views")
+def views_suite(options):
+    """Compare sync and async read endpoints of products, categories, reviews"""
+    from product.models import Product
+    from product.views import CategoryViewSet, ProductViewSet, ReviewViewSet
+
+    product = Product.objects.order_by("id").first()
+    factory = APIRequestFactory()
+    cases = [
+        ("product list", ProductViewSet, "list", {}),
+        ("category list", CategoryViewSet, "list", {}),
+        ("review list", ReviewViewSet, "list", {}),
+    ]
+    if product is not None:
+        cases.append(("product detail", ProductViewSet, "retrieve", {"pk": product.pk}))
+
+    # Requests are built by the test factory for "testserver" host
+    with db_latency(options["db_latency"] / 1000), override_settings(
+        ALLOWED_HOSTS=["testserver"]
+    ):
+        for name, viewset, action, kwargs in cases:
+            for is_async in (False, True):
+                with override_settings(ASYNC_READ_VIEWS=is_async):
+                    view = partial(viewset.as_view({"get": action}), **kwargs)
+
+                run = run_async if is_async else run_sync
+                latencies, elapsed = run(
+                    view,
+                    lambda: factory.get("/"),
+                    options["requests"],
+                    options["concurrency"] if is_async else options["workers"],
+                )
+                mode = "async" if is_async else "sync"
+                yield summarize(f"{name} ({mode})", latencies, elapsed)
+
+
+@suite("serializers")
+def serializers_suite(options):
+    """Compare DRF and compiled serializers of list endpoints per row"""
+    from core.serializers import compile_serializer
+    from product.models import Category, Product, Review
+    from product.serializers import (
+        CategorySerializer,
+        ProductSerializer,
+        ReviewSerializer,
+    )
+
+    context = {"request": APIRequestFactory().get("/")}
+    cases = [
+        ("product", ProductSerializer, Product.objects.order_by("id")),
+        ("category", CategorySerializer, Category.objects.order_by("id")),
+        ("review", ReviewSerializer, Review.objects.order_by("id")),
+    ]
+    with override_settings(ALLOWED_HOSTS=["testserver"]):
+        for name, serializer_class, queryset in cases:
+            queryset = queryset[:100]
+            compiled = compile_serializer(serializer_class)
+            # Both read the same rows, so only serialization is compared
+            instances = list(queryset)
+            rows = list(queryset.values_list(*compiled.fields))
+            if not rows:
+                yield f"{name:<40} no rows"
+                continue
+
+            timings = []
+            for serialize in (
+                lambda: serializer_class(instances, many=True, context=context).data,
+                lambda: compiled.to_representation(rows, context),
+            ):
+                started_at = time.perf_counter()
+                for _ in range(options["requests"]):
+                    serialize()
+                elapsed = time.perf_counter() - started_at
+                timings.append(elapsed / options["requests"] / len(rows))
+
+            drf, fast = timings
+            yield (
+                f"{name + ' serializer':<40} drf {drf * 1e6:8.2f} us/row"
+                f"  compiled {fast * 1e6:8.2f} us/row  x{drf / fast:.1f}"
+            )
+
+
+@suite("renderers")
+def renderers_suite(options):
+    """Compare DRF and fast renderers and parsers on a 100 products page"""
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+    from core.parsers import FastJSONParser, MessagePackParser
+    from core.renderers import FastJSONRenderer, MessagePackRenderer, msgpack
+    from product.models import Product
+    from product.serializers import ProductSerializer
+
+    products = Product.objects.order_by("id")[:100]
+    with override_settings(ALLOWED_HOSTS=["testserver"]):
+        context = {"request": APIRequestFactory().get("/")}
+        results = ProductSerializer(products, many=True, context=context).data
+    data = {"count": len(results), "next": None, "previous": None}
+    data["results"] = results
+
+    cases = [
+        ("json (drf)", JSONRenderer(), JSONParser()),
+        ("json (fast)", FastJSONRenderer(), FastJSONParser()),
+    ]
+    if msgpack is not None:
+        cases.append(("msgpack", MessagePackRenderer(), MessagePackParser()))
+
+    baseline = None
+    for name, renderer, parser in cases:
+        content = renderer.render(data)
+        started_at = time.perf_counter()
+        for _ in range(options["requests"]):
+            renderer.render(data)
+        render_time = (time.perf_counter() - started_at) / options["requests"]
+
+        started_at = time.perf_counter()
+        for _ in range(options["requests"]):
+            parser.parse(BytesIO(content))
+        parse_time = (time.perf_counter() - started_at) / options["requests"]
+
+        baseline = baseline or render_time
+        yield (
+            f"{name + f' ({len(results)} products)':<40}"
+            f" render {render_time * 1e6:8.1f} us  x{baseline / render_time:.1f}"
+            f"  parse {parse_time * 1e6:8.1f} us  {len(content)} bytes"
+        )
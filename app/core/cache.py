@@ -0,0 +1,125 @@
+from uuid import uuid4
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+
+class ObjectCache:
+    """
+    Cache-aside storage of serialized model instances keyed by id and
+    version. Changing the object sets a new version, so representations
+    cached before are never read again and expire on their own.
+    Versions are set again on commit, so that readers of the data not yet
+    committed can't store stale data under the new version
+    """
+
+    # Fields holding relative URLs made absolute for the request on read
+    url_fields = []
+
+    def __init__(self, prefix, queryset, serializer_class):
+        self.prefix = prefix
+        self.queryset = queryset
+        self.serializer_class = serializer_class
+
+    @property
+    def cache(self):
+        return caches[settings.OBJECT_CACHE["CACHE_ALIAS"]]
+
+    def get(self, pk, request=None):
+        """Return representation of the object or None if it doesn't exist"""
+        try:
+            pk = int(pk)
+        except (TypeError, ValueError):
+            return None
+        return self.get_many([pk], request).get(pk)
+
+    def get_many(self, pks, request=None):
+        """
+        Return {pk: representation} of existing objects with two cache round
+        trips (versions and data) and one query for missing ones
+        """
+        pks = list(dict.fromkeys(pks))
+        versions = self._get_versions(pks)
+        data_keys = {
+            pk: self._data_key(pk, version)
+            for pk, version in versions.items()
+            if version is not None
+        }
+        cached = self.cache.get_many(data_keys.values())
+        result = {pk: cached[key] for pk, key in data_keys.items() if key in cached}
+
+        missing = [pk for pk in pks if pk not in result]
+        if missing:
+            fetched = self._fetch(missing)
+            self.cache.set_many(
+                {
+                    data_keys[pk]: data
+                    for pk, data in fetched.items()
+                    if pk in data_keys
+                },
+                settings.OBJECT_CACHE["TIMEOUT"],
+            )
+            result.update(fetched)
+
+        return {
+            pk: self._for_request(result[pk], request) for pk in pks if pk in result
+        }
+
+    def invalidate(self, pk):
+        """Set new version of the object now and once more on commit"""
+        self.invalidate_many([pk])
+
+    def invalidate_many(self, pks):
+        """Set new versions of the objects with one cache round trip"""
+        pks = list(pks)
+        if not pks:
+            return
+        self._set_versions(pks)
+        transaction.on_commit(lambda: self._set_versions(pks))
+
+    def get_queryset(self):
+        """
+        Return queryset reading from the primary. Data stored under the new
+        version must not come from a replica lagging behind the write
+        """
+        return self.queryset.using(DEFAULT_DB_ALIAS)
+
+    def _fetch(self, pks):
+        objects = self.get_queryset().filter(pk__in=pks)
+        return {
+            obj.pk: dict(self.serializer_class(obj, context={}).data) for obj in objects
+        }
+
+    def _get_versions(self, pks):
+        version_keys = {pk: self._version_key(pk) for pk in pks}
+        stored = self.cache.get_many(version_keys.values())
+        versions = {}
+        for pk, key in version_keys.items():
+            version = stored.get(key)
+            if version is None:
+                # Only one reader starts versioning, others skip caching
+                version = uuid4().hex
+                if not self.cache.add(key, version, None):
+                    version = None
+            versions[pk] = version
+        return versions
+
+    def _set_versions(self, pks):
+        self.cache.set_many(
+            {self._version_key(pk): uuid4().hex for pk in pks},
+            None,
+        )
+
+    def _version_key(self, pk):
+        return f"{self.prefix}-version:{pk}"
+
+    def _data_key(self, pk, version):
+        return f"{self.prefix}:{pk}:{version}"
+
+    def _for_request(self, data, request):
+        data = dict(data)
+        if request is not None:
+            for field in self.url_fields:
+                if data.get(field):
+                    data[field] = request.build_absolute_uri(data[field])
+        return data
@@ -0,0 +1,40 @@
+from functools import partial
+from django.db.backends.postgresql import base
+from core.db.pool import get_pool
+from .creation import DatabaseCreation
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    PostgreSQL backend which takes connections from the per-process pool
+    and returns them on close instead of disconnecting. Pool is configured
+    by "POOL" key of the database settings. Use it with CONN_MAX_AGE = 0,
+    so connections go back to the pool at the end of each request
+    """
+
+    creation_class = DatabaseCreation
+
+    @property
+    def pool(self):
+        return get_pool(self.alias, self.settings_dict)
+
+    def get_new_connection(self, conn_params):
+        connection = self.pool.getconn(partial(super().get_new_connection, conn_params))
+        # Set by super() for new connections only
+        self.isolation_level = base.IsolationLevel(
+            self.settings_dict["OPTIONS"].get(
+                "isolation_level", base.IsolationLevel.READ_COMMITTED
+            )
+        )
+        return connection
+
+    def _close(self):
+        if self.connection is None:
+            return
+        with self.wrap_database_errors:
+            # Django keeps the connection object when closing in transaction,
+            # so it mustn't be handed out to other threads
+            if self.in_atomic_block:
+                self.pool.discard(self.connection)
+            else:
+                self.pool.putconn(self.connection)
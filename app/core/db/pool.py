@@ -0,0 +1,194 @@
+import threading
+import time
+from collections import deque
+import psycopg2
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+
+
+class PoolTimeout(psycopg2.OperationalError):
+    """No connection got free in time"""
+
+
+class ConnectionPool:
+    """
+    Bounded thread-safe pool of psycopg2 connections. Callers wait for
+    a free connection when all of them are in use, so the process never
+    opens more than max_size connections
+    """
+
+    def __init__(self, max_size, timeout=30, max_lifetime=None, check=False):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.check = check
+        self._idle = deque()
+        self._created_at = {}
+        self._size = 0
+        self._cond = threading.Condition()
+        self._stats = {
+            "connects": 0,
+            "checkouts": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "discarded": 0,
+        }
+
+    def getconn(self, connect):
+        """Return idle connection or new one made by connect()"""
+        deadline = time.monotonic() + self.timeout
+        while True:
+            conn = self._acquire(deadline)
+            if conn is None:
+                break
+            if self._is_usable(conn):
+                return conn
+            self._discard(conn)
+
+        # Slot is reserved for the new connection
+        try:
+            conn = connect()
+        except Exception:
+            self._release_slot()
+            raise
+        with self._cond:
+            self._created_at[id(conn)] = time.monotonic()
+            self._stats["connects"] += 1
+        return conn
+
+    def putconn(self, conn):
+        """Return connection to the pool, rolling back unfinished transaction"""
+        if conn.closed or self._is_expired(conn):
+            self._discard(conn)
+            return
+        if conn.info.transaction_status != TRANSACTION_STATUS_IDLE:
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                self._discard(conn)
+                return
+        with self._cond:
+            self._idle.append(conn)
+            self._cond.notify()
+
+    def discard(self, conn):
+        """Close connection instead of returning it to the pool"""
+        self._discard(conn)
+
+    def close(self):
+        """Close idle connections"""
+        with self._cond:
+            idle, self._idle = list(self._idle), deque()
+        for conn in idle:
+            self._discard(conn)
+
+    def stats(self):
+        with self._cond:
+            return {
+                "max_size": self.max_size,
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                **self._stats,
+            }
+
+    def _acquire(self, deadline):
+        """
+        Take idle connection or reserve slot for new one (return None).
+        Wait until deadline when the pool is exhausted
+        """
+        with self._cond:
+            waited = False
+            while True:
+                if self._idle:
+                    conn = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    conn = None
+                    break
+
+                if not waited:
+                    self._stats["waits"] += 1
+                    waited = True
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    raise PoolTimeout(
+                        f"No free connection in the pool of {self.max_size} "
+                        f"in {self.timeout} seconds"
+                    )
+                self._cond.wait(remaining)
+            self._stats["checkouts"] += 1
+            return conn
+
+    def _is_expired(self, conn):
+        if self.max_lifetime is None:
+            return False
+        created_at = self._created_at.get(id(conn), 0)
+        return time.monotonic() - created_at > self.max_lifetime
+
+    def _is_usable(self, conn):
+        if conn.closed or self._is_expired(conn):
+            return False
+        if not self.check:
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+        except psycopg2.Error:
+            return False
+        return True
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+        with self._cond:
+            self._created_at.pop(id(conn), None)
+            self._stats["discarded"] += 1
+        self._release_slot()
+
+    def _release_slot(self):
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, settings_dict):
+    """
+    Return pool of the database, pools are created on first use.
+    Database of the alias may change (e.g. to the test one), so the pool
+    is bound to connection settings as well
+    """
+    key = (alias,) + tuple(
+        settings_dict.get(name) for name in ("NAME", "HOST", "PORT", "USER")
+    )
+    pool = _pools.get(key)
+    if pool is not None:
+        return pool
+
+    with _pools_lock:
+        if key not in _pools:
+            options = settings_dict.get("POOL", {})
+            _pools[key] = ConnectionPool(
+                max_size=options.get("MAX_SIZE", 10),
+                timeout=options.get("TIMEOUT", 30),
+                max_lifetime=options.get("MAX_LIFETIME"),
+                check=settings_dict.get("CONN_HEALTH_CHECKS", False),
+            )
+        return _pools[key]
+
+
+def close_pools():
+    """Close idle connections of all pools"""
+    for pool in list(_pools.values()):
+        pool.close()
+
+
+def get_pools_stats():
+    return {key[0]: pool.stats() for key, pool in list(_pools.items())}
@@ -0,0 +1,49 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_use_primary = ContextVar("use_primary", default=False)
+
+
+@contextmanager
+def use_primary():
+    """Route reads of the current request (or task) to the primary"""
+    token = _use_primary.set(True)
+    try:
+        yield
+    finally:
+        _use_primary.reset(token)
+
+
+class PrimaryReplicaRouter:
+    """
+    Send reads to a random replica of DATABASE_REPLICAS and writes to the
+    primary. Reads go to the primary as well inside transactions and
+    within use_primary(), so they see preceding writes
+    """
+
+    def db_for_read(self, model, **hints):
+        # Keep reading related objects from the database of the instance
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db:
+            return instance._state.db
+
+        if (
+            not settings.DATABASE_REPLICAS
+            or _use_primary.get()
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas have the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+from core.benchmarks import SUITES
+
+
+class Command(BaseCommand):
+    """Django command to benchmark hot paths against the configured db"""
+
+    help = "Run benchmark suite and report throughput and latencies"
+
+    def add_arguments(self, parser):
+        parser.add_argument("suites", nargs="*", help=f"One of: {', '.join(SUITES)}")
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Threads serving sync views, like WSGI server threads",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=32,
+            help="Requests in flight on the event loop for async views",
+        )
+        parser.add_argument(
+            "--db-latency",
+            type=float,
+            default=0,
+            help="Milliseconds added to every query to simulate slow db",
+        )
+
+    def handle(self, *args, **options):
+        unknown = set(options["suites"]) - set(SUITES)
+        if unknown:
+            raise CommandError(f"Unknown suites: {', '.join(sorted(unknown))}")
+
+        for name in options["suites"] or SUITES:
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{name}:"))
+            for line in SUITES[name](options):
+                self.stdout.write(line)
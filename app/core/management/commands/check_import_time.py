@@ -0,0 +1,94 @@
+import os
+import subprocess
+import sys
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+def parse_import_time(output):
+    """
+    Parse "-X importtime" output into list of (module, cumulative_us, depth)
+    in import order. Top-level imports have depth 0
+    """
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        try:
+            _, cumulative, name = line[len("import time:") :].split("|")
+            cumulative = int(cumulative)
+        except ValueError:
+            # Header line
+            continue
+        # Name is indented by one space plus two per nesting level
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        modules.append((name.strip(), cumulative, depth))
+    return modules
+
+
+class Command(BaseCommand):
+    """
+    Django command to measure imports of a fresh worker process.
+    Fail when they exceed the budget or test modules are imported
+    """
+
+    help = "Report cumulative import time per module of the worker cold start"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--budget",
+            type=int,
+            default=settings.IMPORT_TIME_BUDGET_MS,
+            help="Maximum total import time in milliseconds",
+        )
+        parser.add_argument("--top", type=int, default=20)
+        parser.add_argument(
+            "--module",
+            action="append",
+            dest="modules",
+            help="Module to import, default are the WSGI application and urls",
+        )
+
+    def handle(self, *args, **options):
+        modules = options["modules"] or [
+            settings.WSGI_APPLICATION.rsplit(".", 1)[0],
+            settings.ROOT_URLCONF,
+        ]
+        script = "import importlib\n" + "".join(
+            f"importlib.import_module({module!r})\n" for module in modules
+        )
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", script],
+            capture_output=True,
+            text=True,
+            env={
+                **os.environ,
+                "DJANGO_SETTINGS_MODULE": os.environ.get(
+                    "DJANGO_SETTINGS_MODULE", "app.settings"
+                ),
+            },
+        )
+        imports = parse_import_time(result.stderr)
+        if result.returncode != 0:
+            errors = [
+                line
+                for line in result.stderr.splitlines()
+                if not line.startswith("import time:")
+            ]
+            raise CommandError("Import failed:\n" + "\n".join(errors))
+
+        total_ms = sum(cumulative for _, cumulative, depth in imports if depth == 0)
+        total_ms /= 1000
+        top = sorted(imports, key=lambda module: module[1], reverse=True)
+        for name, cumulative, _ in top[: options["top"]]:
+            self.stdout.write(f"{cumulative / 1000:10.1f} ms  {name}")
+        self.stdout.write(f"Total: {total_ms:.1f} ms, budget: {options['budget']} ms")
+
+        test_modules = [name for name, _, _ in imports if "tests" in name.split(".")]
+        if test_modules:
+            raise CommandError(
+                f"Test modules are imported at runtime: {', '.join(test_modules)}"
+            )
+        if total_ms > options["budget"]:
+            raise CommandError("Import time is over the budget!")
+        self.stdout.write(self.style.SUCCESS("Import time is within the budget"))
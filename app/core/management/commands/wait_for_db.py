@@ -1,4 +1,5 @@
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
 from django.db.utils import OperationalError
 from psycopg2 import OperationalError as Psycopg2Error
 import time
@@ -7,16 +8,37 @@ import time
 class Command(BaseCommand):
     """Django command to wait for database"""
 
+    # Poll often at first, then back off up to the max delay
+    initial_delay = 0.1
+    max_delay = 1.0
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default="default")
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            default=None,
+            help="Seconds to wait before giving up",
+        )
+
     def handle(self, *args, **options):
         self.stdout.write("Waiting for db...")
-        is_db_ready = False
+        connection = connections[options["database"]]
+        started_at = time.monotonic()
+        delay = self.initial_delay
 
-        while is_db_ready is False:
+        while True:
             try:
-                self.check(databases=["default"])
-                is_db_ready = True
+                connection.ensure_connection()
+                break
             except (Psycopg2Error, OperationalError):
-                self.stdout.write("Database is unavailable, wating for 2 seconds..")
-                time.sleep(2)
+                elapsed = time.monotonic() - started_at
+                if options["timeout"] is not None and elapsed >= options["timeout"]:
+                    raise CommandError("Database is unavailable, timed out!")
+                self.stdout.write(
+                    f"Database is unavailable, waiting for {delay:.1f} seconds.."
+                )
+                time.sleep(delay)
+                delay = min(delay * 2, self.max_delay)
 
         self.stdout.write(self.style.SUCCESS("Database is available!"))
@@ -0,0 +1,48 @@
+from django.conf import settings
+from django.urls import reverse
+from rest_framework.permissions import SAFE_METHODS
+from .db.routers import use_primary
+
+PRIMARY_COOKIE = "db_primary"
+
+
+class PrimaryStickinessMiddleware:
+    """
+    Serve write requests from the primary database. Successful writes set
+    a short-lived cookie, so the client's next reads go to the primary too
+    and see its own writes despite replication lag. Clients which don't
+    keep cookies can send "X-DB-Primary" header instead
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+
+        # Batch requests route their sub-requests by their methods
+        # and tell whether some of them wrote
+        is_batch = request.path_info == reverse("batch")
+        is_write = request.method not in SAFE_METHODS and not is_batch
+        if not (
+            is_write
+            or PRIMARY_COOKIE in request.COOKIES
+            or "HTTP_X_DB_PRIMARY" in request.META
+        ):
+            response = self.get_response(request)
+        else:
+            with use_primary():
+                response = self.get_response(request)
+
+        if is_batch:
+            is_write = getattr(response, "has_writes", False)
+        if is_write and response.status_code < 400:
+            response.set_cookie(
+                PRIMARY_COOKIE,
+                "1",
+                max_age=settings.DB_PRIMARY_STICKY_SECONDS,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
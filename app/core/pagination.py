@@ -0,0 +1,178 @@
+from collections import OrderedDict
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class AsyncLimitOffsetPagination(LimitOffsetPagination):
+    """Limit/offset pagination which also paginates in async views"""
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Async version of paginate_queryset() using async ORM"""
+        self.request = request
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+
+        self.count = await queryset.acount()
+        self.offset = self.get_offset(request)
+        if self.count > self.limit and self.template is not None:
+            self.display_page_controls = True
+
+        if self.count == 0 or self.offset > self.count:
+            return []
+        return [obj async for obj in queryset[self.offset : self.offset + self.limit]]
+
+
+class EstimatedCountPagination(AsyncLimitOffsetPagination):
+    """
+    Limit/offset pagination which doesn't count all rows of large tables.
+    Unfiltered lists of big tables take row count estimated by PostgreSQL
+    statistics, others are counted up to the cap past the offset.
+    "count_is_exact" of the response tells whether the count is exact
+    """
+
+    # Tables estimated to have fewer rows are counted
+    estimate_threshold = settings.PAGINATION_COUNT["ESTIMATE_THRESHOLD"]
+    # Max number of rows counted past the offset
+    count_cap = settings.PAGINATION_COUNT["CAP"]
+
+    count_is_exact = True
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+
+        self.offset = self.get_offset(request)
+        self.count = self.get_count(queryset)
+        if self._is_past_end():
+            return self._get_page([])
+        return self._get_page(list(queryset[self.offset : self.offset + self.limit]))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+
+        self.offset = self.get_offset(request)
+        self.count = await self.aget_count(queryset)
+        if self._is_past_end():
+            return self._get_page([])
+        page = queryset[self.offset : self.offset + self.limit]
+        return self._get_page([obj async for obj in page])
+
+    def get_count(self, queryset):
+        counted = self._get_counted(queryset)
+        if self.can_estimate(queryset):
+            return self._estimate_or_count(queryset, counted)
+        return self._cap_count(counted.count())
+
+    async def aget_count(self, queryset):
+        counted = self._get_counted(queryset)
+        if self.can_estimate(queryset):
+            return await sync_to_async(self._estimate_or_count)(queryset, counted)
+        return self._cap_count(await counted.acount())
+
+    def can_estimate(self, queryset):
+        """Whether row count of the queryset is the row count of the table"""
+        query = queryset.query
+        if query.has_filters() or query.distinct or query.group_by or query.is_sliced:
+            return False
+        return connections[queryset.db].vendor == "postgresql"
+
+    def _estimate_or_count(self, queryset, counted):
+        """
+        Return row count of the table estimated by statistics or counted
+        up to the cap if the estimate is below threshold, in one query
+        """
+        connection = connections[queryset.db]
+        table = connection.ops.quote_name(queryset.model._meta.db_table)
+        sql, params = counted.query.get_compiler(queryset.db).as_sql()
+        with connection.cursor() as cursor:
+            # Tables never analyzed have negative estimate
+            cursor.execute(
+                "SELECT CASE WHEN estimate >= %s THEN estimate"
+                f" ELSE (SELECT COUNT(*) FROM ({sql}) subquery) END,"
+                " estimate >= %s"
+                " FROM (SELECT COALESCE((SELECT reltuples::bigint FROM pg_class"
+                " WHERE oid = to_regclass(%s)), -1) AS estimate) stats",
+                [self.estimate_threshold, *params, self.estimate_threshold, table],
+            )
+            count, is_estimate = cursor.fetchone()
+
+        if is_estimate:
+            self.count_is_exact = False
+            return count
+        return self._cap_count(count)
+
+    def get_paginated_response(self, data):
+        return Response(
+            OrderedDict(
+                [
+                    ("count", self.count),
+                    ("count_is_exact", self.count_is_exact),
+                    ("next", self.get_next_link()),
+                    ("previous", self.get_previous_link()),
+                    ("results", data),
+                ]
+            )
+        )
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        properties = response_schema["properties"]
+        properties["count"]["description"] = (
+            "Number of results, estimated or counted up to the cap "
+            "when count_is_exact is false"
+        )
+        response_schema["properties"] = OrderedDict(
+            [
+                ("count", properties.pop("count")),
+                ("count_is_exact", {"type": "boolean", "example": True}),
+                *properties.items(),
+            ]
+        )
+        return response_schema
+
+    # Inexact count doesn't tell where the list ends, the full page does
+    def get_next_link(self):
+        if self.count_is_exact:
+            return super().get_next_link()
+        if not self.has_more:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.limit_query_param, self.limit)
+        offset = self.offset + self.limit
+        return replace_query_param(url, self.offset_query_param, offset)
+
+    def _get_counted(self, queryset):
+        """Return queryset of rows to count, limited by the cap"""
+        return queryset.order_by().values("pk")[: self._get_count_limit()]
+
+    def _get_count_limit(self):
+        return self.offset + self.count_cap + 1
+
+    def _cap_count(self, count):
+        if count >= self._get_count_limit():
+            self.count_is_exact = False
+            return count - 1
+        return count
+
+    def _is_past_end(self):
+        return self.count_is_exact and (self.count == 0 or self.offset > self.count)
+
+    def _get_page(self, page):
+        self.has_more = len(page) == self.limit
+        # Inexact count is at least the number of rows up to the page end.
+        # Empty page past the end tells nothing of the rows before it
+        if not self.count_is_exact and page:
+            self.count = max(self.count, self.offset + len(page))
+        if self.count > self.limit and self.template is not None:
+            self.display_page_controls = True
+        return page
@@ -0,0 +1,38 @@
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+from .renderers import FastJSONRenderer, MessagePackRenderer, msgpack, orjson
+
+
+class FastJSONParser(JSONParser):
+    """JSONParser decoding with orjson when it's installed"""
+
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        try:
+            data = stream.read()
+            # orjson reads utf-8 only
+            if encoding.lower() not in ("utf-8", "utf8"):
+                data = data.decode(encoding)
+            return orjson.loads(data)
+        except ValueError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
+
+
+class MessagePackParser(BaseParser):
+    """Parses MessagePack data. Requires "msgpack" package"""
+
+    media_type = "application/msgpack"
+    renderer_class = MessagePackRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read())
+        except (ValueError, msgpack.UnpackException) as exc:
+            raise ParseError(f"MessagePack parse error - {exc}")
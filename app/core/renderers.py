@@ -0,0 +1,108 @@
+import json
+from collections.abc import Sequence
+from uuid import uuid4
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+class RawJSONList(Sequence):
+    """
+    List of items already encoded to JSON. FastJSONRenderer splices them into
+    the output as they are, other renderers and code get decoded items
+    """
+
+    def __init__(self, fragments):
+        self.fragments = fragments
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [json.loads(fragment) for fragment in self.fragments[index]]
+        return json.loads(self.fragments[index])
+
+    def __len__(self):
+        return len(self.fragments)
+
+    def __eq__(self, other):
+        return self.tolist() == other
+
+    def tolist(self):
+        """Return decoded items. DRF encoder calls it for unknown types"""
+        return [json.loads(fragment) for fragment in self.fragments]
+
+    def encode(self):
+        return f"[{','.join(self.fragments)}]".encode()
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer encoding with orjson when it's installed. UUIDs are encoded
+    natively, datetimes and types orjson doesn't know (Decimal, lazy strings,
+    querysets) are encoded by DRF encoder, so the output is the same.
+    The only difference is NaN and infinity, which are output as null
+    instead of failing the response as DRF's strict mode does.
+    Falls back to stdlib json for indented and non-compact output
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        if isinstance(data, RawJSONList):
+            return data.encode()
+
+        # Raw lists (e.g. page results) are spliced in place of placeholders
+        raw_lists = {}
+        encoded_data = data
+        if isinstance(data, dict) and any(
+            isinstance(value, RawJSONList) for value in data.values()
+        ):
+            encoded_data = dict(data)
+            for key, value in data.items():
+                if isinstance(value, RawJSONList):
+                    placeholder = uuid4().hex
+                    raw_lists[f'"{placeholder}"'.encode()] = value
+                    encoded_data[key] = placeholder
+
+        try:
+            ret = orjson.dumps(
+                encoded_data,
+                default=self.encoder_class().default,
+                option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+            )
+        except orjson.JSONEncodeError:
+            # E.g. integers beyond 64 bits
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Escape line separators as DRF does to stay a subset of javascript
+        if b"\xe2\x80" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028")
+            ret = ret.replace(b"\xe2\x80\xa9", b"\\u2029")
+        for placeholder, value in raw_lists.items():
+            ret = ret.replace(placeholder, value.encode(), 1)
+        return ret
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Renderer which serializes to MessagePack. Requires "msgpack" package"""
+
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return msgpack.packb(data, default=JSONEncoder().default)
@@ -0,0 +1,42 @@
+from drf_spectacular.openapi import AutoSchema as BaseAutoSchema
+from drf_spectacular.utils import OpenApiParameter, OpenApiTypes
+from .serializers import get_expandable_fields
+from .views import ExpandFieldsMixin, SparseFieldsMixin
+
+
+class AutoSchema(BaseAutoSchema):
+    """Describe query params common to read endpoints of the api"""
+
+    def get_override_parameters(self):
+        parameters = super().get_override_parameters()
+        # Custom actions output their own data
+        if getattr(self.view, "action", None) not in ["list", "retrieve"]:
+            return parameters
+        if isinstance(self.view, SparseFieldsMixin):
+            parameters += [
+                OpenApiParameter(
+                    "fields",
+                    OpenApiTypes.STR,
+                    description="Comma separated list of fields to output",
+                ),
+                OpenApiParameter(
+                    "omit",
+                    OpenApiTypes.STR,
+                    description="Comma separated list of fields to skip",
+                ),
+            ]
+        if isinstance(self.view, ExpandFieldsMixin):
+            expandable = get_expandable_fields(self.view.get_serializer_class())
+            if expandable:
+                names = ", ".join(f"`{name}`" for name in expandable)
+                parameters.append(
+                    OpenApiParameter(
+                        "expand",
+                        OpenApiTypes.STR,
+                        description=(
+                            "Comma separated list of related objects "
+                            f"to output instead of ids: {names}"
+                        ),
+                    )
+                )
+        return parameters
@@ -0,0 +1,261 @@
+from functools import lru_cache
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.urls import reverse
+from rest_framework import serializers
+from rest_framework.settings import api_settings
+
+# Fields representing db value as it is
+IDENTITY_FIELDS = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.FloatField,
+    serializers.IntegerField,
+    serializers.JSONField,
+    serializers.ReadOnlyField,
+)
+
+
+class CompiledSerializer:
+    """
+    Read-only version of ModelSerializer built of precomputed field converters.
+    Represents rows of `.values_list(*compiled.fields)` with the same output
+    as the serializer, skipping model instances and DRF per field machinery
+    """
+
+    def __init__(self, serializer_class, field_names=None):
+        self.serializer_class = serializer_class
+        # Value paths to select, in the order of row items
+        self.fields = []
+        self._entries = self._compile(serializer_class(), "", field_names)
+
+    def to_representation(self, rows, context=None):
+        """Return list of representations of the rows"""
+        request = (context or {}).get("request")
+        entries = self._bind(self._entries, request)
+        return [self._build(row, entries) for row in rows]
+
+    def _compile(self, serializer, prefix, field_names=None):
+        """
+        Return (name, row index, converter factory, nested entries)
+        of readable fields of the serializer, limited to the given names
+        """
+        entries = []
+        for field in serializer.fields.values():
+            if field.write_only:
+                continue
+            if field_names is not None and field.field_name not in field_names:
+                continue
+            if field.source == "*" or "." in field.source:
+                raise self._not_compilable(serializer, field)
+
+            path = f"{prefix}{field.source}"
+            index = self._add_path(path)
+            if isinstance(field, serializers.ModelSerializer):
+                # Related id is selected to represent missing object as None
+                nested = self._compile(field, f"{path}__")
+                entries.append((field.field_name, index, None, nested))
+            else:
+                factory = self._get_converter_factory(serializer, field)
+                entries.append((field.field_name, index, factory, None))
+        return entries
+
+    def _add_path(self, path):
+        if path not in self.fields:
+            self.fields.append(path)
+        return self.fields.index(path)
+
+    def _get_converter_factory(self, serializer, field):
+        """Return function making converter of db value for the request"""
+        if isinstance(field, IDENTITY_FIELDS):
+            return None
+
+        if isinstance(field, serializers.PrimaryKeyRelatedField):
+            if field.pk_field is None:
+                return None
+            return lambda request: field.pk_field.to_representation
+
+        if isinstance(field, serializers.FileField):
+            if not getattr(field, "use_url", api_settings.UPLOADED_FILES_USE_URL):
+                return None
+            try:
+                model_field = serializer.Meta.model._meta.get_field(field.source)
+            except FieldDoesNotExist:
+                raise self._not_compilable(serializer, field)
+            return lambda request: self._make_url_converter(model_field, request)
+
+        # Other related fields need model instances
+        if isinstance(
+            field,
+            (
+                serializers.RelatedField,
+                serializers.ManyRelatedField,
+                serializers.BaseSerializer,
+            ),
+        ):
+            raise self._not_compilable(serializer, field)
+
+        # Decimals, dates and others are formatted by the field itself
+        return lambda request: field.to_representation
+
+    @staticmethod
+    def _not_compilable(serializer, field):
+        name = type(serializer).__name__
+        msg = f"Field '{field.field_name}' of {name} can't be compiled"
+        return ImproperlyConfigured(msg)
+
+    @staticmethod
+    def _make_url_converter(model_field, request):
+        storage = model_field.storage
+        # Empty file name is represented as None like DRF does
+        if request is None:
+            return lambda name: storage.url(name) if name else None
+        return lambda name: (
+            request.build_absolute_uri(storage.url(name)) if name else None
+        )
+
+    def _bind(self, entries, request):
+        """Return entries with converters made for the request"""
+        return [
+            (
+                name,
+                index,
+                factory(request) if factory is not None else None,
+                self._bind(nested, request) if nested is not None else None,
+            )
+            for name, index, factory, nested in entries
+        ]
+
+    def _build(self, row, entries):
+        data = {}
+        for name, index, convert, nested in entries:
+            value = row[index]
+            if value is not None:
+                if nested is not None:
+                    value = self._build(row, nested)
+                elif convert is not None:
+                    value = convert(value)
+            data[name] = value
+        return data
+
+
+@lru_cache
+def compile_serializer(serializer_class, field_names=None):
+    """
+    Return compiled version of the serializer class limited to
+    the frozenset of field names, compiled once
+    """
+    return CompiledSerializer(serializer_class, field_names)
+
+
+@lru_cache
+def get_readable_fields(serializer_class):
+    """Return {name: field} of readable fields of the serializer class"""
+    return {
+        name: field
+        for name, field in serializer_class().fields.items()
+        if not field.write_only
+    }
+
+
+def get_only_fields(serializer_class, field_names, queryset):
+    """
+    Return model field names to load with `.only()` to output the fields of
+    the serializer, or None if some field isn't a concrete model field
+    """
+    model = queryset.model
+    select_related = queryset.query.select_related
+    if select_related is True:
+        return None
+
+    # Related objects loaded along can't be deferred
+    only = {model._meta.pk.name, *(select_related or {})}
+    for name, field in get_readable_fields(serializer_class).items():
+        if name not in field_names or field.source in queryset.query.annotations:
+            continue
+        try:
+            model_field = model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            return None
+        if not model_field.concrete or model_field.many_to_many:
+            return None
+        only.add(field.source)
+    return only
+
+
+def get_expandable_fields(serializer_class):
+    """Return {name: serializer class} of expandable readable fields"""
+    expandable = getattr(serializer_class.Meta, "expandable_fields", {})
+    fields = get_readable_fields(serializer_class)
+    return {name: expandable[name] for name in expandable if name in fields}
+
+
+def is_many_relation(model, source):
+    """Whether the attribute of the model holds many related objects"""
+    for model_field in model._meta.get_fields():
+        # Reverse relations are accessed by accessor name (e.g. "review_set")
+        accessor = getattr(model_field, "get_accessor_name", None)
+        if source == model_field.name or accessor and source == accessor():
+            return model_field.many_to_many or model_field.one_to_many
+    raise FieldDoesNotExist(f"{model.__name__} has no relation '{source}'")
+
+
+def get_related_lookups(serializer_class, field_names, model):
+    """
+    Return (select_related, prefetch_related) lookups to load
+    related objects of the fields
+    """
+    fields = get_readable_fields(serializer_class)
+    select_related, prefetch_related = [], []
+    for name in field_names:
+        source = fields[name].source
+        if is_many_relation(model, source):
+            prefetch_related.append(source)
+        else:
+            select_related.append(source)
+    return select_related, prefetch_related
+
+
+def make_expanded_field(nested_class, field, model):
+    """Return nested serializer to output related object(s) of the field"""
+    kwargs = {}
+    if field.source != field.field_name:
+        kwargs["source"] = field.source
+    return nested_class(
+        many=is_many_relation(model, field.source),
+        read_only=True,
+        **kwargs,
+    )
+
+
+@lru_cache
+def expand_serializer(serializer_class, field_names, model):
+    """Return subclass of the serializer with the fields expanded"""
+    fields = get_readable_fields(serializer_class)
+    expandable = get_expandable_fields(serializer_class)
+    attrs = {
+        name: make_expanded_field(expandable[name], fields[name], model)
+        for name in field_names
+    }
+    return type(f"Expanded{serializer_class.__name__}", (serializer_class,), attrs)
+
+
+class SubRequestSerializer(serializers.Serializer):
+    """Sub-request of the batch request"""
+
+    method = serializers.ChoiceField(["GET", "POST", "PUT", "PATCH", "DELETE"])
+    path = serializers.CharField(help_text="Path with query string, e.g. /api/...")
+    body = serializers.JSONField(required=False, allow_null=True)
+
+    def validate_path(self, value):
+        if not value.startswith("/api/"):
+            raise serializers.ValidationError("Path must start with /api/.")
+        if value.split("?")[0] == reverse("batch"):
+            raise serializers.ValidationError("Batch requests can't be nested.")
+        return value
+
+
+class SubResponseSerializer(serializers.Serializer):
+    """Response of the sub-request"""
+
+    status = serializers.IntegerField()
+    body = serializers.JSONField(allow_null=True)
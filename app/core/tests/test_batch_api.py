@@ -0,0 +1,230 @@
+from unittest import mock
+from django.db import DEFAULT_DB_ALIAS
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from authentication.backends import CachedTokenAuthentication
+from core import batch
+from core.db.routers import _use_primary
+from core.middleware import PRIMARY_COOKIE
+from product.tests.test_models import create_category, create_product
+from user.models import WishItem
+from user.tests.test_models import create_user, create_wishitem
+
+BATCH_URL = reverse("batch")
+PRODUCT_LIST_URL = reverse("product:product-list")
+WISH_ITEM_LIST_URL = reverse("user:wishitem-list")
+
+
+def get_product_detail_url(product_id):
+    return reverse("product:product-detail", kwargs={"pk": product_id})
+
+
+class BatchAPITests(TestCase):
+    """Test serving sub-requests by the batch endpoint"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.category = create_category()
+        self.product = create_product(self.category)
+
+    def test_get_sub_requests(self):
+        """Test responses are returned in order of sub-requests"""
+        sub_requests = [
+            {"method": "GET", "path": get_product_detail_url(self.product.id)},
+            {"method": "GET", "path": f"{PRODUCT_LIST_URL}?limit=1"},
+        ]
+        res = self.client.post(BATCH_URL, sub_requests, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        product_res, list_res = res.json()
+        self.assertEqual(product_res["status"], status.HTTP_200_OK)
+        self.assertEqual(
+            product_res["body"],
+            self.client.get(get_product_detail_url(self.product.id)).json(),
+        )
+        self.assertEqual(list_res["status"], status.HTTP_200_OK)
+        self.assertEqual(list_res["body"]["count"], 1)
+        self.assertEqual(list_res["body"]["results"][0]["id"], self.product.id)
+
+    def test_not_found_sub_requests(self):
+        """Test unknown paths and objects return 404 sub-responses"""
+        sub_requests = [
+            {"method": "GET", "path": "/api/unknown/"},
+            {"method": "GET", "path": get_product_detail_url(self.product.id + 1)},
+        ]
+        res = self.client.post(BATCH_URL, sub_requests, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [sub_response["status"] for sub_response in res.json()],
+            [status.HTTP_404_NOT_FOUND, status.HTTP_404_NOT_FOUND],
+        )
+
+    def test_sub_requests_authenticated_once(self):
+        """Test sub-requests reuse user authenticated by the batch request"""
+        user = create_user()
+        create_wishitem(user, self.product)
+        token = Token.objects.create(user=user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+        sub_requests = [{"method": "GET", "path": WISH_ITEM_LIST_URL}] * 2
+
+        with mock.patch.object(
+            CachedTokenAuthentication,
+            "authenticate_credentials",
+            autospec=True,
+            side_effect=CachedTokenAuthentication.authenticate_credentials,
+        ) as authenticate_credentials:
+            res = self.client.post(BATCH_URL, sub_requests, format="json")
+
+        authenticate_credentials.assert_called_once()
+        for sub_response in res.json():
+            self.assertEqual(sub_response["status"], status.HTTP_200_OK)
+            self.assertEqual(sub_response["body"]["count"], 1)
+
+    def test_anonymous_sub_requests(self):
+        """Test sub-requests of anonymous batch request are anonymous"""
+        sub_requests = [{"method": "GET", "path": WISH_ITEM_LIST_URL}]
+        res = self.client.post(BATCH_URL, sub_requests, format="json")
+
+        self.assertEqual(res.json()[0]["status"], status.HTTP_401_UNAUTHORIZED)
+
+    def test_write_sub_requests(self):
+        """Test reads after write see its changes"""
+        user = create_user()
+        self.client.force_authenticate(user)
+        sub_requests = [
+            {
+                "method": "POST",
+                "path": WISH_ITEM_LIST_URL,
+                "body": {"product": self.product.id},
+            },
+            {"method": "GET", "path": WISH_ITEM_LIST_URL},
+        ]
+        res = self.client.post(BATCH_URL, sub_requests, format="json")
+
+        create_res, list_res = res.json()
+        self.assertEqual(create_res["status"], status.HTTP_201_CREATED)
+        self.assertEqual(list_res["body"]["count"], 1)
+        self.assertTrue(WishItem.objects.filter(user=user).exists())
+
+    def test_sub_request_validation_error(self):
+        """Test invalid sub-request body returns 400 sub-response"""
+        self.client.force_authenticate(create_user())
+        sub_requests = [{"method": "POST", "path": WISH_ITEM_LIST_URL, "body": {}}]
+        res = self.client.post(BATCH_URL, sub_requests, format="json")
+
+        self.assertEqual(res.json()[0]["status"], status.HTTP_400_BAD_REQUEST)
+        self.assertIn("product", res.json()[0]["body"])
+
+    def test_invalid_batch(self):
+        """Test batch with invalid sub-requests is rejected as a whole"""
+        invalid_batches = [
+            [],
+            {"method": "GET", "path": PRODUCT_LIST_URL},
+            [{"method": "HEAD", "path": PRODUCT_LIST_URL}],
+            [{"method": "GET", "path": "/admin/"}],
+            [{"method": "POST", "path": BATCH_URL, "body": []}],
+        ]
+        for sub_requests in invalid_batches:
+            res = self.client.post(BATCH_URL, sub_requests, format="json")
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(BATCH_API={"MAX_REQUESTS": 2, "MAX_WORKERS": 2})
+    def test_max_sub_requests(self):
+        """Test number of sub-requests is limited"""
+        sub_requests = [{"method": "GET", "path": PRODUCT_LIST_URL}] * 3
+        res = self.client.post(BATCH_URL, sub_requests, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ConcurrentBatchAPITests(TransactionTestCase):
+    """Test serving GET sub-requests concurrently"""
+
+    def setUp(self):
+        self.client = APIClient()
+        category = create_category()
+        self.products = [create_product(category) for _ in range(3)]
+
+    def test_concurrent_sub_requests(self):
+        """Test responses keep order of sub-requests and see prior writes"""
+        user = create_user(is_staff=True)
+        self.client.force_authenticate(user)
+        sub_requests = [
+            {"method": "GET", "path": get_product_detail_url(product.id)}
+            for product in self.products
+        ]
+        sub_requests.insert(
+            1,
+            {
+                "method": "PATCH",
+                "path": get_product_detail_url(self.products[2].id),
+                "body": {"name": "patched"},
+            },
+        )
+        res = self.client.post(
+            f"{BATCH_URL}?concurrent=true", sub_requests, format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        sub_responses = res.json()
+        self.assertEqual(
+            [sub_response["status"] for sub_response in sub_responses],
+            [status.HTTP_200_OK] * 4,
+        )
+        self.assertEqual(
+            [sub_responses[i]["body"]["id"] for i in (0, 2, 3)],
+            [product.id for product in self.products],
+        )
+        self.assertEqual(sub_responses[3]["body"]["name"], "patched")
+
+    @override_settings(DATABASE_REPLICAS=["replica1"])
+    @mock.patch("core.db.routers.random.choice", return_value=DEFAULT_DB_ALIAS)
+    def test_reads_after_write_pinned_to_primary(self, mock_choice):
+        """Test reads go to the primary from the first write on, in threads too"""
+        self.client.force_authenticate(create_user(is_staff=True))
+        pinned = []
+        dispatch_sub_request = batch.dispatch_sub_request
+
+        def record_pinned(sub_request):
+            pinned.append((sub_request.method, _use_primary.get()))
+            return dispatch_sub_request(sub_request)
+
+        sub_requests = [
+            {"method": "GET", "path": get_product_detail_url(self.products[0].id)},
+            {
+                "method": "PATCH",
+                "path": get_product_detail_url(self.products[0].id),
+                "body": {"name": "patched"},
+            },
+        ] + [
+            {"method": "GET", "path": get_product_detail_url(product.id)}
+            for product in self.products
+        ]
+        with mock.patch.object(batch, "dispatch_sub_request", record_pinned):
+            res = self.client.post(
+                f"{BATCH_URL}?concurrent=true", sub_requests, format="json"
+            )
+
+        self.assertEqual(pinned[:2], [("GET", False), ("PATCH", True)])
+        self.assertEqual(pinned[2:], [("GET", True)] * 3)
+        self.assertIn(PRIMARY_COOKIE, res.cookies)
+
+    @override_settings(DATABASE_REPLICAS=["replica1"])
+    @mock.patch("core.db.routers.random.choice", return_value=DEFAULT_DB_ALIAS)
+    def test_reads_not_pinned_to_primary(self, mock_choice):
+        """Test batch of reads isn't pinned and sets no sticky cookie"""
+        sub_requests = [
+            {"method": "GET", "path": get_product_detail_url(product.id)}
+            for product in self.products
+        ]
+        res = self.client.post(
+            f"{BATCH_URL}?concurrent=true", sub_requests, format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotIn(PRIMARY_COOKIE, res.cookies)
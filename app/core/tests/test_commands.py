@@ -1,20 +1,87 @@
+import subprocess
+from io import StringIO
 from unittest.mock import patch
 from psycopg2 import OperationalError as Psycopg2OpError
 from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.db.utils import OperationalError
 from django.test import SimpleTestCase
+from core.management.commands.check_import_time import parse_import_time
 
+IMPORT_TIME_OUTPUT = """import time: self [us] | cumulative | imported package
+import time:       300 |        300 |   django.utils
+import time:      1000 |       1300 | django
+import time:       200 |        200 |     user.tests.test_models
+import time:       500 |        700 |   user.serializers
+import time:       100 |        800 | app.urls
+"""
 
-@patch("core.management.commands.wait_for_db.Command.check")
+
+@patch("core.management.commands.wait_for_db.connections")
 class CommandTests(SimpleTestCase):
-    def test_wait_for_db_ready(self, mock_check):
-        mock_check.return_value = True
-        call_command("wait_for_db")
-        mock_check.assert_called_once_with(databases=["default"])
+    def test_wait_for_db_ready(self, mock_connections):
+        ensure_connection = mock_connections["default"].ensure_connection
+        call_command("wait_for_db", stdout=StringIO())
+        ensure_connection.assert_called_once_with()
+
+    @patch("time.sleep")
+    def test_wait_for_db_delay(self, mock_sleep, mock_connections):
+        ensure_connection = mock_connections["default"].ensure_connection
+        ensure_connection.side_effect = (
+            [Psycopg2OpError] * 2 + [OperationalError] * 4 + [None]
+        )
+        call_command("wait_for_db", stdout=StringIO())
+        self.assertEqual(ensure_connection.call_count, 7)
+        # Delay starts below a second and backs off up to a second
+        delays = [call.args[0] for call in mock_sleep.call_args_list]
+        self.assertEqual(delays, [0.1, 0.2, 0.4, 0.8, 1.0, 1.0])
 
+    @patch("time.monotonic")
     @patch("time.sleep")
-    def test_wait_for_db_delay(self, mock_sleep, mock_check):
-        mock_check.side_effect = [Psycopg2OpError] * 2 + [OperationalError] * 3 + [True]
-        call_command("wait_for_db")
-        self.assertEqual(mock_check.call_count, 6)
-        mock_check.assert_called_with(databases=["default"])
+    def test_wait_for_db_timeout(self, mock_sleep, mock_monotonic, mock_connections):
+        mock_connections["default"].ensure_connection.side_effect = OperationalError
+        mock_monotonic.side_effect = [0, 1, 2, 3]
+        with self.assertRaises(CommandError):
+            call_command("wait_for_db", "--timeout", "2", stdout=StringIO())
+        self.assertEqual(mock_sleep.call_count, 1)
+
+
+@patch("core.management.commands.check_import_time.subprocess.run")
+class ImportTimeCommandTests(SimpleTestCase):
+    def mock_run(self, mock_run, stderr, returncode=0):
+        mock_run.return_value = subprocess.CompletedProcess([], returncode, "", stderr)
+
+    def test_parse_import_time(self, mock_run):
+        modules = parse_import_time(IMPORT_TIME_OUTPUT)
+        self.assertEqual(
+            modules,
+            [
+                ("django.utils", 300, 1),
+                ("django", 1300, 0),
+                ("user.tests.test_models", 200, 2),
+                ("user.serializers", 700, 1),
+                ("app.urls", 800, 0),
+            ],
+        )
+
+    def test_import_time_within_budget(self, mock_run):
+        self.mock_run(mock_run, "import time:  100 |  1500 | app.urls\n")
+        out = StringIO()
+        call_command("check_import_time", "--budget", "2", stdout=out)
+        self.assertIn("Total: 1.5 ms", out.getvalue())
+
+    def test_import_time_over_budget_error(self, mock_run):
+        self.mock_run(mock_run, "import time:  100 |  2500 | app.urls\n")
+        with self.assertRaisesMessage(CommandError, "over the budget"):
+            call_command("check_import_time", "--budget", "2", stdout=StringIO())
+
+    def test_test_modules_imported_error(self, mock_run):
+        self.mock_run(mock_run, IMPORT_TIME_OUTPUT)
+        with self.assertRaisesMessage(CommandError, "user.tests.test_models"):
+            call_command("check_import_time", stdout=StringIO())
+
+
+class RuntimeImportsTests(SimpleTestCase):
+    def test_no_test_modules_imported_at_runtime(self):
+        """Test worker imports don't pull in test modules"""
+        call_command("check_import_time", "--budget", "100000", stdout=StringIO())
@@ -0,0 +1,114 @@
+import threading
+from unittest.mock import MagicMock, patch
+import psycopg2
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, TRANSACTION_STATUS_INTRANS
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from core.db.backends.pooled_postgresql.base import DatabaseWrapper
+from core.db.pool import ConnectionPool, PoolTimeout
+
+
+def make_connection():
+    conn = MagicMock()
+    conn.closed = 0
+    conn.info.transaction_status = TRANSACTION_STATUS_IDLE
+    return conn
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    def test_reuse_returned_connection(self):
+        pool = ConnectionPool(max_size=2)
+        conn = pool.getconn(make_connection)
+        pool.putconn(conn)
+
+        self.assertIs(pool.getconn(make_connection), conn)
+        stats = pool.stats()
+        self.assertEqual(stats["connects"], 1)
+        self.assertEqual(stats["checkouts"], 2)
+        self.assertEqual(stats["in_use"], 1)
+
+    def test_wait_timeout_when_exhausted(self):
+        pool = ConnectionPool(max_size=1, timeout=0.01)
+        pool.getconn(make_connection)
+
+        with self.assertRaises(PoolTimeout):
+            pool.getconn(make_connection)
+        self.assertEqual(pool.stats()["timeouts"], 1)
+
+    def test_waiter_gets_returned_connection(self):
+        pool = ConnectionPool(max_size=1, timeout=5)
+        conn = pool.getconn(make_connection)
+        threading.Timer(0.05, pool.putconn, [conn]).start()
+
+        self.assertIs(pool.getconn(make_connection), conn)
+        self.assertEqual(pool.stats()["waits"], 1)
+
+    def test_unfinished_transaction_rolled_back(self):
+        pool = ConnectionPool(max_size=1)
+        conn = pool.getconn(make_connection)
+        conn.info.transaction_status = TRANSACTION_STATUS_INTRANS
+        pool.putconn(conn)
+
+        conn.rollback.assert_called_once()
+        self.assertEqual(pool.stats()["idle"], 1)
+
+    def test_closed_connection_replaced(self):
+        pool = ConnectionPool(max_size=1)
+        conn = pool.getconn(make_connection)
+        pool.putconn(conn)
+        conn.closed = 1
+
+        new_conn = pool.getconn(make_connection)
+
+        self.assertIsNot(new_conn, conn)
+        self.assertEqual(pool.stats()["discarded"], 1)
+        self.assertEqual(pool.stats()["size"], 1)
+
+    def test_health_check_on_checkout(self):
+        pool = ConnectionPool(max_size=1, check=True)
+        conn = pool.getconn(make_connection)
+        pool.putconn(conn)
+        conn.cursor.return_value.__enter__.return_value.execute.side_effect = (
+            psycopg2.OperationalError
+        )
+
+        self.assertIsNot(pool.getconn(make_connection), conn)
+
+    @patch("core.db.pool.time.monotonic")
+    def test_expired_connection_discarded(self, mock_monotonic):
+        mock_monotonic.return_value = 0
+        pool = ConnectionPool(max_size=1, max_lifetime=60)
+        conn = pool.getconn(make_connection)
+        mock_monotonic.return_value = 61
+        pool.putconn(conn)
+
+        conn.close.assert_called_once()
+        self.assertEqual(pool.stats()["size"], 0)
+
+    def test_failed_connect_releases_slot(self):
+        pool = ConnectionPool(max_size=1)
+
+        with self.assertRaises(psycopg2.OperationalError):
+            pool.getconn(MagicMock(side_effect=psycopg2.OperationalError))
+        self.assertEqual(pool.stats()["size"], 0)
+
+
+class PooledBackendTests(TestCase):
+    def setUp(self):
+        settings_dict = {**connection.settings_dict, "POOL": {"MAX_SIZE": 1}}
+        self.wrapper = DatabaseWrapper(settings_dict, alias="pool-test")
+
+    def tearDown(self):
+        self.wrapper.close()
+        self.wrapper.pool.close()
+
+    def test_connection_returned_to_pool_on_close(self):
+        self.wrapper.ensure_connection()
+        raw_connection = self.wrapper.connection
+        self.wrapper.close()
+
+        self.assertFalse(raw_connection.closed)
+        with self.wrapper.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        self.assertIs(self.wrapper.connection, raw_connection)
+        self.assertEqual(self.wrapper.pool.stats()["connects"], 1)
@@ -0,0 +1,105 @@
+from unittest.mock import patch
+from django.db import DEFAULT_DB_ALIAS
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.urls import reverse
+from core.db.routers import PrimaryReplicaRouter, use_primary
+from core.middleware import PRIMARY_COOKIE, PrimaryStickinessMiddleware
+from product.models import Product
+
+REPLICAS = ["replica1", "replica2"]
+
+
+@override_settings(DATABASE_REPLICAS=REPLICAS)
+class PrimaryReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+
+    def test_read_from_replica(self):
+        self.assertIn(self.router.db_for_read(Product), REPLICAS)
+
+    def test_write_to_primary(self):
+        self.assertEqual(self.router.db_for_write(Product), DEFAULT_DB_ALIAS)
+
+    def test_read_from_primary_when_pinned(self):
+        with use_primary():
+            self.assertEqual(self.router.db_for_read(Product), DEFAULT_DB_ALIAS)
+        self.assertIn(self.router.db_for_read(Product), REPLICAS)
+
+    @patch("core.db.routers.connections")
+    def test_read_from_primary_in_transaction(self, mock_connections):
+        mock_connections[DEFAULT_DB_ALIAS].in_atomic_block = True
+        self.assertEqual(self.router.db_for_read(Product), DEFAULT_DB_ALIAS)
+
+    def test_read_related_from_instance_database(self):
+        product = Product()
+        product._state.db = "replica2"
+        self.assertEqual(self.router.db_for_read(Product, instance=product), "replica2")
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_read_from_primary_without_replicas(self):
+        self.assertEqual(self.router.db_for_read(Product), DEFAULT_DB_ALIAS)
+
+    def test_migrate_primary_only(self):
+        self.assertTrue(self.router.allow_migrate(DEFAULT_DB_ALIAS, "product"))
+        self.assertFalse(self.router.allow_migrate("replica1", "product"))
+
+
+@override_settings(DATABASE_REPLICAS=REPLICAS, DB_PRIMARY_STICKY_SECONDS=5)
+class PrimaryStickinessMiddlewareTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.router = PrimaryReplicaRouter()
+
+    def get_response(self, status=200, has_writes=None):
+        """Return middleware remembering database chosen for reads by the view"""
+
+        def view(request):
+            self.read_db = self.router.db_for_read(Product)
+            response = HttpResponse(status=status)
+            if has_writes is not None:
+                response.has_writes = has_writes
+            return response
+
+        return PrimaryStickinessMiddleware(view)
+
+    def test_write_reads_primary_and_sets_cookie(self):
+        res = self.get_response()(self.factory.post("/"))
+
+        self.assertEqual(self.read_db, DEFAULT_DB_ALIAS)
+        self.assertEqual(res.cookies[PRIMARY_COOKIE]["max-age"], 5)
+
+    def test_failed_write_sets_no_cookie(self):
+        res = self.get_response(status=400)(self.factory.post("/"))
+
+        self.assertNotIn(PRIMARY_COOKIE, res.cookies)
+
+    def test_read_after_write_sticks_to_primary(self):
+        request = self.factory.get("/")
+        request.COOKIES[PRIMARY_COOKIE] = "1"
+        self.get_response()(request)
+
+        self.assertEqual(self.read_db, DEFAULT_DB_ALIAS)
+
+    def test_read_with_header_sticks_to_primary(self):
+        self.get_response()(self.factory.get("/", HTTP_X_DB_PRIMARY="1"))
+
+        self.assertEqual(self.read_db, DEFAULT_DB_ALIAS)
+
+    def test_read_from_replica(self):
+        res = self.get_response()(self.factory.get("/"))
+
+        self.assertIn(self.read_db, REPLICAS)
+        self.assertNotIn(PRIMARY_COOKIE, res.cookies)
+
+    def test_batch_routed_by_sub_requests(self):
+        """Test batch POST isn't taken as a write by itself"""
+        res = self.get_response(has_writes=False)(self.factory.post(reverse("batch")))
+
+        self.assertIn(self.read_db, REPLICAS)
+        self.assertNotIn(PRIMARY_COOKIE, res.cookies)
+
+    def test_batch_with_writes_sets_cookie(self):
+        res = self.get_response(has_writes=True)(self.factory.post(reverse("batch")))
+
+        self.assertEqual(res.cookies[PRIMARY_COOKIE]["max-age"], 5)
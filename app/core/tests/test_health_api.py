@@ -0,0 +1,43 @@
+from unittest.mock import patch
+from django.db import OperationalError
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from core import warmup
+
+HEALTHZ_URL = reverse("healthz")
+READYZ_URL = reverse("readyz")
+
+
+class HealthAPITests(TestCase):
+    """Test liveness and readiness probes"""
+
+    # Readiness checks every configured database, replicas included
+    databases = "__all__"
+
+    def test_healthz(self):
+        with self.assertNumQueries(0):
+            res = self.client.get(HEALTHZ_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json(), {"status": "ok"})
+
+    @patch("core.warmup._is_warm", False)
+    @patch("core.warmup.build_serializers", wraps=warmup.build_serializers)
+    def test_readyz_warms_up_once(self, build_serializers):
+        """Test readiness warms up the process on the first call only"""
+        res = self.client.get(READYZ_URL)
+        self.client.get(READYZ_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()["status"], "ok")
+        build_serializers.assert_called_once()
+
+    @patch("core.warmup.open_connections", side_effect=OperationalError)
+    @patch("core.warmup._is_warm", False)
+    def test_readyz_db_unavailable(self, open_connections):
+        """Test readiness fails while db is unavailable"""
+        res = self.client.get(READYZ_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(res.json(), {"status": "unavailable"})
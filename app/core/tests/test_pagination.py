@@ -0,0 +1,99 @@
+from unittest.mock import patch
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.test import TestCase
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from core.pagination import EstimatedCountPagination
+from product.models import Product
+from product.tests.test_models import create_category, create_product
+
+
+def make_request(**params):
+    return Request(APIRequestFactory().get("/products/", params))
+
+
+@patch.object(EstimatedCountPagination, "estimate_threshold", 1000)
+class EstimatedCountPaginationTests(TestCase):
+    """Test counting rows of paginated lists"""
+
+    def setUp(self):
+        self.paginator = EstimatedCountPagination()
+        category = create_category()
+        for i in range(4):
+            create_product(category, name=f"product {i}")
+        self.queryset = Product.objects.order_by("id")
+
+    def test_exact_count(self):
+        with self.assertNumQueries(2):
+            page = self.paginator.paginate_queryset(self.queryset, make_request())
+        data = self.paginator.get_paginated_response(page).data
+
+        self.assertEqual(len(page), 4)
+        self.assertEqual(data["count"], 4)
+        self.assertTrue(data["count_is_exact"])
+        self.assertIsNone(data["next"])
+
+    @patch.object(EstimatedCountPagination, "count_cap", 2)
+    def test_capped_count(self):
+        """Test rows are counted up to the cap past the offset"""
+        queryset = self.queryset.filter(name__startswith="product")
+        page = self.paginator.paginate_queryset(queryset, make_request(limit=2))
+        data = self.paginator.get_paginated_response(page).data
+
+        self.assertEqual(data["count"], 2)
+        self.assertFalse(data["count_is_exact"])
+        self.assertIn("offset=2", data["next"])
+
+        paginator = EstimatedCountPagination()
+        paginator.paginate_queryset(queryset, make_request(limit=2, offset=2))
+        data = paginator.get_paginated_response(page).data
+
+        self.assertEqual(data["count"], 4)
+        self.assertTrue(data["count_is_exact"])
+        self.assertIsNone(data["next"])
+
+    def test_estimated_count(self):
+        """Test unfiltered list of big table takes estimated count"""
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE product_product")
+        self.paginator.estimate_threshold = 3
+        with self.assertNumQueries(2):
+            page = self.paginator.paginate_queryset(self.queryset, make_request())
+        data = self.paginator.get_paginated_response(page).data
+
+        self.assertEqual(data["count"], 4)
+        self.assertFalse(data["count_is_exact"])
+        self.assertEqual(len(page), 4)
+
+    def test_estimated_count_past_end(self):
+        """Test empty page past the end doesn't raise estimated count"""
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE product_product")
+        self.paginator.estimate_threshold = 3
+        page = self.paginator.paginate_queryset(self.queryset, make_request(offset=100))
+
+        self.assertEqual(page, [])
+        self.assertEqual(self.paginator.count, 4)
+        self.assertFalse(self.paginator.count_is_exact)
+
+    def test_filtered_not_estimated(self):
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE product_product")
+        self.paginator.estimate_threshold = 3
+        queryset = self.queryset.filter(name="product 1")
+        self.paginator.paginate_queryset(queryset, make_request())
+
+        self.assertEqual(self.paginator.count, 1)
+        self.assertTrue(self.paginator.count_is_exact)
+
+    @patch.object(EstimatedCountPagination, "count_cap", 2)
+    def test_async_capped_count(self):
+        queryset = self.queryset.filter(name__startswith="product")
+        page = async_to_sync(self.paginator.apaginate_queryset)(
+            queryset, make_request(limit=3)
+        )
+
+        self.assertEqual(len(page), 3)
+        self.assertEqual(self.paginator.count, 3)
+        self.assertFalse(self.paginator.count_is_exact)
@@ -0,0 +1,231 @@
+import os
+import traceback
+from contextlib import ExitStack
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.test import TestCase
+from django.urls import URLPattern, get_resolver, reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from product.tests.test_models import create_category, create_product, create_review
+from product.views import CategoryViewSet, ProductViewSet, ReviewViewSet
+from user.models import Cart
+from user.tests.test_models import (
+    create_address,
+    create_cartitem,
+    create_user,
+    create_wishitem,
+)
+from user.views import CartItemViewSet, UserListRetrieveViewSet, WishItemViewSet
+
+# Number of rows of the list compared with one row
+ROWS_COUNT = 5
+
+# Max number of frames reported along with the query and the modules
+# whose frames are skipped
+STACK_LIMIT = 10
+SKIPPED_FRAME_PATHS = [
+    os.path.join("django", "db", ""),
+    os.path.join("django", "test", ""),
+    os.path.join("asgiref", ""),
+]
+
+# Max number of queries of read actions of the viewsets, requested by
+# authenticated user. Lists take count and page queries
+QUERY_BUDGETS = {
+    CategoryViewSet: {"list": 2, "retrieve": 1},
+    # Detail is read from the cache, "is_wished" flag takes one query
+    ProductViewSet: {"list": 2, "retrieve": 2},
+    ReviewViewSet: {"list": 2, "retrieve": 1},
+    UserListRetrieveViewSet: {"list": 2, "retrieve": 1},
+    CartItemViewSet: {"list": 2, "retrieve": 1},
+    WishItemViewSet: {"list": 2, "retrieve": 1},
+}
+
+
+def create_categories(user, count):
+    return [create_category(f"category{i}") for i in range(count)]
+
+
+def create_products(user, count):
+    category = create_category()
+    return [create_product(category) for _ in range(count)]
+
+
+def create_reviews(user, count):
+    product = create_product(create_category())
+    return [
+        create_review(create_user(email=f"reviewer{i}@example.com"), product)
+        for i in range(count)
+    ]
+
+
+def create_users(user, count):
+    return [
+        create_user(email=f"user{i}@example.com", address=create_address())
+        for i in range(count)
+    ]
+
+
+def create_cartitems(user, count):
+    cart = Cart.objects.create(user=user)
+    return [create_cartitem(cart, product) for product in create_products(user, count)]
+
+
+def create_wishitems(user, count):
+    return [create_wishitem(user, product) for product in create_products(user, count)]
+
+
+# Functions creating rows listed by the viewsets
+ROW_FACTORIES = {
+    CategoryViewSet: create_categories,
+    ProductViewSet: create_products,
+    ReviewViewSet: create_reviews,
+    UserListRetrieveViewSet: create_users,
+    CartItemViewSet: create_cartitems,
+    WishItemViewSet: create_wishitems,
+}
+
+
+def get_read_endpoints(patterns=None, namespace=None):
+    """Return {(viewset, action): url name} of list and retrieve routes"""
+    endpoints = {}
+    for pattern in patterns or get_resolver().url_patterns:
+        if not isinstance(pattern, URLPattern):
+            pattern_namespace = pattern.namespace or namespace
+            endpoints.update(
+                get_read_endpoints(pattern.url_patterns, pattern_namespace)
+            )
+            continue
+
+        actions = getattr(pattern.callback, "actions", {})
+        if actions.get("get") in ["list", "retrieve"]:
+            name = f"{namespace}:{pattern.name}" if namespace else pattern.name
+            endpoints[(pattern.callback.cls, actions["get"])] = name
+    return endpoints
+
+
+class QueryRecorder:
+    """Record queries of all db connections along with their stack traces"""
+
+    def __init__(self):
+        self.queries = []
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        for connection in connections.all():
+            self._stack.enter_context(connection.execute_wrapper(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stack.close()
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries.append((sql, traceback.extract_stack()[:-1]))
+        return execute(sql, params, many, context)
+
+    def __len__(self):
+        return len(self.queries)
+
+    def format(self):
+        """Return queries with stack traces of the code making them"""
+        lines = []
+        for number, (sql, stack) in enumerate(self.queries, 1):
+            lines.append(f"{number}. {sql}")
+            for frame in get_caller_frames(stack):
+                lines.append(f"    {frame.filename}:{frame.lineno} in {frame.name}")
+                lines.append(f"      {frame.line}")
+        return "\n".join(lines)
+
+
+def get_caller_frames(stack, limit=STACK_LIMIT):
+    """
+    Return the innermost frames of the request handling, skipping
+    the test client and the ORM internals
+    """
+    test_frames = [i for i, frame in enumerate(stack) if frame.filename == __file__]
+    start = test_frames[-1] + 1 if test_frames else 0
+    frames = [
+        frame
+        for frame in stack[start:]
+        if not any(path in frame.filename for path in SKIPPED_FRAME_PATHS)
+    ]
+    return frames[-limit:]
+
+
+class QueryBudgetTests(TestCase):
+    """
+    Test read endpoints stay within query budgets and lists take
+    the same number of queries for one and many rows
+    """
+
+    def setUp(self):
+        self.user = create_user(email="budget@example.com")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.endpoints = get_read_endpoints()
+
+    def test_endpoints_have_budgets(self):
+        """Test every list and retrieve endpoint has query budget"""
+        for viewset, action in self.endpoints:
+            with self.subTest(viewset=viewset.__name__, action=action):
+                self.assertIn(action, QUERY_BUDGETS.get(viewset, {}))
+                self.assertIn(viewset, ROW_FACTORIES)
+        # Budgets of removed endpoints are dropped too
+        self.assertEqual(
+            {viewset for viewset, _ in self.endpoints},
+            set(QUERY_BUDGETS),
+        )
+
+    def test_list_queries(self):
+        for (viewset, action), name in self.endpoints.items():
+            if action != "list":
+                continue
+            with self.subTest(viewset=viewset.__name__):
+                one_row = self.record(viewset, name, 1)
+                many_rows = self.record(viewset, name, ROWS_COUNT)
+
+                self.assertEqual(
+                    len(one_row),
+                    len(many_rows),
+                    f"{len(many_rows) - len(one_row)} more queries listing "
+                    f"{ROWS_COUNT} rows than one row:\n{many_rows.format()}",
+                )
+                self.assertQueriesWithin(many_rows, QUERY_BUDGETS[viewset]["list"])
+
+    def test_retrieve_queries(self):
+        for (viewset, action), name in self.endpoints.items():
+            if action != "retrieve":
+                continue
+            with self.subTest(viewset=viewset.__name__):
+                queries = self.record(viewset, name, ROWS_COUNT, detail=True)
+
+                self.assertQueriesWithin(queries, QUERY_BUDGETS[viewset]["retrieve"])
+
+    def record(self, viewset, name, count, detail=False):
+        """
+        Create rows and return queries of the request to the endpoint.
+        Rows are rolled back after the request
+        """
+        with transaction.atomic():
+            rows = ROW_FACTORIES[viewset](self.user, count)
+            kwargs = {}
+            if detail:
+                lookup = viewset.lookup_url_kwarg or viewset.lookup_field
+                kwargs[lookup] = rows[-1].pk
+            url = reverse(name, kwargs=kwargs)
+            cache.clear()
+
+            with QueryRecorder() as queries:
+                res = self.client.get(url)
+            transaction.set_rollback(True)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK, url)
+        return queries
+
+    def assertQueriesWithin(self, queries, budget):
+        self.assertLessEqual(
+            len(queries),
+            budget,
+            f"{len(queries)} queries over budget of {budget}:\n{queries.format()}",
+        )
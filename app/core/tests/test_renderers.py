@@ -0,0 +1,106 @@
+import datetime
+import uuid
+from decimal import Decimal
+from io import BytesIO
+from unittest import skipUnless
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from core.parsers import FastJSONParser, MessagePackParser
+from core.renderers import (
+    FastJSONRenderer,
+    MessagePackRenderer,
+    RawJSONList,
+    msgpack,
+)
+
+DATA = {
+    "id": 1,
+    "name": "Żółw  ",
+    "price": "10.50",
+    "rating": 4.5,
+    "properties": {"color": "red"},
+    "tags": ["a", "b"],
+    "image": None,
+    "is_wished": True,
+}
+
+
+class FastJSONRendererTests(SimpleTestCase):
+    def test_same_output_as_drf(self):
+        """Test output is the same as of DRF renderer"""
+        data = {**DATA, "lazy": gettext_lazy("text"), "total": Decimal("1.5")}
+        res = FastJSONRenderer().render(data)
+
+        self.assertEqual(res, JSONRenderer().render(data))
+
+    def test_native_types(self):
+        key = uuid.uuid4()
+        res = FastJSONRenderer().render({"key": key, 1: 2})
+
+        self.assertEqual(res, b'{"key":"%s","1":2}' % str(key).encode())
+
+    def test_datetimes_as_drf(self):
+        """Test datetimes are encoded as DRF does"""
+        created_at = datetime.datetime(
+            2024, 1, 2, 3, 4, 5, 678901, tzinfo=datetime.timezone.utc
+        )
+        data = {
+            "created_at": created_at,
+            "date": created_at.date(),
+            "time": created_at.time(),
+        }
+        res = FastJSONRenderer().render(data)
+
+        self.assertEqual(res, JSONRenderer().render(data))
+
+    def test_non_finite_floats(self):
+        """Test NaN and infinity are output as null unlike DRF raises"""
+        data = {"nan": float("nan"), "inf": float("inf"), "ninf": float("-inf")}
+        res = FastJSONRenderer().render(data)
+
+        self.assertEqual(res, b'{"nan":null,"inf":null,"ninf":null}')
+        with self.assertRaises(ValueError):
+            JSONRenderer().render(data)
+
+    def test_indented_output(self):
+        res = FastJSONRenderer().render(DATA, "application/json; indent=4")
+
+        self.assertEqual(res, JSONRenderer().render(DATA, "application/json; indent=4"))
+
+    def test_none(self):
+        self.assertEqual(FastJSONRenderer().render(None), b"")
+
+    def test_raw_json_list(self):
+        """Test raw fragments are spliced and decoded for other renderers"""
+        data = {"count": 2, "results": RawJSONList(['{"id":1}', '{"id":2}'])}
+        expected = b'{"count":2,"results":[{"id":1},{"id":2}]}'
+
+        self.assertEqual(FastJSONRenderer().render(data), expected)
+        self.assertEqual(JSONRenderer().render(data), expected)
+        self.assertEqual(data["results"], [{"id": 1}, {"id": 2}])
+
+
+class FastJSONParserTests(SimpleTestCase):
+    def test_parse(self):
+        res = FastJSONParser().parse(BytesIO(JSONRenderer().render(DATA)))
+
+        self.assertEqual(res, DATA)
+
+    def test_parse_error(self):
+        with self.assertRaises(ParseError):
+            FastJSONParser().parse(BytesIO(b'{"id": '))
+
+
+@skipUnless(msgpack, "msgpack is not installed")
+class MessagePackTests(SimpleTestCase):
+    def test_render_and_parse(self):
+        data = {**DATA, "total": Decimal("1.5")}
+        res = MessagePackParser().parse(BytesIO(MessagePackRenderer().render(data)))
+
+        self.assertEqual(res, {**DATA, "total": 1.5})
+
+    def test_parse_error(self):
+        with self.assertRaises(ParseError):
+            MessagePackParser().parse(BytesIO(b"\xc1"))
@@ -0,0 +1,72 @@
+from decimal import Decimal
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+from core.serializers import compile_serializer
+from product.models import Category, Product, Review
+from product.serializers import (
+    CategorySerializer,
+    ProductDetailSerializer,
+    ProductSerializer,
+    ReviewSerializer,
+)
+from product.tests.test_models import create_category, create_product, create_review
+from user.models import Cart, CartItem
+from user.serializers import CartItemExpandedSerializer
+from user.tests.test_models import create_cartitem, create_user
+
+
+class CompiledSerializerTests(TestCase):
+    """Test compiled serializers give the same output as DRF ones"""
+
+    def setUp(self):
+        self.request = APIRequestFactory().get("/")
+        self.category = create_category()
+        self.product = create_product(
+            self.category,
+            price=Decimal("10.5"),
+            properties={"color": "red"},
+        )
+        Product.objects.filter(pk=self.product.pk).update(image="uploads/a.jpg")
+        create_product(self.category, name="no image", brand="")
+
+    def assertSameOutput(self, serializer_class, queryset):
+        """Assert compiled serializer renders the same JSON as DRF one"""
+        context = {"request": self.request}
+        compiled = compile_serializer(serializer_class)
+        rows = queryset.values_list(*compiled.fields)
+        expected = serializer_class(queryset, many=True, context=context).data
+
+        data = compiled.to_representation(rows, context)
+
+        self.assertEqual(JSONRenderer().render(data), JSONRenderer().render(expected))
+
+    def test_product_serializers(self):
+        queryset = Product.objects.order_by("id")
+        self.assertSameOutput(ProductSerializer, queryset)
+        self.assertSameOutput(ProductDetailSerializer, queryset)
+
+    def test_category_serializer(self):
+        self.assertSameOutput(CategorySerializer, Category.objects.all())
+
+    def test_review_serializer(self):
+        create_review(create_user(), self.product, commentary="good")
+        self.assertSameOutput(ReviewSerializer, Review.objects.order_by("id"))
+
+    def test_nested_serializer(self):
+        cart = Cart.objects.create(user=create_user())
+        create_cartitem(cart, self.product, quantity=2)
+        self.assertSameOutput(CartItemExpandedSerializer, CartItem.objects.all())
+
+    def test_not_compilable_field(self):
+        class MethodSerializer(serializers.ModelSerializer):
+            title = serializers.SerializerMethodField()
+
+            class Meta:
+                model = Product
+                fields = ["id", "title"]
+
+        with self.assertRaises(ImproperlyConfigured):
+            compile_serializer(MethodSerializer)
@@ -0,0 +1,385 @@
+import asyncio
+from asgiref.sync import markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist, ValidationError
+from django.db import DatabaseError, connections
+from django.http import Http404, JsonResponse
+from django.utils.functional import classproperty
+from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiTypes
+from rest_framework import permissions, views
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+from authentication.backends import (
+    CachedTokenAuthentication,
+    SignedTokenAuthentication,
+)
+from .batch import get_response_body, has_writes, run_batch
+from .db.pool import get_pools_stats
+from .serializers import (
+    SubRequestSerializer,
+    SubResponseSerializer,
+    compile_serializer,
+    expand_serializer,
+    get_expandable_fields,
+    get_only_fields,
+    get_readable_fields,
+    get_related_lookups,
+    make_expanded_field,
+)
+from .warmup import ensure_warm
+
+
+class AsyncAPIViewMixin:
+    """
+    Let DRF view handlers be coroutines. Authentication, permission and
+    throttle checks and sync handlers run in a worker thread,
+    so they don't block the event loop
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            handler = self.get_handler(request)
+            if asyncio.iscoroutinefunction(handler):
+                response = await handler(request, *args, **kwargs)
+            else:
+                response = await sync_to_async(handler)(request, *args, **kwargs)
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    def get_handler(self, request):
+        if request.method.lower() in self.http_method_names:
+            return getattr(self, request.method.lower(), self.http_method_not_allowed)
+        return self.http_method_not_allowed
+
+
+class AsyncReadViewSetMixin(AsyncAPIViewMixin):
+    """
+    Serve viewset actions which have "a"-prefixed coroutine versions
+    (e.g. "alist" for "list") on the event loop when ASYNC_READ_VIEWS is on.
+    Other actions run in a worker thread. When it's off the viewset is sync
+    """
+
+    # Set per view function by as_view(), so it doesn't change after
+    is_async_view = False
+
+    @classproperty
+    def view_is_async(cls):
+        return settings.ASYNC_READ_VIEWS
+
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        is_async = cls.view_is_async
+        view = super().as_view(actions, is_async_view=is_async, **initkwargs)
+        # ViewSet's view doesn't mark itself as async like Django views do
+        if is_async:
+            markcoroutinefunction(view)
+        return view
+
+    def dispatch(self, request, *args, **kwargs):
+        if self.is_async_view:
+            return super().dispatch(request, *args, **kwargs)
+        return super(AsyncAPIViewMixin, self).dispatch(request, *args, **kwargs)
+
+    def get_handler(self, request):
+        handler = super().get_handler(request)
+        return getattr(self, f"a{self.action}", None) or handler
+
+    async def aget_object(self):
+        """Async version of get_object()"""
+        queryset = await self.afilter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        filter_kwargs = {self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        try:
+            obj = await queryset.aget(**filter_kwargs)
+        except (ObjectDoesNotExist, TypeError, ValueError, ValidationError):
+            raise Http404
+        self.check_object_permissions(self.request, obj)
+        return obj
+
+    async def afilter_queryset(self, queryset):
+        # Filters may query db while validating params (e.g. model choices)
+        return await sync_to_async(self.filter_queryset)(queryset)
+
+    async def apaginate_queryset(self, queryset):
+        if self.paginator is None:
+            return None
+        apaginate_queryset = getattr(self.paginator, "apaginate_queryset", None)
+        if apaginate_queryset is None:
+            return await sync_to_async(self.paginate_queryset)(queryset)
+        return await apaginate_queryset(queryset, self.request, self)
+
+    async def alist(self, request, *args, **kwargs):
+        """Async version of ListModelMixin.list()"""
+        queryset = await self.afilter_queryset(self.get_queryset())
+
+        page = await self.apaginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        serializer = self.get_serializer([obj async for obj in queryset], many=True)
+        return Response(serializer.data)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        """Async version of RetrieveModelMixin.retrieve()"""
+        instance = await self.aget_object()
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data)
+
+
+class CompiledListMixin:
+    """
+    Serve "list" action with compiled version of the list serializer,
+    representing `.values_list()` rows instead of model instances
+    """
+
+    def get_compiled_serializer_class(self):
+        """Return serializer class to compile or None to serialize instances"""
+        return self.get_serializer_class()
+
+    def get_compiled_field_names(self):
+        """Return frozenset of field names to output or None for all of them"""
+        return None
+
+    def get_compiled_serializer(self):
+        serializer_class = self.get_compiled_serializer_class()
+        if serializer_class is None:
+            return None
+        return compile_serializer(serializer_class, self.get_compiled_field_names())
+
+    def list(self, request, *args, **kwargs):
+        compiled = self.get_compiled_serializer()
+        if compiled is None:
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = queryset.values_list(*compiled.fields)
+        context = self.get_serializer_context()
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            data = compiled.to_representation(page, context)
+            return self.get_paginated_response(data)
+
+        return Response(compiled.to_representation(rows, context))
+
+    async def alist(self, request, *args, **kwargs):
+        compiled = self.get_compiled_serializer()
+        if compiled is None:
+            return await super().alist(request, *args, **kwargs)
+        queryset = await self.afilter_queryset(self.get_queryset())
+        rows = queryset.values_list(*compiled.fields)
+        context = self.get_serializer_context()
+
+        page = await self.apaginate_queryset(rows)
+        if page is not None:
+            data = compiled.to_representation(page, context)
+            return self.get_paginated_response(data)
+
+        data = compiled.to_representation([row async for row in rows], context)
+        return Response(data)
+
+
+class SparseFieldsMixin:
+    """
+    Let clients limit fields of read responses by comma separated names
+    in "?fields=" (fields to output) and "?omit=" (fields to skip) params.
+    Model fields which aren't output are deferred, so they aren't fetched
+    """
+
+    def get_sparse_fields(self):
+        """Return frozenset of field names to output or None for all of them"""
+        request = getattr(self, "request", None)
+        if request is None or request.method not in SAFE_METHODS:
+            return None
+        fields = split_param(request.query_params.get("fields"))
+        omit = split_param(request.query_params.get("omit"))
+        if not fields and not omit:
+            return None
+
+        names = get_readable_fields(self.get_serializer_class())
+        return frozenset(
+            name
+            for name in names
+            if (not fields or name in fields) and name not in omit
+        )
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        field_names = self.get_sparse_fields()
+        if field_names is not None:
+            fields = getattr(serializer, "child", serializer).fields
+            for name in list(fields):
+                if name not in field_names:
+                    fields.pop(name)
+        return serializer
+
+    def get_compiled_field_names(self):
+        return self.get_sparse_fields()
+
+    # Applied to the final queryset, so that annotations are known
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        field_names = self.get_sparse_fields()
+        if field_names is None:
+            return queryset
+        only = get_only_fields(self.get_serializer_class(), field_names, queryset)
+        return queryset if only is None else queryset.only(*only)
+
+
+class ExpandFieldsMixin:
+    """
+    Let clients replace related ids with nested objects in read responses
+    by comma separated names in "?expand=" param. Serializers declare
+    expandable fields as {name: serializer class} in Meta.expandable_fields.
+    Related objects are loaded by the same query (single relations) or
+    one more query per relation (many relations), whatever the page size
+    """
+
+    def get_expand_fields(self):
+        """Return {name: serializer class} of fields to expand"""
+        request = getattr(self, "request", None)
+        if request is None or request.method not in SAFE_METHODS:
+            return {}
+        names = split_param(request.query_params.get("expand"))
+        if not names:
+            return {}
+
+        expandable = get_expandable_fields(self.get_serializer_class())
+        return {name: expandable[name] for name in expandable if name in names}
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        expand_fields = self.get_expand_fields()
+        if not expand_fields:
+            return queryset
+
+        serializer_class = self.get_serializer_class()
+        select_related, prefetch_related = get_related_lookups(
+            serializer_class, expand_fields, queryset.model
+        )
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        return queryset
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        expand_fields = self.get_expand_fields()
+        if expand_fields:
+            model = self.get_queryset().model
+            fields = getattr(serializer, "child", serializer).fields
+            for name, field in list(fields.items()):
+                if name in expand_fields:
+                    fields[name] = make_expanded_field(
+                        expand_fields[name], field, model
+                    )
+        return serializer
+
+    # Many relations are prefetched, so they need model instances
+    def get_compiled_serializer_class(self):
+        serializer_class = super().get_compiled_serializer_class()
+        expand_fields = self.get_expand_fields()
+        if serializer_class is None or not expand_fields:
+            return serializer_class
+
+        model = self.get_queryset().model
+        _, prefetch_related = get_related_lookups(
+            serializer_class, expand_fields, model
+        )
+        if prefetch_related:
+            return None
+        return expand_serializer(serializer_class, frozenset(expand_fields), model)
+
+
+def split_param(value):
+    """Return set of comma separated values of query param"""
+    return (
+        {item.strip() for item in value.split(",") if item.strip()} if value else set()
+    )
+
+
+class BatchAPIView(views.APIView):
+    """
+    Serve list of sub-requests in one round trip. Sub-requests are dispatched
+    to their views in order, authenticated as the batch request
+    """
+
+    authentication_classes = [SignedTokenAuthentication, CachedTokenAuthentication]
+    permission_classes = [permissions.AllowAny]
+    serializer_class = SubRequestSerializer
+
+    @extend_schema(
+        request=SubRequestSerializer(many=True),
+        responses=SubResponseSerializer(many=True),
+        parameters=[
+            OpenApiParameter(
+                "concurrent",
+                OpenApiTypes.BOOL,
+                description="Serve consecutive GET sub-requests concurrently",
+            ),
+        ],
+    )
+    def post(self, request):
+        serializer = self.serializer_class(
+            data=request.data,
+            many=True,
+            allow_empty=False,
+            max_length=settings.BATCH_API["MAX_REQUESTS"],
+        )
+        serializer.is_valid(raise_exception=True)
+
+        concurrent = request.query_params.get("concurrent", "").lower() == "true"
+        responses = run_batch(request, serializer.validated_data, concurrent)
+        response = Response(
+            [
+                {
+                    "status": sub_response.status_code,
+                    "body": get_response_body(sub_response),
+                }
+                for sub_response in responses
+            ]
+        )
+        # Cookies set by sub-requests (e.g. guest cart key) go to the client
+        for sub_response in responses:
+            response.cookies.update(sub_response.cookies)
+        # Stickiness middleware pins the client to the primary after writes
+        response.has_writes = has_writes(serializer.validated_data, responses)
+        return response
+
+
+def healthz(request):
+    """Liveness probe. Cheap check that the process serves requests"""
+    return JsonResponse({"status": "ok"})
+
+
+def readyz(request):
+    """
+    Readiness probe. Warm the process up on the first call
+    and check db connections with trivial query. Report db pools usage
+    """
+    try:
+        ensure_warm()
+        for connection in connections.all():
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+    except DatabaseError:
+        return JsonResponse({"status": "unavailable"}, status=503)
+
+    data = {"status": "ok"}
+    pools = get_pools_stats()
+    if pools:
+        data["db_pools"] = pools
+    return JsonResponse(data)
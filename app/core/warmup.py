@@ -0,0 +1,63 @@
+import logging
+import threading
+from django.db import connections
+from django.urls import URLPattern, URLResolver, get_resolver
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_is_warm = False
+
+
+def iter_views(patterns):
+    """Yield view classes of url patterns recursively"""
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from iter_views(pattern.url_patterns)
+        elif isinstance(pattern, URLPattern):
+            view_class = getattr(pattern.callback, "cls", None)
+            if view_class is not None:
+                yield view_class
+
+
+def open_connections():
+    for connection in connections.all():
+        connection.ensure_connection()
+
+
+def build_serializers(resolver):
+    """
+    Instantiate serializers of API views and build their fields, which loads
+    lazy imports and model meta caches used by the fields building
+    """
+    serializer_classes = {
+        view_class.serializer_class
+        for view_class in iter_views(resolver.url_patterns)
+        if getattr(view_class, "serializer_class", None) is not None
+    }
+    for serializer_class in serializer_classes:
+        try:
+            serializer_class().fields
+        except Exception:
+            # Some serializers need context, warmup must not fail on them
+            logger.debug("Can't warm up %s", serializer_class, exc_info=True)
+
+
+def warmup():
+    """Prepare the process for the first requests"""
+    open_connections()
+    resolver = get_resolver()
+    # Accessing reverse dict populates the resolver
+    resolver.reverse_dict
+    build_serializers(resolver)
+
+
+def ensure_warm():
+    """Run warmup once per process"""
+    global _is_warm
+    if _is_warm:
+        return
+    with _lock:
+        if not _is_warm:
+            warmup()
+            _is_warm = True
@@ -0,0 +1,100 @@
+from django.conf import settings
+from django.db.models import Count, F, Window
+from django.db.models.functions import RowNumber
+from core.cache import ObjectCache
+from .models import Category, Product, Review
+from .serializers import (
+    CategorySerializer,
+    ProductDetailSerializer,
+    ProductPageReviewSerializer,
+)
+
+RATINGS = range(1, 6)
+
+
+class ProductCache(ObjectCache):
+    url_fields = ["image"]
+
+
+class ProductReviewsCache(ObjectCache):
+    """
+    Review summary (count and histogram by rating) and the most recent
+    reviews of products, keyed by product id
+    """
+
+    def _fetch(self, pks):
+        data = {
+            pk: {
+                "review_summary": {
+                    "count": 0,
+                    "histogram": {rating: 0 for rating in RATINGS},
+                },
+                "reviews": [],
+            }
+            for pk in pks
+        }
+
+        counts = (
+            self.get_queryset()
+            .filter(product_id__in=pks)
+            .values_list("product_id", "rating")
+            .annotate(count=Count("id"))
+            .order_by()
+        )
+        for product_id, rating, count in counts:
+            summary = data[product_id]["review_summary"]
+            summary["count"] += count
+            summary["histogram"][rating] = count
+
+        # The most recent reviews of all the products by one query
+        reviews = (
+            self.get_queryset()
+            .filter(product_id__in=pks)
+            .select_related("user")
+            .annotate(
+                row_number=Window(
+                    RowNumber(),
+                    partition_by=F("product_id"),
+                    order_by=[F("created_at").desc(), F("id").desc()],
+                )
+            )
+            .filter(row_number__lte=settings.PRODUCT_PAGE_REVIEWS)
+            .order_by("product_id", "row_number")
+        )
+        for review in reviews:
+            review_data = self.serializer_class(review, context={}).data
+            data[review.product_id]["reviews"].append(review_data)
+        return data
+
+    def _for_request(self, data, request):
+        data = dict(data)
+        if request is not None:
+            data["reviews"] = [
+                self._review_for_request(review, request) for review in data["reviews"]
+            ]
+        return data
+
+    @staticmethod
+    def _review_for_request(review, request):
+        user = review["user"]
+        if not user["profile_photo"]:
+            return review
+        photo = request.build_absolute_uri(user["profile_photo"])
+        return {**review, "user": {**user, "profile_photo": photo}}
+
+
+product_cache = ProductCache(
+    "product",
+    Product.objects.all(),
+    ProductDetailSerializer,
+)
+category_cache = ObjectCache(
+    "category",
+    Category.objects.all(),
+    CategorySerializer,
+)
+product_reviews_cache = ProductReviewsCache(
+    "product-reviews",
+    Review.objects.all(),
+    ProductPageReviewSerializer,
+)
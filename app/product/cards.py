@@ -0,0 +1,56 @@
+from core.renderers import FastJSONRenderer, RawJSONList
+from .models import Product, ProductCard
+from .serializers import ProductSerializer
+
+# Cards keep relative image URL which is made absolute for the request
+RELATIVE_IMAGE_URL = '"image":"/'
+
+
+def render_card(product):
+    """Return list representation of the product encoded to JSON"""
+    return FastJSONRenderer().render(ProductSerializer(product).data).decode()
+
+
+def save_cards(products):
+    """Render and store cards of the products with one query"""
+    cards = [
+        ProductCard(product_id=product.pk, content=render_card(product))
+        for product in products
+    ]
+    ProductCard.objects.bulk_create(
+        cards,
+        update_conflicts=True,
+        unique_fields=["product"],
+        update_fields=["content"],
+    )
+    return {card.product_id: card.content for card in cards}
+
+
+def get_card_list(rows, request):
+    """
+    Return cards of (product id, card content[, is_wished]) rows as raw
+    JSON list for the request. Cards missing yet are rendered and stored
+    """
+    missing_ids = [row[0] for row in rows if row[1] is None]
+    contents = {}
+    if missing_ids:
+        contents = save_cards(Product.objects.filter(pk__in=missing_ids))
+
+    image_url = f'"image":"{request.build_absolute_uri("/")}'
+    fragments = []
+    for row in rows:
+        content = row[1] or contents.get(row[0])
+        # Product was deleted after it was listed
+        if content is None:
+            continue
+        content = content.replace(RELATIVE_IMAGE_URL, image_url, 1)
+        if len(row) > 2:
+            is_wished = "true" if row[2] else "false"
+            content = f'{content[:-1]},"is_wished":{is_wished}}}'
+        fragments.append(content)
+    return RawJSONList(fragments)
+
+
+def cards_missing(rows):
+    """Whether some of rows have no card rendered yet"""
+    return any(row[1] is None for row in rows)
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.30 on 2026-10-19 08:50
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("product", "0002_alter_product_properties"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProductCard",
+            fields=[
+                (
+                    "product",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="card",
+                        serialize=False,
+                        to="product.product",
+                    ),
+                ),
+                ("content", models.TextField()),
+            ],
+        ),
+    ]
@@ -78,6 +78,21 @@ class Product(models.Model):
         super().save(*args, **kwargs)
 
 
+class ProductCard(models.Model):
+    """
+    Product representation of the list pre-rendered to JSON on write,
+    with relative image URL
+    """
+
+    product = models.OneToOneField(
+        to=Product,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="card",
+    )
+    content = models.TextField()
+
+
 class Review(models.Model):
     rating = models.IntegerField(
         validators=[MinValueValidator(1), MaxValueValidator(5)],
@@ -0,0 +1,41 @@
+from django.db.models import Exists, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from .cache import category_cache, product_cache, product_reviews_cache
+from .models import Product
+from user.models import CartItem, WishItem
+
+
+def get_product_page(product_id, request):
+    """
+    Return data of the product page or None if the product doesn't exist.
+    Anonymous parts are read from the caches, which take one query each
+    on miss. User's flags are loaded by one query
+    """
+    product = product_cache.get(product_id, request)
+    if product is None:
+        return None
+
+    page = {
+        "product": product,
+        "category": category_cache.get(product["category"], request),
+        **product_reviews_cache.get(product["id"], request),
+    }
+    if request.user.is_authenticated:
+        page.update(get_user_flags(request.user, product["id"]))
+    return page
+
+
+def get_user_flags(user, product_id):
+    """Return whether the user wished the product and its quantity in cart"""
+    wishitems = WishItem.objects.filter(user=user, product=OuterRef("pk"))
+    cartitems = CartItem.objects.filter(cart__user=user, product=OuterRef("pk"))
+    flags = (
+        Product.objects.filter(pk=product_id)
+        .annotate(
+            is_wished=Exists(wishitems),
+            cart_quantity=Coalesce(Subquery(cartitems.values("quantity")[:1]), 0),
+        )
+        .values("is_wished", "cart_quantity")
+        .first()
+    )
+    return flags or {"is_wished": False, "cart_quantity": 0}
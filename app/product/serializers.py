@@ -1,3 +1,4 @@
+from django.contrib.auth import get_user_model
 from rest_framework import serializers
 from .models import Category, Product, Review
 
@@ -37,6 +38,26 @@ class ProductDetailSerializer(ProductSerializer):
             "created_at",
             "updated_at",
         ]
+        # Related objects clients can ask to output by "?expand="
+        expandable_fields = {"category": CategorySerializer}
+
+
+class WishedProductSerializer(ProductSerializer):
+    """Extended to flag products wished by the user"""
+
+    is_wished = serializers.BooleanField(read_only=True)
+
+    class Meta(ProductSerializer.Meta):
+        fields = ProductSerializer.Meta.fields + ["is_wished"]
+
+
+class WishedProductDetailSerializer(ProductDetailSerializer):
+    """Extended to flag the product wished by the user"""
+
+    is_wished = serializers.BooleanField(read_only=True)
+
+    class Meta(ProductDetailSerializer.Meta):
+        fields = ProductDetailSerializer.Meta.fields + ["is_wished"]
 
 
 # Simplified one to return only product id and image in response
@@ -48,6 +69,14 @@ class ProductImageSerializer(serializers.ModelSerializer):
         extra_kwargs = {"image": {"required": True}}
 
 
+# Public data of review author
+class ReviewUserSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = get_user_model()
+        fields = ["id", "name", "profile_photo"]
+        read_only_fields = fields
+
+
 class ReviewSerializer(serializers.ModelSerializer):
     class Meta:
         model = Review
@@ -62,6 +91,10 @@ class ReviewSerializer(serializers.ModelSerializer):
         ]
 
         read_only_fields = ["id", "user", "created_at", "updated_at"]
+        expandable_fields = {
+            "user": ReviewUserSerializer,
+            "product": ProductSerializer,
+        }
 
     def validate(self, attrs):
         # Get default user from request
@@ -80,3 +113,27 @@ class ReviewSerializer(serializers.ModelSerializer):
     def update(self, instance, validated_data):
         validated_data.pop("product", None)
         return super().update(instance, validated_data)
+
+
+# Recent review with author's public data for the product page
+class ProductPageReviewSerializer(ReviewSerializer):
+    user = ReviewUserSerializer(read_only=True)
+
+
+class ReviewSummarySerializer(serializers.Serializer):
+    count = serializers.IntegerField()
+    histogram = serializers.DictField(
+        child=serializers.IntegerField(),
+        help_text="Number of reviews by rating, from 1 to 5",
+    )
+
+
+class ProductPageSerializer(serializers.Serializer):
+    """Data of the product page. User's flags are output when authenticated"""
+
+    product = ProductDetailSerializer()
+    category = CategorySerializer()
+    review_summary = ReviewSummarySerializer()
+    reviews = ProductPageReviewSerializer(many=True)
+    is_wished = serializers.BooleanField(required=False)
+    cart_quantity = serializers.IntegerField(required=False)
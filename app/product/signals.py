@@ -1,7 +1,11 @@
+from django.contrib.auth import get_user_model
 from django.dispatch import receiver
 from django.db.models import Avg
 from django.db.models.signals import m2m_changed, post_save, post_delete
-from .models import Product, Review
+from django.utils import timezone
+from .cache import category_cache, product_cache, product_reviews_cache
+from .cards import save_cards
+from .models import Category, Product, Review
 
 
 # Update product rating whenever review for it saved or deleted
@@ -13,6 +17,47 @@ def update_product_rating(sender, instance, **kwargs):
     avg_rating_dict = reviews.aggregate(Avg("rating"))
     avg_rating = avg_rating_dict["rating__avg"]
 
-    # If average rating is None or 0 then set 0
+    # If average rating is None or 0 then set 0.
+    # Update the column only, with no validation of the whole product
     product.rating = avg_rating or 0
-    product.save()
+    product.updated_at = timezone.now()
+    Product.objects.filter(pk=product.pk).update(
+        rating=product.rating,
+        updated_at=product.updated_at,
+    )
+    product_cache.invalidate(product.pk)
+    save_cards([product])
+
+
+# Keep pre-rendered list card of the product up to date
+@receiver(post_save, sender=Product)
+def save_product_card(sender, instance, **kwargs):
+    save_cards([instance])
+
+
+# Drop cached representations of changed products and categories
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_product_cache(sender, instance, **kwargs):
+    product_cache.invalidate(instance.pk)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_cache(sender, instance, **kwargs):
+    category_cache.invalidate(instance.pk)
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def invalidate_product_reviews_cache(sender, instance, **kwargs):
+    product_reviews_cache.invalidate(instance.product_id)
+
+
+# Reviews of the product page show authors' names and photos
+@receiver(post_save, sender=get_user_model())
+def invalidate_reviewed_products_cache(sender, instance, created, **kwargs):
+    if created or not instance.has_changed("name", "profile_photo"):
+        return
+    reviews = Review.objects.filter(user=instance)
+    product_reviews_cache.invalidate_many(reviews.values_list("product_id", flat=True))
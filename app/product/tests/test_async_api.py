@@ -0,0 +1,115 @@
+import asyncio
+from asgiref.sync import async_to_sync
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, force_authenticate
+from .test_models import create_category, create_product, create_review
+from product.models import Category, Review
+from product.serializers import (
+    CategorySerializer,
+    ProductSerializer,
+    ProductDetailSerializer,
+    ReviewSerializer,
+    WishedProductSerializer,
+)
+from product.views import CategoryViewSet, ProductViewSet, ReviewViewSet
+from user.tests.test_models import create_user, create_wishitem
+
+
+@override_settings(ASYNC_READ_VIEWS=True)
+class AsyncReadAPITests(TestCase):
+    """Test read endpoints served by async views"""
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.category = create_category()
+        self.prod1 = create_product(self.category)
+        self.prod2 = create_product(self.category, name="other")
+
+    def call_view(self, view, request, **kwargs):
+        self.assertTrue(asyncio.iscoroutinefunction(view))
+        res = async_to_sync(view)(request, **kwargs)
+        return res.render()
+
+    def test_list_products(self):
+        view = ProductViewSet.as_view({"get": "list"})
+        request = self.factory.get("/", {"limit": 1, "offset": 1})
+        res = self.call_view(view, request)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["count"], 2)
+        self.assertEqual(
+            res.data["results"], ProductSerializer([self.prod2], many=True).data
+        )
+
+    def test_list_filtered_products_wished_by_user(self):
+        """Test filters and annotations apply to async list"""
+        user = create_user()
+        create_wishitem(user, self.prod1)
+        create_product(create_category("other"))
+        view = ProductViewSet.as_view({"get": "list"})
+        request = self.factory.get("/", {"category__in": self.category.id})
+        force_authenticate(request, user)
+        res = self.call_view(view, request)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [product["id"] for product in res.data["results"]],
+            [self.prod1.id, self.prod2.id],
+        )
+        self.assertEqual(
+            [product["is_wished"] for product in res.data["results"]], [True, False]
+        )
+        self.assertEqual(
+            set(res.data["results"][0]), set(WishedProductSerializer.Meta.fields)
+        )
+
+    def test_retrieve_product(self):
+        view = ProductViewSet.as_view({"get": "retrieve"})
+        res = self.call_view(view, self.factory.get("/"), pk=self.prod1.id)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, ProductDetailSerializer(self.prod1).data)
+
+    def test_retrieve_missing_product(self):
+        view = ProductViewSet.as_view({"get": "retrieve"})
+        res = self.call_view(view, self.factory.get("/"), pk=0)
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_list_categories(self):
+        view = CategoryViewSet.as_view({"get": "list"})
+        res = self.call_view(view, self.factory.get("/"))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["results"], [CategorySerializer(self.category).data])
+
+    def test_list_reviews(self):
+        user = create_user()
+        create_review(user, self.prod1)
+        view = ReviewViewSet.as_view({"get": "list"})
+        res = self.call_view(view, self.factory.get("/", {"product": self.prod1.id}))
+
+        reviews = Review.objects.order_by("id")
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["results"], ReviewSerializer(reviews, many=True).data)
+
+    def test_write_action_runs_sync_handler(self):
+        """Test actions with no async version still work"""
+        admin = create_user(email="admin@example.com", is_staff=True)
+        view = CategoryViewSet.as_view({"post": "create"})
+        request = self.factory.post("/", {"name": "new"})
+        force_authenticate(request, admin)
+        res = self.call_view(view, request)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(Category.objects.filter(name="new").exists())
+
+    @override_settings(ASYNC_READ_VIEWS=False)
+    def test_sync_views_when_disabled(self):
+        view = ProductViewSet.as_view({"get": "list"})
+        res = view(self.factory.get("/")).render()
+
+        self.assertFalse(asyncio.iscoroutinefunction(view))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["count"], 2)
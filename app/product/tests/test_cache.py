@@ -0,0 +1,150 @@
+from unittest.mock import patch
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from .test_models import create_category, create_product, create_review
+from core.db.routers import PrimaryReplicaRouter
+from product.cache import category_cache, product_cache
+from product.serializers import ProductDetailSerializer
+from user.tests.test_models import create_user, create_wishitem
+
+
+def get_product_detail_url(product_id):
+    return reverse("product:product-detail", kwargs={"pk": product_id})
+
+
+def get_category_detail_url(category_id):
+    return reverse("product:category-detail", kwargs={"pk": category_id})
+
+
+class ObjectCacheTests(TestCase):
+    """Test versioned cache of serialized objects"""
+
+    def setUp(self):
+        cache.clear()
+        self.category = create_category()
+        self.prod1 = create_product(self.category)
+        self.prod2 = create_product(self.category, name="other")
+
+    def test_get_many(self):
+        """Test many objects are fetched with one query and then cached"""
+        with self.assertNumQueries(1):
+            data = product_cache.get_many([self.prod1.id, self.prod2.id, 0])
+
+        self.assertEqual(list(data), [self.prod1.id, self.prod2.id])
+        self.assertEqual(data[self.prod1.id], ProductDetailSerializer(self.prod1).data)
+
+        with self.assertNumQueries(0), patch.object(
+            cache, "get_many", wraps=cache.get_many
+        ) as get_many:
+            self.assertEqual(
+                product_cache.get_many([self.prod1.id, self.prod2.id]), data
+            )
+        # One round trip for versions and one for data
+        self.assertEqual(get_many.call_count, 2)
+
+    def test_product_save_invalidates(self):
+        product_cache.get(self.prod1.id)
+        self.prod1.name = "new name"
+        self.prod1.save()
+
+        self.assertEqual(product_cache.get(self.prod1.id)["name"], "new name")
+
+    def test_product_delete_invalidates(self):
+        product_cache.get(self.prod1.id)
+        self.prod1.delete()
+
+        self.assertIsNone(product_cache.get(self.prod1.id))
+
+    def test_rating_update_invalidates(self):
+        product_cache.get(self.prod1.id)
+        create_review(create_user(), self.prod1, rating=4)
+
+        self.assertEqual(product_cache.get(self.prod1.id)["rating"], 4)
+
+    def test_category_save_invalidates(self):
+        category_cache.get(self.category.id)
+        self.category.name = "new name"
+        self.category.save()
+
+        self.assertEqual(category_cache.get(self.category.id)["name"], "new name")
+
+    def test_invalidate_many(self):
+        """Test versions of many objects are set with one round trip"""
+        data = product_cache.get_many([self.prod1.id, self.prod2.id])
+        with patch.object(cache, "set_many", wraps=cache.set_many) as set_many:
+            with self.captureOnCommitCallbacks(execute=True):
+                product_cache.invalidate_many([self.prod1.id, self.prod2.id])
+        # Now and once more on commit
+        self.assertEqual(set_many.call_count, 2)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                product_cache.get_many([self.prod1.id, self.prod2.id]), data
+            )
+
+    def test_invalidated_again_on_commit(self):
+        """Test version changes on commit, so data read before it isn't served"""
+        product_cache.get(self.prod1.id)
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            product_cache.invalidate(self.prod1.id)
+        # Reader caches data before the change is committed
+        product_cache.get(self.prod1.id)
+        for callback in callbacks:
+            callback()
+
+        with self.assertNumQueries(1):
+            product_cache.get(self.prod1.id)
+
+    @override_settings(DATABASE_REPLICAS=["replica1"])
+    def test_fetch_from_primary(self):
+        """Test cache is filled from the primary, not a lagging replica"""
+        with patch.object(PrimaryReplicaRouter, "db_for_read", return_value="replica1"):
+            data = product_cache.get(self.prod1.id)
+
+        self.assertEqual(data["id"], self.prod1.id)
+
+
+class CachedDetailAPITests(TestCase):
+    """Test detail endpoints served from the cache"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.category = create_category()
+        self.product = create_product(self.category)
+
+    def test_retrieve_product_from_cache(self):
+        url = get_product_detail_url(self.product.id)
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            res = self.client.get(url)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, ProductDetailSerializer(self.product).data)
+
+    def test_retrieve_missing_product(self):
+        res = self.client.get(get_product_detail_url(0))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_retrieve_wished_product(self):
+        """Test "is_wished" flag is added to cached representation"""
+        user = create_user()
+        create_wishitem(user, self.product)
+        self.client.force_authenticate(user)
+        res = self.client.get(get_product_detail_url(self.product.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.data["is_wished"])
+
+    def test_retrieve_category_from_cache(self):
+        url = get_category_detail_url(self.category.id)
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            res = self.client.get(url)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {"id": self.category.id, "name": self.category.name})
@@ -0,0 +1,104 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient, APIRequestFactory
+from .test_models import create_category, create_product, create_review
+from product.cards import render_card
+from product.models import Product, ProductCard
+from product.serializers import ProductSerializer, WishedProductSerializer
+from user.tests.test_models import create_user, create_wishitem
+
+PRODUCT_LIST_URL = reverse("product:product-list")
+
+
+class ProductCardTests(TestCase):
+    """Test product cards pre-rendered on write"""
+
+    def setUp(self):
+        self.category = create_category()
+        self.product = create_product(self.category)
+
+    def test_card_saved_on_create(self):
+        card = ProductCard.objects.get(product=self.product)
+
+        self.assertEqual(card.content, render_card(self.product))
+
+    def test_card_updated_on_save(self):
+        self.product.name = "new name"
+        self.product.save()
+        card = ProductCard.objects.get(product=self.product)
+
+        self.assertIn('"name":"new name"', card.content)
+
+    def test_card_updated_on_rating_change(self):
+        create_review(create_user(), self.product, rating=4)
+        card = ProductCard.objects.get(product=self.product)
+
+        self.assertIn('"rating":4.0', card.content)
+
+
+class ProductCardListAPITests(TestCase):
+    """Test product list assembled of cards"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.category = create_category()
+        self.prod1 = create_product(self.category)
+        self.prod2 = create_product(self.category, name="other")
+        Product.objects.filter(pk=self.prod1.pk).update(image="uploads/a.jpg")
+        self.prod1.refresh_from_db()
+        self.prod1.save()
+
+    def get_expected_content(self, serializer_class, request):
+        products = Product.objects.all().order_by("id")
+        if serializer_class is WishedProductSerializer:
+            for product in products:
+                product.is_wished = product.pk == self.prod1.pk
+        results = serializer_class(products, many=True, context={"request": request})
+        data = {
+            "count": 2,
+            "count_is_exact": True,
+            "next": None,
+            "previous": None,
+            "results": results.data,
+        }
+        return JSONRenderer().render(data)
+
+    def test_list_same_as_serializer(self):
+        """Test list is byte-identical to the serialized one"""
+        res = self.client.get(PRODUCT_LIST_URL)
+        request = APIRequestFactory().get(PRODUCT_LIST_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.content, self.get_expected_content(ProductSerializer, request)
+        )
+        self.assertIn(b'"image":"http://testserver/', res.content)
+
+    def test_list_wished(self):
+        user = create_user()
+        create_wishitem(user, self.prod1)
+        self.client.force_authenticate(user)
+        res = self.client.get(PRODUCT_LIST_URL)
+        request = APIRequestFactory().get(PRODUCT_LIST_URL)
+
+        self.assertEqual(
+            res.content, self.get_expected_content(WishedProductSerializer, request)
+        )
+
+    def test_missing_card_rendered(self):
+        ProductCard.objects.filter(product=self.prod2).delete()
+        res = self.client.get(PRODUCT_LIST_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data["results"]), 2)
+        self.assertTrue(ProductCard.objects.filter(product=self.prod2).exists())
+
+    @override_settings(PRODUCT_CARDS_ENABLED=False)
+    def test_cards_disabled(self):
+        ProductCard.objects.all().delete()
+        res = self.client.get(PRODUCT_LIST_URL)
+
+        self.assertEqual(len(res.data["results"]), 2)
+        self.assertFalse(ProductCard.objects.exists())
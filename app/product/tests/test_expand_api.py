@@ -0,0 +1,115 @@
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import serializers, status
+from rest_framework.test import APIClient, APIRequestFactory
+from .test_models import create_category, create_product, create_review
+from core.serializers import expand_serializer, get_related_lookups
+from product.models import Category, Review
+from product.serializers import (
+    CategorySerializer,
+    ProductSerializer,
+    ReviewUserSerializer,
+)
+from user.tests.test_models import create_user
+
+REVIEW_LIST_URL = reverse("product:review-list")
+
+
+def get_product_detail_url(product_id):
+    return reverse("product:product-detail", kwargs={"pk": product_id})
+
+
+def get_review_detail_url(review_id):
+    return reverse("product:review-detail", kwargs={"pk": review_id})
+
+
+class ExpandAPITests(TestCase):
+    """Test replacing related ids with objects by "expand" param"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.request = APIRequestFactory().get("/")
+        self.category = create_category()
+        self.product = create_product(self.category)
+
+    def create_reviews(self, count, start=0):
+        for i in range(start, start + count):
+            user = create_user(email=f"user{i}@example.com", name=f"user{i}")
+            create_review(user, self.product)
+
+    def test_retrieve_expanded_product(self):
+        """Test category is loaded by the same query"""
+        url = get_product_detail_url(self.product.id)
+        with self.assertNumQueries(1):
+            res = self.client.get(url, {"expand": "category"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["category"], CategorySerializer(self.category).data)
+
+    def test_list_expanded_reviews(self):
+        """Test number of queries doesn't depend on the page size"""
+        self.create_reviews(2)
+        with self.assertNumQueries(2):
+            self.client.get(REVIEW_LIST_URL, {"expand": "user,product"})
+
+        self.create_reviews(5, start=2)
+        with self.assertNumQueries(2):
+            res = self.client.get(REVIEW_LIST_URL, {"expand": "user,product"})
+
+        review = Review.objects.order_by("id").first()
+        data = res.data["results"][0]
+        context = {"request": self.request}
+        self.assertEqual(len(res.data["results"]), 7)
+        self.assertEqual(
+            data["user"], ReviewUserSerializer(review.user, context=context).data
+        )
+        self.assertEqual(
+            data["product"], ProductSerializer(self.product, context=context).data
+        )
+        self.assertNotIn("email", data["user"])
+
+    def test_retrieve_expanded_review(self):
+        self.create_reviews(1)
+        review = Review.objects.get()
+        url = get_review_detail_url(review.id)
+        with self.assertNumQueries(1):
+            res = self.client.get(url, {"expand": "user", "fields": "id,user"})
+
+        self.assertEqual(
+            res.data,
+            {"id": review.id, "user": ReviewUserSerializer(review.user).data},
+        )
+
+    def test_unknown_fields_ignored(self):
+        self.create_reviews(1)
+        res = self.client.get(REVIEW_LIST_URL, {"expand": "rating,unknown"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["results"][0]["rating"], 5)
+
+
+class ExpandSerializerTests(TestCase):
+    """Test expanding many relations"""
+
+    class CategoryProductsSerializer(serializers.ModelSerializer):
+        class Meta:
+            model = Category
+            fields = ["id", "products"]
+            expandable_fields = {"products": ProductSerializer}
+
+        products = serializers.PrimaryKeyRelatedField(
+            source="product_set", many=True, read_only=True
+        )
+
+    def test_many_relation_prefetched(self):
+        category = create_category()
+        product = create_product(category)
+        serializer_class = expand_serializer(
+            self.CategoryProductsSerializer, frozenset(["products"]), Category
+        )
+
+        lookups = get_related_lookups(serializer_class, ["products"], Category)
+        data = serializer_class(category).data
+
+        self.assertEqual(lookups, ([], ["product_set"]))
+        self.assertEqual(data["products"], [ProductSerializer(product).data])
@@ -11,6 +11,7 @@ from rest_framework.test import APIClient
 from .test_models import create_category, create_product
 from product.models import Product
 from product.serializers import ProductSerializer, ProductDetailSerializer
+from user.models import WishItem
 
 PRODUCT_LIST_URL = reverse("product:product-list")
 
@@ -150,6 +151,57 @@ class PublicProductAPITests(TestCase):
         self.assertFalse(product_exists)
 
 
+class WishedProductAPITests(TestCase):
+    """Test products are flagged as wished for authenticated user"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user("test@example.com")
+        self.client.force_authenticate(self.user)
+        category = create_category()
+        self.wished = create_product(category)
+        self.other = create_product(category)
+        WishItem.objects.create(user=self.user, product=self.wished)
+
+    def test_list_products_is_wished(self):
+        """Test listing products flags wished ones with one query"""
+        with self.assertNumQueries(2):
+            res = self.client.get(PRODUCT_LIST_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        is_wished = {p["id"]: p["is_wished"] for p in res.data["results"]}
+        self.assertEqual(is_wished, {self.wished.id: True, self.other.id: False})
+        products = Product.objects.all().order_by("id")
+        for product, data in zip(products, res.data["results"]):
+            data.pop("is_wished")
+            self.assertEqual(data, ProductSerializer(product).data)
+
+    def test_retrieve_product_is_wished(self):
+        """Test retrieving wished product"""
+        url = get_product_detail_url(self.wished.id)
+        res = self.client.get(url)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.data["is_wished"])
+
+    def test_is_wished_limited_to_user(self):
+        """Test products wished by other user aren't flagged"""
+        other_user = get_user_model().objects.create_user("other@example.com")
+        WishItem.objects.create(user=other_user, product=self.other)
+
+        url = get_product_detail_url(self.other.id)
+        res = self.client.get(url)
+
+        self.assertFalse(res.data["is_wished"])
+
+    def test_no_is_wished_when_unauthenticated(self):
+        """Test anonymous users don't get the flag"""
+        res = APIClient().get(PRODUCT_LIST_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotIn("is_wished", res.data["results"][0])
+
+
 class PrivateProductAPITests(TestCase):
     """Test authenticated admin requests"""
 
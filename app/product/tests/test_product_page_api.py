@@ -0,0 +1,138 @@
+from unittest.mock import patch
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from core.db.routers import PrimaryReplicaRouter
+from .test_models import create_category, create_product, create_review
+from product.cache import product_reviews_cache
+from product.serializers import CategorySerializer, ProductDetailSerializer
+from user.models import Cart
+from user.tests.test_models import create_cartitem, create_user, create_wishitem
+
+
+def get_product_page_url(product_id):
+    return reverse("product:product-page", kwargs={"pk": product_id})
+
+
+class ProductPageAPITests(TestCase):
+    """Test aggregated data of the product page"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.category = create_category()
+        self.product = create_product(self.category)
+        self.users = [
+            create_user(email=f"user{i}@example.com", name=f"user{i}") for i in range(3)
+        ]
+        for user, rating in zip(self.users, [5, 4, 5]):
+            create_review(user, self.product, rating=rating)
+
+    def test_anonymous_page(self):
+        """Test page is built by fixed number of queries and then cached"""
+        url = get_product_page_url(self.product.id)
+        # Product, category, review counts and recent reviews
+        with self.assertNumQueries(4):
+            res = self.client.get(url)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.product.refresh_from_db()
+        self.assertEqual(
+            res.data["product"],
+            ProductDetailSerializer(self.product).data,
+        )
+        self.assertEqual(res.data["category"], CategorySerializer(self.category).data)
+        self.assertEqual(
+            res.data["review_summary"],
+            {"count": 3, "histogram": {1: 0, 2: 0, 3: 0, 4: 1, 5: 2}},
+        )
+        self.assertNotIn("is_wished", res.data)
+        self.assertNotIn("cart_quantity", res.data)
+
+        with self.assertNumQueries(0):
+            cached_res = self.client.get(url)
+        self.assertEqual(cached_res.json(), res.json())
+
+    @override_settings(PRODUCT_PAGE_REVIEWS=2)
+    def test_recent_reviews(self):
+        """Test the most recent reviews are output with author names"""
+        other_product = create_product(self.category)
+        create_review(self.users[0], other_product)
+
+        res = self.client.get(get_product_page_url(self.product.id))
+
+        reviews = res.data["reviews"]
+        self.assertEqual(
+            [review["user"]["name"] for review in reviews],
+            ["user2", "user1"],
+        )
+        self.assertEqual(
+            {review["product"] for review in reviews},
+            {self.product.id},
+        )
+
+    def test_authenticated_page(self):
+        """Test user's flags are loaded by one more query"""
+        user = self.users[0]
+        cart = Cart.objects.create(user=user)
+        create_cartitem(cart, self.product, quantity=3)
+        create_wishitem(user, self.product)
+        self.client.force_authenticate(user)
+        url = get_product_page_url(self.product.id)
+        self.client.get(url)
+
+        with self.assertNumQueries(1):
+            res = self.client.get(url)
+
+        self.assertTrue(res.data["is_wished"])
+        self.assertEqual(res.data["cart_quantity"], 3)
+
+    def test_authenticated_page_no_flags(self):
+        self.client.force_authenticate(create_user())
+        res = self.client.get(get_product_page_url(self.product.id))
+
+        self.assertFalse(res.data["is_wished"])
+        self.assertEqual(res.data["cart_quantity"], 0)
+
+    def test_review_changes_invalidate(self):
+        """Test new reviews and renamed authors are output"""
+        url = get_product_page_url(self.product.id)
+        self.client.get(url)
+
+        user = create_user(email="new@example.com", name="new")
+        create_review(user, self.product, rating=1)
+        res = self.client.get(url)
+
+        self.assertEqual(res.data["review_summary"]["count"], 4)
+        self.assertEqual(res.data["review_summary"]["histogram"][1], 1)
+        self.assertEqual(res.data["reviews"][0]["user"]["name"], "new")
+
+        user.name = "renamed"
+        user.save()
+        res = self.client.get(url)
+
+        self.assertEqual(res.data["reviews"][0]["user"]["name"], "renamed")
+
+    def test_user_save_keeps_reviews_cache(self):
+        """Test saving reviewer with the same name and photo makes no query"""
+        user = get_user_model().objects.get(pk=self.users[0].pk)
+        user.surname = "new surname"
+        # Only the update itself
+        with self.assertNumQueries(1):
+            user.save()
+
+    def test_product_not_found(self):
+        res = self.client.get(get_product_page_url(self.product.id + 1))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    @override_settings(DATABASE_REPLICAS=["replica1"])
+    def test_reviews_fetched_from_primary(self):
+        """Test reviews cache is filled from the primary"""
+        with patch.object(PrimaryReplicaRouter, "db_for_read", return_value="replica1"):
+            data = product_reviews_cache.get(self.product.id)
+
+        self.assertEqual(data["review_summary"]["count"], 3)
@@ -0,0 +1,90 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from .test_models import create_category, create_product
+from user.models import Cart
+from user.tests.test_models import create_cartitem, create_user
+
+PRODUCT_LIST_URL = reverse("product:product-list")
+CART_ITEM_LIST_URL = reverse("user:cartitem-list")
+
+
+def get_product_detail_url(product_id):
+    return reverse("product:product-detail", kwargs={"pk": product_id})
+
+
+class SparseFieldsAPITests(TestCase):
+    """Test limiting output fields by "fields" and "omit" params"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.category = create_category()
+        self.product = create_product(self.category, description="long text")
+
+    def test_list_fields(self):
+        """Test list outputs only requested fields and doesn't select others"""
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(PRODUCT_LIST_URL, {"fields": "id,name,price"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(res.data["results"][0]), ["id", "name", "price"])
+        self.assertNotIn('"brand"', queries[-1]["sql"])
+
+    def test_retrieve_fields(self):
+        """Test large columns aren't fetched when not requested"""
+        url = get_product_detail_url(self.product.id)
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(url, {"fields": "id,name,image"})
+
+        self.assertEqual(
+            res.data, {"id": self.product.id, "name": "testname", "image": None}
+        )
+        self.assertNotIn('"description"', queries[-1]["sql"])
+        self.assertNotIn('"properties"', queries[-1]["sql"])
+
+    def test_retrieve_omit(self):
+        url = get_product_detail_url(self.product.id)
+        res = self.client.get(url, {"omit": "description,properties"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotIn("description", res.data)
+        self.assertNotIn("properties", res.data)
+        self.assertIn("price", res.data)
+
+    def test_wished_fields(self):
+        """Test annotated field can be requested"""
+        self.client.force_authenticate(create_user())
+        res = self.client.get(PRODUCT_LIST_URL, {"fields": "id,is_wished"})
+
+        self.assertEqual(
+            res.data["results"], [{"id": self.product.id, "is_wished": False}]
+        )
+
+    def test_nested_fields(self):
+        """Test related objects loaded along aren't deferred"""
+        user = create_user()
+        cart = Cart.objects.create(user=user)
+        cartitem = create_cartitem(cart, self.product, quantity=2)
+        self.client.force_authenticate(user)
+        res = self.client.get(CART_ITEM_LIST_URL, {"fields": "id,quantity"})
+        url = reverse("user:cartitem-detail", args=[cartitem.id])
+        res_detail = self.client.get(url, {"omit": "product"})
+
+        self.assertEqual(res.data["results"], [{"id": cartitem.id, "quantity": 2}])
+        self.assertEqual(
+            res_detail.data,
+            {"id": cartitem.id, "cart": cart.id, "quantity": 2},
+        )
+
+    def test_write_not_limited(self):
+        """Test params are ignored by write requests"""
+        self.client.force_authenticate(create_user(is_staff=True))
+        url = get_product_detail_url(self.product.id)
+        res = self.client.patch(f"{url}?fields=id", {"name": "new"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["name"], "new")
+        self.assertIn("price", res.data)
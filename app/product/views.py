@@ -1,12 +1,19 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import Http404
 from django.shortcuts import get_object_or_404
+from django.db.models import Exists, OuterRef
 from rest_framework import filters
 from rest_framework import viewsets
 from rest_framework import mixins
 from rest_framework import permissions
 from rest_framework import status
 from rest_framework.decorators import action
-from rest_framework.authentication import TokenAuthentication
 from rest_framework.response import Response
+from authentication.backends import (
+    CachedTokenAuthentication,
+    SignedTokenAuthentication,
+)
 from drf_spectacular.utils import (
     extend_schema_view,
     extend_schema,
@@ -14,20 +21,42 @@ from drf_spectacular.utils import (
     OpenApiTypes,
 )
 from django_filters.rest_framework import DjangoFilterBackend
+from core.views import (
+    AsyncReadViewSetMixin,
+    CompiledListMixin,
+    ExpandFieldsMixin,
+    SparseFieldsMixin,
+)
 from .serializers import (
     CategorySerializer,
     ProductDetailSerializer,
     ProductSerializer,
     ProductImageSerializer,
+    ProductPageSerializer,
     ReviewSerializer,
+    WishedProductSerializer,
+    WishedProductDetailSerializer,
 )
+from .cache import category_cache, product_cache
+from .cards import cards_missing, get_card_list
 from .models import Category, Product, Review
+from .pages import get_product_page
+from user.models import WishItem
 
 
-class BaseViewSet(viewsets.ModelViewSet):
+class BaseViewSet(
+    ExpandFieldsMixin,
+    SparseFieldsMixin,
+    CompiledListMixin,
+    AsyncReadViewSetMixin,
+    viewsets.ModelViewSet,
+):
     """Basic attributes for category and products"""
 
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [SignedTokenAuthentication, CachedTokenAuthentication]
+
+    # Cache of serialized objects for detail reads
+    object_cache = None
 
     # Permis only admins to create and edit
     def get_permissions(self):
@@ -35,12 +64,31 @@ class BaseViewSet(viewsets.ModelViewSet):
             return [permissions.IsAdminUser()]
         return super().get_permissions()
 
+    # Serve detail from the cache unless filters are given
+    def retrieve(self, request, *args, **kwargs):
+        if self.object_cache is None or request.query_params:
+            return super().retrieve(request, *args, **kwargs)
+        return Response(self.get_cached_data())
+
+    async def aretrieve(self, request, *args, **kwargs):
+        if self.object_cache is None or request.query_params:
+            return await super().aretrieve(request, *args, **kwargs)
+        return Response(await sync_to_async(self.get_cached_data)())
+
+    def get_cached_data(self):
+        """Return cached representation of the requested object"""
+        data = self.object_cache.get(self.kwargs[self.lookup_field], self.request)
+        if data is None:
+            raise Http404
+        return data
+
 
 class CategoryViewSet(BaseViewSet):
     """Manage categories"""
 
     serializer_class = CategorySerializer
     queryset = Category.objects.all().order_by("id")
+    object_cache = category_cache
 
 
 @extend_schema_view(
@@ -64,6 +112,7 @@ class ProductViewSet(BaseViewSet):
 
     serializer_class = ProductDetailSerializer
     queryset = Product.objects.all().order_by("id")
+    object_cache = product_cache
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = {"category": ["in"]}
     ordering_fields = ["price", "rating"]
@@ -86,14 +135,105 @@ class ProductViewSet(BaseViewSet):
 
     #     return queryset
 
+    # Flag products wished by authenticated user with a single subquery
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self._is_wished_included():
+            wishitems = WishItem.objects.filter(
+                user=self.request.user,
+                product=OuterRef("pk"),
+            )
+            queryset = queryset.annotate(is_wished=Exists(wishitems))
+        return queryset
+
     # Change serializer when "list" and "upload_image" actions
     def get_serializer_class(self):
         if self.action == "list":
+            if self._is_wished_included():
+                return WishedProductSerializer
             return ProductSerializer
+        elif self.action == "retrieve" and self._is_wished_included():
+            return WishedProductDetailSerializer
         elif self.action == "upload_image":
             return ProductImageSerializer
         return super().get_serializer_class()
 
+    # Assemble list of the cards pre-rendered on write when they are enabled
+    def list(self, request, *args, **kwargs):
+        if not self._use_cards():
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = queryset.values_list(*self._get_card_fields())
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(get_card_list(page, request))
+        return Response(get_card_list(rows, request))
+
+    async def alist(self, request, *args, **kwargs):
+        if not self._use_cards():
+            return await super().alist(request, *args, **kwargs)
+
+        queryset = await self.afilter_queryset(self.get_queryset())
+        rows = queryset.values_list(*self._get_card_fields())
+        page = await self.apaginate_queryset(rows)
+        rows = page if page is not None else [row async for row in rows]
+        # Cards missing yet are rendered and stored in a worker thread
+        if cards_missing(rows):
+            data = await sync_to_async(get_card_list)(rows, request)
+        else:
+            data = get_card_list(rows, request)
+
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+    def _use_cards(self):
+        """Cards are used when enabled and fields are output as they are"""
+        return (
+            settings.PRODUCT_CARDS_ENABLED
+            and self.get_sparse_fields() is None
+            and not self.get_expand_fields()
+        )
+
+    def _get_card_fields(self):
+        if self._is_wished_included():
+            return ["id", "card__content", "is_wished"]
+        return ["id", "card__content"]
+
+    def get_cached_data(self):
+        data = super().get_cached_data()
+        if self._is_wished_included():
+            data["is_wished"] = WishItem.objects.filter(
+                user=self.request.user,
+                product_id=data["id"],
+            ).exists()
+        return data
+
+    def _is_wished_included(self):
+        """Whether to output "is_wished" flag of products"""
+        return (
+            self.action in ["list", "retrieve"] and self.request.user.is_authenticated
+        )
+
+    # Product page is readable by anyone
+    def get_permissions(self):
+        if self.action == "page":
+            return [permissions.AllowAny()]
+        return super().get_permissions()
+
+    @extend_schema(responses=ProductPageSerializer)
+    @action(["get"], detail=True)
+    def page(self, request, pk):
+        """
+        Product with its category, review summary and the most recent
+        reviews, along with user's wish flag and cart quantity
+        """
+        data = get_product_page(pk, request)
+        if data is None:
+            raise Http404
+        return Response(data)
+
     # Custom action to update specific product's image field
     @action(["post"], detail=True, url_name="upload-image")
     def upload_image(self, request, pk):
@@ -129,10 +269,16 @@ class ProductViewSet(BaseViewSet):
         ]
     )
 )
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(
+    ExpandFieldsMixin,
+    SparseFieldsMixin,
+    CompiledListMixin,
+    AsyncReadViewSetMixin,
+    viewsets.ModelViewSet,
+):
     """Manage reviews"""
 
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [SignedTokenAuthentication, CachedTokenAuthentication]
     serializer_class = ReviewSerializer
     queryset = Review.objects.all().order_by("id")
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
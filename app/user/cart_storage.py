@@ -0,0 +1,120 @@
+from functools import lru_cache
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+from .models import Cart, CartItem
+
+GUEST_CART_COOKIE = "guest_cart"
+GUEST_CART_SALT = "user.guest_cart"
+
+
+class BaseCartStorage:
+    """Storage of cart items represented as {product_id: quantity} dict"""
+
+    def get_items(self, key):
+        raise NotImplementedError
+
+    def add_items(self, key, items):
+        """Add items increasing quantities of the ones already in the cart"""
+        raise NotImplementedError
+
+    def remove_item(self, key, product_id):
+        raise NotImplementedError
+
+    def clear(self, key):
+        raise NotImplementedError
+
+    def add_item(self, key, product_id, quantity):
+        self.add_items(key, {product_id: quantity})
+
+
+class DBCartStorage(BaseCartStorage):
+    """Storage of registered user's cart. Key is the user id"""
+
+    def get_items(self, key):
+        cartitems = CartItem.objects.filter(cart__user_id=key)
+        return dict(cartitems.values_list("product_id", "quantity"))
+
+    def add_items(self, key, items):
+        cart, _ = Cart.objects.get_or_create(user_id=key)
+        CartItem.objects.upsert(cart.id, items)
+
+    def remove_item(self, key, product_id):
+        CartItem.objects.filter(cart__user_id=key, product_id=product_id).delete()
+
+    def clear(self, key):
+        CartItem.objects.filter(cart__user_id=key).delete()
+
+
+class CacheCartStorage(BaseCartStorage):
+    """
+    Storage of guest cart in the key-value cache (redis in production,
+    local memory in tests). Key is random token from the signed cookie
+    """
+
+    def __init__(self):
+        self.cache = caches[settings.GUEST_CART_CACHE]
+        self.timeout = settings.GUEST_CART_TIMEOUT
+
+    def _make_key(self, key):
+        return f"guest-cart:{key}"
+
+    def get_items(self, key):
+        return self.cache.get(self._make_key(key), {})
+
+    def add_items(self, key, items):
+        cart_items = self.get_items(key)
+        for product_id, quantity in items.items():
+            cart_items[product_id] = cart_items.get(product_id, 0) + quantity
+        self.cache.set(self._make_key(key), cart_items, self.timeout)
+
+    def remove_item(self, key, product_id):
+        cart_items = self.get_items(key)
+        if cart_items.pop(product_id, None) is not None:
+            self.cache.set(self._make_key(key), cart_items, self.timeout)
+
+    def clear(self, key):
+        self.cache.delete(self._make_key(key))
+
+
+@lru_cache
+def get_guest_cart_storage():
+    """Return storage configured for guest carts"""
+    return import_string(settings.GUEST_CART_STORAGE)()
+
+
+def get_guest_cart_key(request):
+    """Return guest cart key from the signed cookie or None"""
+    return request.get_signed_cookie(
+        GUEST_CART_COOKIE,
+        default=None,
+        salt=GUEST_CART_SALT,
+    )
+
+
+def set_guest_cart_key(response, key):
+    response.set_signed_cookie(
+        GUEST_CART_COOKIE,
+        key,
+        salt=GUEST_CART_SALT,
+        max_age=settings.GUEST_CART_TIMEOUT,
+        httponly=True,
+        samesite="Lax",
+    )
+
+
+def merge_guest_cart(request, user):
+    """
+    Move guest cart items to the user's cart with one bulk upsert.
+    Return whether there was guest cart to merge
+    """
+    key = get_guest_cart_key(request)
+    if not key:
+        return False
+
+    storage = get_guest_cart_storage()
+    items = storage.get_items(key)
+    if items:
+        DBCartStorage().add_items(user.id, items)
+    storage.clear(key)
+    return True
@@ -0,0 +1,195 @@
+import csv
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+import django
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from user.models import Address, Cart
+
+ADDRESS_FIELDS = ["country", "city", "street", "house", "postal_code"]
+USER_FIELDS = ["name", "surname", "is_staff"]
+
+
+def read_rows(path):
+    """Yield user rows of CSV or JSON Lines file as dicts"""
+    with open(path, newline="", encoding="utf-8") as file:
+        if path.endswith((".jsonl", ".ndjson")):
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from csv.DictReader(file)
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def format_errors(error):
+    """Return validation errors of the row as one line"""
+    return "; ".join(
+        f"{field}: {' '.join(messages)}"
+        for field, messages in error.message_dict.items()
+    )
+
+
+def hash_password(password):
+    # Users imported with no password can't log in until they reset it
+    return make_password(password or None)
+
+
+class Command(BaseCommand):
+    """
+    Django command to import users from CSV or JSON Lines file.
+    Users and their addresses are created with bulk inserts in batches.
+    Rows failing model validation or with emails which exist or repeat are
+    skipped and reported, so they don't abort their batch. No signals are
+    sent. Carts aren't created unless asked for, since they are created on
+    the first use anyway and most of the imported users may never shop
+    """
+
+    help = (
+        "Import users from CSV/JSON Lines file with columns: email, password, "
+        f"{', '.join(USER_FIELDS)}, {', '.join(ADDRESS_FIELDS)}"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--hashed",
+            action="store_true",
+            help="Passwords are already hashed in Django's format",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count(),
+            help="Processes to hash passwords in, 0 to hash in this process",
+        )
+        parser.add_argument(
+            "--with-carts",
+            action="store_true",
+            help=(
+                "Create carts up front. They are created on the first use "
+                "otherwise, so users who never shop take no cart rows"
+            ),
+        )
+
+    def handle(self, *args, **options):
+        if not os.path.isfile(options["path"]):
+            raise CommandError(f"File {options['path']} does not exist")
+        if options["batch_size"] < 1:
+            raise CommandError("Batch size must be positive")
+
+        executor = None
+        if not options["hashed"] and options["workers"] > 0:
+            executor = ProcessPoolExecutor(
+                max_workers=options["workers"],
+                initializer=django.setup,
+            )
+
+        created = skipped = 0
+        try:
+            rows = enumerate(read_rows(options["path"]), 1)
+            for chunk in chunked(rows, options["batch_size"]):
+                numbers, chunk = zip(*chunk)
+                passwords = self._get_password_hashes(chunk, options, executor)
+                chunk_created = self._import_chunk(
+                    numbers, chunk, passwords, options["with_carts"]
+                )
+                created += chunk_created
+                skipped += len(chunk) - chunk_created
+                self.stdout.write(f"Imported {created} users..")
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Created {created} users, skipped {skipped}")
+        )
+
+    def _get_password_hashes(self, chunk, options, executor):
+        passwords = [row.get("password") or "" for row in chunk]
+        if options["hashed"]:
+            for password in passwords:
+                if password:
+                    try:
+                        identify_hasher(password)
+                    except ValueError:
+                        raise CommandError("Password is not hashed in known format")
+            return [password or make_password(None) for password in passwords]
+
+        if executor is None:
+            return [hash_password(password) for password in passwords]
+        chunksize = max(1, len(passwords) // (options["workers"] * 4))
+        return list(executor.map(hash_password, passwords, chunksize=chunksize))
+
+    @transaction.atomic
+    def _import_chunk(self, numbers, chunk, passwords, with_carts):
+        """Insert users of the chunk with their addresses. Return created count"""
+        UserModel = get_user_model()
+        normalize_email = UserModel.objects.normalize_email
+
+        # Skip emails which exist or are repeated in the file
+        emails = [normalize_email(row.get("email") or "") for row in chunk]
+        seen = set(
+            UserModel.objects.filter(email__in=emails).values_list("email", flat=True)
+        )
+        users, addresses = [], []
+        for number, email, password, row in zip(numbers, emails, passwords, chunk):
+            if email in seen:
+                self._skip(number, "email already exists")
+                continue
+
+            user = UserModel(
+                email=email,
+                password=password,
+                name=row.get("name") or "",
+                surname=row.get("surname") or "",
+                is_staff=str(row.get("is_staff", "")).lower() in ("1", "true"),
+            )
+            address = None
+            if all(row.get(field) for field in ADDRESS_FIELDS):
+                address = Address(**{field: row[field] for field in ADDRESS_FIELDS})
+
+            # Invalid row would fail the inserts of the whole chunk
+            try:
+                user.full_clean(
+                    exclude=["address"],
+                    validate_unique=False,
+                    validate_constraints=False,
+                )
+                if address is not None:
+                    address.full_clean()
+            except ValidationError as e:
+                self._skip(number, format_errors(e))
+                continue
+
+            seen.add(email)
+            users.append(user)
+            if address is not None:
+                addresses.append((user, address))
+
+        # Ids are returned by bulk insert, so addresses are related before users
+        Address.objects.bulk_create([address for _, address in addresses])
+        for user, address in addresses:
+            user.address = address
+        UserModel.objects.bulk_create(users)
+
+        if with_carts:
+            Cart.objects.bulk_create(
+                [Cart(user_id=user.id) for user in users],
+                ignore_conflicts=True,
+            )
+        return len(users)
+
+    def _skip(self, number, reason):
+        self.stdout.write(self.style.WARNING(f"Row {number} skipped: {reason}"))
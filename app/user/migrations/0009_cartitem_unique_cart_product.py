@@ -0,0 +1,39 @@
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def merge_duplicate_cartitems(apps, schema_editor):
+    """Merge cart items of the same cart and product before adding constraint"""
+    CartItem = apps.get_model("user", "CartItem")
+    duplicates = (
+        CartItem.objects.values("cart", "product")
+        .annotate(items=Count("id"), total=Sum("quantity"))
+        .filter(items__gt=1)
+    )
+    for duplicate in duplicates:
+        items = CartItem.objects.filter(
+            cart=duplicate["cart"],
+            product=duplicate["product"],
+        ).order_by("id")
+        first = items.first()
+        items.exclude(id=first.id).delete()
+        first.quantity = duplicate["total"]
+        first.save()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0008_wishitem_wishitem_unique_user_product'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            merge_duplicate_cartitems,
+            migrations.RunPython.noop,
+        ),
+        migrations.AddConstraint(
+            model_name='cartitem',
+            constraint=models.UniqueConstraint(fields=('cart', 'product'), name='unique_cart_product'),
+        ),
+    ]
@@ -1,6 +1,6 @@
 import os
 from uuid import uuid4
-from django.db import models
+from django.db import models, connections, router, IntegrityError
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import (
     AbstractBaseUser,
@@ -8,6 +8,7 @@ from django.contrib.auth.models import (
     PermissionsMixin,
 )
 from django.core.validators import MinValueValidator
+from django.db.models.fields.files import FieldFile
 from product.models import Product
 
 
@@ -29,8 +30,8 @@ class Address(models.Model):
 class UserManager(BaseUserManager):
     """User model manager"""
 
-    def create_user(self, email, password=None, **fields):
-        """Create and return user"""
+    def create_user(self, email, password=None, password_hash=None, **fields):
+        """Create and return user. Password can be given already hashed"""
         if not email:
             raise ValueError("User must have an email!")
 
@@ -38,7 +39,10 @@ class UserManager(BaseUserManager):
             email=self.normalize_email(email),
             **fields,
         )
-        user.set_password(password)
+        if password_hash is not None:
+            user.password = password_hash
+        else:
+            user.set_password(password)
         user.save(using=self._db)
         return user
 
@@ -85,16 +89,194 @@ class User(AbstractBaseUser, PermissionsMixin):
     def __str__(self):
         return self.email
 
+    # Values stored in db are kept to find out changed fields with no query
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        user = super().from_db(db, field_names, values)
+        user._loaded_values = dict(zip(field_names, values))
+        return user
+
+    def refresh_from_db(self, using=None, fields=None):
+        super().refresh_from_db(using, fields)
+        self._remember_values(fields)
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._remember_values(kwargs.get("update_fields"))
+
+    def has_changed(self, *fields):
+        """
+        Whether any of the fields differs from the value stored in db.
+        Fields whose stored value isn't known are taken as changed
+        """
+        loaded = getattr(self, "_loaded_values", {})
+        return any(
+            name not in loaded or loaded[name] != self._get_db_value(name)
+            for name in fields
+        )
+
+    def _remember_values(self, fields=None):
+        deferred = self.get_deferred_fields()
+        names = [
+            field.attname
+            for field in self._meta.concrete_fields
+            if field.attname not in deferred
+            and (fields is None or field.name in fields or field.attname in fields)
+        ]
+        self._loaded_values = {
+            **getattr(self, "_loaded_values", {}),
+            **{name: self._get_db_value(name) for name in names},
+        }
+
+    def _get_db_value(self, name):
+        value = getattr(self, name)
+        # Files are stored by name
+        return value.name if isinstance(value, FieldFile) else value
+
 
 class Cart(models.Model):
     user = models.OneToOneField(to=get_user_model(), on_delete=models.CASCADE)
 
 
+class CartItemManager(models.Manager):
+    """Cart item model manager"""
+
+    @property
+    def write_db(self):
+        """Database for raw writing statements (self.db is the one for reads)"""
+        return self._db or router.db_for_write(self.model)
+
+    def upsert(self, cart_id, quantities):
+        """
+        Add products to the cart with one statement. Quantities of the
+        products already in the cart are increased, missing products are skipped.
+        Return list of (id, product_id, quantity) of the affected cart items
+        """
+        if not quantities:
+            return []
+
+        table = self.model._meta.db_table
+        product_table = Product._meta.db_table
+        values = ", ".join(["(%s, %s, %s)"] * len(quantities))
+        params = []
+        for product_id, quantity in quantities.items():
+            params += [cart_id, product_id, quantity]
+
+        sql = f"""
+            INSERT INTO {table} (cart_id, product_id, quantity)
+            SELECT v.cart_id, v.product_id, v.quantity
+            FROM (VALUES {values}) AS v (cart_id, product_id, quantity)
+            JOIN {product_table} p ON p.id = v.product_id
+            ON CONFLICT (cart_id, product_id) DO UPDATE
+            SET quantity = {table}.quantity + EXCLUDED.quantity
+            RETURNING id, product_id, quantity
+        """
+        with connections[self.write_db].cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+
+    def move_from_wishlist(self, cart_id, user_id, product_ids=None):
+        """
+        Add one piece of each wished product (or the given ones only) to
+        the cart with one statement. Products whose stock doesn't cover the
+        new quantity are skipped. Return (moved_ids, skipped_ids)
+        """
+        table = self.model._meta.db_table
+        product_table = Product._meta.db_table
+        wishitem_table = WishItem._meta.db_table
+        params = [cart_id, user_id]
+        product_filter = ""
+        if product_ids is not None:
+            product_filter = "AND w.product_id = ANY(%s)"
+            params.append(list(product_ids))
+        params.append(cart_id)
+
+        sql = f"""
+            WITH wished AS (
+                SELECT w.product_id, p.stock, COALESCE(c.quantity, 0) AS in_cart
+                FROM {wishitem_table} w
+                JOIN {product_table} p ON p.id = w.product_id
+                LEFT JOIN {table} c
+                    ON c.cart_id = %s AND c.product_id = w.product_id
+                WHERE w.user_id = %s {product_filter}
+            ), moved AS (
+                INSERT INTO {table} (cart_id, product_id, quantity)
+                SELECT %s, product_id, 1 FROM wished WHERE stock > in_cart
+                ON CONFLICT (cart_id, product_id) DO UPDATE
+                SET quantity = {table}.quantity + EXCLUDED.quantity
+                RETURNING product_id
+            )
+            SELECT w.product_id, m.product_id IS NOT NULL
+            FROM wished w
+            LEFT JOIN moved m ON m.product_id = w.product_id
+            ORDER BY w.product_id
+        """
+        with connections[self.write_db].cursor() as cursor:
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+
+        moved_ids = [product_id for product_id, moved in rows if moved]
+        skipped_ids = [product_id for product_id, moved in rows if not moved]
+        return moved_ids, skipped_ids
+
+    def sync(self, cart_id, quantities):
+        """
+        Make the cart content equal to the {product_id: quantity} map
+        with one bulk upsert of the changed items and one bulk delete
+        """
+        current = dict(
+            self.filter(cart_id=cart_id)
+            .select_for_update()
+            .values_list("product_id", "quantity")
+        )
+
+        changed = [
+            self.model(cart_id=cart_id, product_id=product_id, quantity=quantity)
+            for product_id, quantity in quantities.items()
+            if current.get(product_id) != quantity
+        ]
+        if changed:
+            self.bulk_create(
+                changed,
+                update_conflicts=True,
+                unique_fields=["cart", "product"],
+                update_fields=["quantity"],
+            )
+
+        removed = set(current) - set(quantities)
+        if removed:
+            self.filter(cart_id=cart_id, product_id__in=removed).delete()
+
+
 class CartItem(models.Model):
     cart = models.ForeignKey(to=Cart, on_delete=models.CASCADE)
     product = models.ForeignKey(to=Product, on_delete=models.CASCADE)
     quantity = models.IntegerField(validators=[MinValueValidator(1)])
 
+    objects = CartItemManager()
+
+    class Meta:
+        constraints = [
+            # Ensure the product takes only one line in the cart
+            models.UniqueConstraint(
+                fields=["cart", "product"], name="unique_cart_product"
+            )
+        ]
+
+    # If there already exists cart item with the same cart and product then
+    # increase the quantity of the existing one instead of creating a new one
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            return super().save(*args, **kwargs)
+
+        manager = CartItem.objects.db_manager(kwargs.get("using"))
+        rows = manager.upsert(self.cart_id, {self.product_id: self.quantity})
+        if not rows:
+            raise IntegrityError(f"Product {self.product_id} doesn't exist!")
+        self.pk, _, self.quantity = rows[0]
+        self._state.adding = False
+        self._state.db = manager.write_db
+
 
 class WishItem(models.Model):
     user = models.ForeignKey(to=get_user_model(), on_delete=models.CASCADE)
@@ -1,9 +1,7 @@
-from django.db import transaction
-from django.db.utils import IntegrityError
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
 from .models import Address, CartItem, WishItem
-from .tests.test_models import create_user
+from product.models import Product
 from product.serializers import ProductSerializer
 
 
@@ -102,6 +100,21 @@ class CartItemSerializer(serializers.ModelSerializer):
         fields = ["id", "cart", "product", "quantity"]
         read_only_fields = ["id", "cart"]
 
+    # Creation merges lines of the same product, update can't do it
+    def validate(self, attrs):
+        product = attrs.get("product")
+        if self.instance is None or product is None:
+            return attrs
+
+        other_items = CartItem.objects.filter(
+            cart_id=self.instance.cart_id, product=product
+        ).exclude(pk=self.instance.pk)
+        if other_items.exists():
+            msg = "This product is already in the cart!"
+            raise serializers.ValidationError(msg)
+
+        return attrs
+
 
 class CartItemExpandedSerializer(CartItemSerializer):
     """Extended to output all product data when list, retrieve actions"""
@@ -109,6 +122,40 @@ class CartItemExpandedSerializer(CartItemSerializer):
     product = ProductSerializer()
 
 
+class CartSyncSerializer(serializers.Serializer):
+    """Complete desired cart content as {product_id: quantity} map"""
+
+    items = serializers.DictField(child=serializers.IntegerField(min_value=1))
+
+    def validate_items(self, value):
+        try:
+            items = {int(product_id): q for product_id, q in value.items()}
+        except ValueError:
+            raise serializers.ValidationError("Keys must be product IDs!")
+
+        # Ensure all products exist with one query
+        existing_ids = Product.objects.filter(id__in=items).values_list("id", flat=True)
+        missing_ids = set(items) - set(existing_ids)
+        if missing_ids:
+            msg = f"These products don't exist: {missing_ids}"
+            raise serializers.ValidationError(msg)
+
+        return items
+
+
+class GuestCartItemSerializer(serializers.Serializer):
+    """Cart item of unauthenticated user kept outside the db"""
+
+    product = serializers.PrimaryKeyRelatedField(queryset=Product.objects.all())
+    quantity = serializers.IntegerField(min_value=1)
+
+
+class GuestCartItemExpandedSerializer(GuestCartItemSerializer):
+    """Extended to output all product data"""
+
+    product = ProductSerializer()
+
+
 class WishItemSerializer(serializers.ModelSerializer):
     class Meta:
         model = WishItem
@@ -128,6 +175,47 @@ class WishItemSerializer(serializers.ModelSerializer):
         return attrs
 
 
+class WishItemBulkSerializer(serializers.Serializer):
+    """List of products to add to or remove from the wishlist at once"""
+
+    products = serializers.ListField(
+        child=serializers.IntegerField(),
+        allow_empty=False,
+    )
+
+    def validate_products(self, value):
+        # Ensure all products exist with one query
+        product_ids = set(value)
+        existing_ids = Product.objects.filter(id__in=product_ids).values_list(
+            "id", flat=True
+        )
+        missing_ids = product_ids - set(existing_ids)
+        if missing_ids:
+            msg = f"These products don't exist: {missing_ids}"
+            raise serializers.ValidationError(msg)
+
+        return sorted(product_ids)
+
+
+class WishItemMoveSerializer(serializers.Serializer):
+    """
+    Products to move from the wishlist to the cart (all wished ones
+    if omitted) and the result of moving
+    """
+
+    products = serializers.ListField(
+        child=serializers.IntegerField(),
+        required=False,
+        write_only=True,
+    )
+    moved = serializers.ListField(child=serializers.IntegerField(), read_only=True)
+    skipped = serializers.ListField(
+        child=serializers.IntegerField(),
+        read_only=True,
+        help_text="Products left in the wishlist due to lack of stock",
+    )
+
+
 class WishItemExpandedSerializer(WishItemSerializer):
     """Extended to output all product data when list, retrieve actions"""
 
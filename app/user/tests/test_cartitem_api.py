@@ -6,8 +6,8 @@ from .test_models import create_user, create_cartitem, create_category, create_p
 from user.models import Cart, CartItem
 from user.serializers import CartItemSerializer, CartItemExpandedSerializer
 
-
 CART_ITEM_LIST_URL = reverse("user:cartitem-list")
+CART_SYNC_URL = reverse("user:cartitem-sync")
 
 
 def get_cartitem_detail_url(cartitem_id):
@@ -30,7 +30,7 @@ class PrivateCartItemAPITests(TestCase):
 
     def setUp(self):
         user = create_user()
-        self.cart = Cart.objects.get(user=user)
+        self.cart = Cart.objects.create(user=user)
         self.client = APIClient()
         self.client.force_authenticate(user=user)
 
@@ -53,7 +53,7 @@ class PrivateCartItemAPITests(TestCase):
     def test_cartitems_limited_to_user(self):
         """Test user can only deal with his own cart items"""
         other_user = create_user("other@example.com")
-        other_cart = Cart.objects.get(user=other_user)
+        other_cart = Cart.objects.create(user=other_user)
 
         category = create_category()
         prod = create_product(category)
@@ -132,6 +132,25 @@ class PrivateCartItemAPITests(TestCase):
         # Ensure original field didn't change
         self.assertNotEqual(cart_item.quantity, payload["quantity"])
 
+    def test_update_to_product_in_cart_error(self):
+        """Test item can't take product of other item in the cart"""
+        category = create_category()
+        prod1 = create_product(category)
+        prod2 = create_product(category)
+        cart_item = create_cartitem(self.cart, prod1)
+        create_cartitem(self.cart, prod2)
+
+        url = get_cartitem_detail_url(cart_item.id)
+        res = self.client.patch(url, {"product": prod2.id})
+
+        cart_item.refresh_from_db()
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(cart_item.product, prod1)
+
+        res = self.client.patch(url, {"product": prod1.id, "quantity": 5})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
     def test_delete_cartitem(self):
         """Test deleting cart item"""
         category = create_category()
@@ -142,3 +161,131 @@ class PrivateCartItemAPITests(TestCase):
         res = self.client.delete(url)
 
         self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+
+
+class LazyCartAPITests(TestCase):
+    """Test requests of the user who has no cart yet"""
+
+    def setUp(self):
+        self.user = create_user()
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_list_without_cart(self):
+        """Test listing cart items doesn't require existing cart"""
+        with self.assertNumQueries(1):
+            res = self.client.get(CART_ITEM_LIST_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["results"], [])
+        self.assertFalse(Cart.objects.filter(user=self.user).exists())
+
+    def test_cart_created_on_first_add(self):
+        """Test the cart is created when the first item is added"""
+        category = create_category()
+        prod = create_product(category)
+
+        payload = {"product": prod.id, "quantity": 1}
+        res = self.client.post(CART_ITEM_LIST_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        cart = Cart.objects.get(user=self.user)
+        self.assertEqual(res.data["cart"], cart.id)
+
+    def test_add_same_product_merges(self):
+        """Test adding product already in the cart increases quantity"""
+        category = create_category()
+        prod = create_product(category)
+
+        payload = {"product": prod.id, "quantity": 2}
+        first = self.client.post(CART_ITEM_LIST_URL, payload)
+        second = self.client.post(CART_ITEM_LIST_URL, payload)
+
+        self.assertEqual(second.data["id"], first.data["id"])
+        self.assertEqual(second.data["quantity"], 4)
+        self.assertEqual(CartItem.objects.filter(product=prod).count(), 1)
+
+
+class CartSyncAPITests(TestCase):
+    """Test replacing the whole cart content"""
+
+    def setUp(self):
+        user = create_user()
+        self.cart = Cart.objects.create(user=user)
+        self.client = APIClient()
+        self.client.force_authenticate(user=user)
+        category = create_category()
+        self.prod1 = create_product(category)
+        self.prod2 = create_product(category)
+        self.prod3 = create_product(category)
+
+    def test_sync_cart(self):
+        """Test cart content becomes equal to the given one"""
+        kept = create_cartitem(self.cart, self.prod1, 1)
+        create_cartitem(self.cart, self.prod2, 2)
+
+        payload = {"items": {self.prod1.id: 1, self.prod3.id: 3}}
+        res = self.client.put(CART_SYNC_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        quantities = dict(self.cart.cartitem_set.values_list("product", "quantity"))
+        self.assertEqual(quantities, {self.prod1.id: 1, self.prod3.id: 3})
+        # Ensure unchanged item is kept as it is
+        self.assertTrue(CartItem.objects.filter(id=kept.id).exists())
+        cart_items = CartItem.objects.filter(cart=self.cart).order_by("id")
+        serializer = CartItemExpandedSerializer(cart_items, many=True)
+        self.assertEqual(res.data, serializer.data)
+
+    def test_sync_updates_quantity(self):
+        """Test quantities of the existing items are replaced"""
+        create_cartitem(self.cart, self.prod1, 1)
+
+        payload = {"items": {self.prod1.id: 5}}
+        res = self.client.put(CART_SYNC_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        cart_item = CartItem.objects.get(cart=self.cart)
+        self.assertEqual(cart_item.quantity, 5)
+
+    def test_sync_empty_cart(self):
+        """Test syncing empty map clears the cart"""
+        create_cartitem(self.cart, self.prod1, 1)
+
+        res = self.client.put(CART_SYNC_URL, {"items": {}}, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, [])
+        self.assertFalse(CartItem.objects.filter(cart=self.cart).exists())
+
+    def test_sync_query_count(self):
+        """Test sync runs fixed number of queries however many items"""
+        create_cartitem(self.cart, self.prod1, 1)
+        create_cartitem(self.cart, self.prod2, 1)
+
+        payload = {"items": {self.prod2.id: 2, self.prod3.id: 3}}
+        # Products check, cart lookup, current items, upsert, delete,
+        # new cart content and two savepoint queries
+        with self.assertNumQueries(8):
+            res = self.client.put(CART_SYNC_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data), 2)
+
+    def test_sync_missing_product_error(self):
+        """Test syncing nonexistent product returns error"""
+        create_cartitem(self.cart, self.prod1, 1)
+
+        payload = {"items": {self.prod1.id: 2, 0: 1}}
+        res = self.client.put(CART_SYNC_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        # Ensure the cart didn't change
+        cart_item = CartItem.objects.get(cart=self.cart)
+        self.assertEqual(cart_item.quantity, 1)
+
+    def test_sync_invalid_quantity_error(self):
+        """Test quantities must be positive"""
+        payload = {"items": {self.prod1.id: 0}}
+        res = self.client.put(CART_SYNC_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
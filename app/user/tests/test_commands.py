@@ -0,0 +1,145 @@
+import csv
+import os
+import tempfile
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from user.models import Address, Cart
+from .test_models import create_user
+
+FIELDS = [
+    "email",
+    "password",
+    "name",
+    "country",
+    "city",
+    "street",
+    "house",
+    "postal_code",
+]
+
+
+class ImportUsersCommandTests(TestCase):
+    """Test import_users command"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "users.csv")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write_rows(self, rows):
+        with open(self.path, "w", newline="") as file:
+            writer = csv.DictWriter(file, FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+
+    def import_users(self, *args):
+        stdout = StringIO()
+        call_command("import_users", self.path, *args, stdout=stdout)
+        return stdout.getvalue()
+
+    def test_import_users_in_batches(self):
+        """Test users are created with addresses batch by batch"""
+        self.write_rows(
+            [
+                {
+                    "email": f"user{i}@example.com",
+                    "password": "testpass",
+                    "name": f"name{i}",
+                    "country": "Country",
+                    "city": "City",
+                    "street": "Street",
+                    "house": i + 1,
+                    "postal_code": "12345",
+                }
+                for i in range(5)
+            ]
+        )
+        # 3 batches with email check, address and user inserts in savepoint
+        with self.assertNumQueries(3 * 5):
+            self.import_users("--batch-size", "2", "--workers", "0")
+
+        users = get_user_model().objects.order_by("id")
+        self.assertEqual(users.count(), 5)
+        self.assertEqual(Address.objects.count(), 5)
+        self.assertTrue(users[0].check_password("testpass"))
+        self.assertEqual(users[4].address.house, 5)
+        self.assertFalse(Cart.objects.exists())
+
+    def test_import_hashed_passwords(self):
+        """Test pre-hashed passwords are stored as is"""
+        password_hash = make_password("testpass")
+        self.write_rows([{"email": "user@example.com", "password": password_hash}])
+        self.import_users("--hashed", "--with-carts")
+
+        user = get_user_model().objects.get(email="user@example.com")
+        self.assertEqual(user.password, password_hash)
+        self.assertIsNone(user.address)
+        self.assertTrue(Cart.objects.filter(user=user).exists())
+
+    def test_import_not_hashed_password_error(self):
+        """Test plain password with --hashed option raises error"""
+        self.write_rows([{"email": "user@example.com", "password": "testpass"}])
+
+        with self.assertRaises(CommandError):
+            self.import_users("--hashed")
+        self.assertFalse(get_user_model().objects.exists())
+
+    def test_import_hashes_in_process_pool(self):
+        """Test plain passwords are hashed by worker processes"""
+        self.write_rows([{"email": "user@example.com", "password": "testpass"}])
+        self.import_users("--workers", "2")
+
+        user = get_user_model().objects.get(email="user@example.com")
+        self.assertTrue(user.check_password("testpass"))
+
+    def test_existing_and_repeated_emails_skipped(self):
+        """Test emails which exist or repeat in the file are skipped"""
+        create_user(email="user@example.com", password="oldpass")
+        self.write_rows(
+            [
+                {"email": "user@example.com", "password": "newpass"},
+                {"email": "new@example.com", "password": "newpass"},
+                {"email": "new@EXAMPLE.com", "password": "otherpass"},
+            ]
+        )
+        self.import_users("--workers", "0")
+
+        self.assertEqual(get_user_model().objects.count(), 2)
+        user = get_user_model().objects.get(email="user@example.com")
+        self.assertTrue(user.check_password("oldpass"))
+        new_user = get_user_model().objects.get(email="new@example.com")
+        self.assertTrue(new_user.check_password("newpass"))
+
+    def test_invalid_rows_skipped(self):
+        """Test invalid rows are reported and don't abort their batch"""
+        address = {
+            "country": "Country",
+            "city": "City",
+            "street": "Street",
+            "postal_code": "12345",
+        }
+        self.write_rows(
+            [
+                {"email": "not-an-email", "password": "testpass"},
+                {"email": "", "password": "testpass"},
+                {"email": "long@example.com", "name": "n" * 101},
+                {"email": "house@example.com", "house": "abc", **address},
+                {"email": "user@example.com", "house": 1, **address},
+            ]
+        )
+        output = self.import_users("--workers", "0")
+
+        user = get_user_model().objects.get()
+        self.assertEqual(user.email, "user@example.com")
+        self.assertEqual(user.address.house, 1)
+        self.assertEqual(Address.objects.count(), 1)
+        for number in range(1, 5):
+            self.assertIn(f"Row {number} skipped: ", output)
+        self.assertNotIn("Row 5 skipped", output)
+        self.assertIn("Created 1 users, skipped 4", output)
@@ -0,0 +1,109 @@
+from django.test import TestCase
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from .test_models import create_user, create_cartitem, create_category, create_product
+from user.models import Cart, CartItem
+from user.cart_storage import GUEST_CART_COOKIE
+
+GUEST_CART_URL = reverse("user:guest-cart")
+CREATE_TOKEN_URL = reverse("authentication:token")
+
+
+class GuestCartAPITests(TestCase):
+    """Test cart requests of unauthenticated user"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        category = create_category()
+        self.prod1 = create_product(category)
+        self.prod2 = create_product(category)
+
+    def test_add_item_to_guest_cart(self):
+        """Test adding item starts guest cart kept in signed cookie"""
+        payload = {"product": self.prod1.id, "quantity": 2}
+        res = self.client.post(GUEST_CART_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertIn(GUEST_CART_COOKIE, res.cookies)
+        self.assertEqual(len(res.data), 1)
+        self.assertEqual(res.data[0]["product"]["id"], self.prod1.id)
+        self.assertEqual(res.data[0]["quantity"], 2)
+        # Ensure nothing is written to the db
+        self.assertFalse(CartItem.objects.exists())
+
+    def test_list_guest_cart(self):
+        """Test listing guest cart sums quantities of the same product"""
+        self.client.post(GUEST_CART_URL, {"product": self.prod1.id, "quantity": 1})
+        self.client.post(GUEST_CART_URL, {"product": self.prod1.id, "quantity": 2})
+        self.client.post(GUEST_CART_URL, {"product": self.prod2.id, "quantity": 1})
+
+        res = self.client.get(GUEST_CART_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        quantities = {i["product"]["id"]: i["quantity"] for i in res.data}
+        self.assertEqual(quantities, {self.prod1.id: 3, self.prod2.id: 1})
+
+    def test_empty_guest_cart(self):
+        """Test listing without cookie returns empty cart"""
+        res = self.client.get(GUEST_CART_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, [])
+
+    def test_tampered_cookie_ignored(self):
+        """Test unsigned cart key is ignored"""
+        self.client.post(GUEST_CART_URL, {"product": self.prod1.id, "quantity": 1})
+        self.client.cookies[GUEST_CART_COOKIE] = "forged-key"
+
+        res = self.client.get(GUEST_CART_URL)
+
+        self.assertEqual(res.data, [])
+
+    def test_remove_item_from_guest_cart(self):
+        """Test removing specific product from guest cart"""
+        self.client.post(GUEST_CART_URL, {"product": self.prod1.id, "quantity": 1})
+        self.client.post(GUEST_CART_URL, {"product": self.prod2.id, "quantity": 1})
+
+        res = self.client.delete(f"{GUEST_CART_URL}?product={self.prod1.id}")
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        res = self.client.get(GUEST_CART_URL)
+        self.assertEqual([i["product"]["id"] for i in res.data], [self.prod2.id])
+
+    def test_remove_invalid_product_error(self):
+        """Test invalid product ID is rejected and cart isn't cleared"""
+        self.client.post(GUEST_CART_URL, {"product": self.prod1.id, "quantity": 1})
+
+        for product_id in ["abc", "-1", ""]:
+            res = self.client.delete(f"{GUEST_CART_URL}?product={product_id}")
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        res = self.client.get(GUEST_CART_URL)
+        self.assertEqual([i["product"]["id"] for i in res.data], [self.prod1.id])
+
+    def test_invalid_quantity_error(self):
+        """Test quantity must be positive"""
+        payload = {"product": self.prod1.id, "quantity": 0}
+        res = self.client.post(GUEST_CART_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_merge_guest_cart_on_login(self):
+        """Test guest cart is merged into the user's cart on login"""
+        credentials = {"email": "test@example.com", "password": "testpass"}
+        user = create_user(**credentials)
+        cart = Cart.objects.create(user=user)
+        create_cartitem(cart, self.prod1, 1)
+
+        self.client.post(GUEST_CART_URL, {"product": self.prod1.id, "quantity": 2})
+        self.client.post(GUEST_CART_URL, {"product": self.prod2.id, "quantity": 1})
+        res = self.client.post(CREATE_TOKEN_URL, credentials)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        quantities = dict(cart.cartitem_set.values_list("product", "quantity"))
+        self.assertEqual(quantities, {self.prod1.id: 3, self.prod2.id: 1})
+        # Ensure guest cart is dropped
+        self.assertEqual(res.cookies[GUEST_CART_COOKIE].value, "")
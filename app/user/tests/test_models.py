@@ -118,12 +118,12 @@ class AddressModelTests(TestCase):
 class CartModelTests(TestCase):
     """Test Cart model"""
 
-    def test_create_cart_with_user(self):
-        """Test a cart for the new user is created"""
+    def test_no_cart_with_new_user(self):
+        """Test a cart isn't created with the new user"""
         user = create_user()
         cart_exists = Cart.objects.filter(user=user).exists()
 
-        self.assertTrue(cart_exists)
+        self.assertFalse(cart_exists)
 
 
 class CartItemModelTests(TestCase):
@@ -131,7 +131,7 @@ class CartItemModelTests(TestCase):
 
     def setUp(self):
         user = create_user()
-        self.cart = Cart.objects.get(user=user)
+        self.cart = Cart.objects.create(user=user)
         category = create_category()
         self.prod = create_product(category)
 
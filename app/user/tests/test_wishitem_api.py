@@ -7,8 +7,9 @@ from .test_models import (
     create_category,
     create_product,
     create_wishitem,
+    create_cartitem,
 )
-from user.models import WishItem
+from user.models import Cart, CartItem, WishItem
 from user.serializers import (
     WishItemSerializer,
     WishItemExpandedSerializer,
@@ -16,6 +17,9 @@ from user.serializers import (
 
 
 WISH_ITEM_LIST_URL = reverse("user:wishitem-list")
+WISH_ITEM_BULK_ADD_URL = reverse("user:wishitem-bulk-add")
+WISH_ITEM_BULK_REMOVE_URL = reverse("user:wishitem-bulk-remove")
+WISH_ITEM_MOVE_TO_CART_URL = reverse("user:wishitem-move-to-cart")
 
 
 def get_wishitem_detail_url(wishitem_id):
@@ -133,3 +137,124 @@ class PrivateWishItemAPITests(TestCase):
         res = self.client.delete(url)
 
         self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+
+
+class BulkWishItemAPITests(TestCase):
+    """Test adding and removing many wish items at once"""
+
+    def setUp(self):
+        self.user = create_user()
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        category = create_category()
+        self.prod1 = create_product(category)
+        self.prod2 = create_product(category)
+
+    def test_bulk_add_wishitems(self):
+        """Test wishing many products skips already wished ones"""
+        create_wishitem(self.user, self.prod1)
+
+        payload = {"products": [self.prod1.id, self.prod2.id]}
+        # Products check and one insert
+        with self.assertNumQueries(2):
+            res = self.client.post(WISH_ITEM_BULK_ADD_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        wished_ids = self.user.wishitem_set.values_list("product", flat=True)
+        self.assertEqual(set(wished_ids), {self.prod1.id, self.prod2.id})
+
+    def test_bulk_add_missing_product_error(self):
+        """Test wishing nonexistent product returns error"""
+        payload = {"products": [self.prod1.id, 0]}
+        res = self.client.post(WISH_ITEM_BULK_ADD_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(WishItem.objects.exists())
+
+    def test_bulk_remove_wishitems(self):
+        """Test removing many products from the wishlist"""
+        other_user = create_user("other@example.com")
+        create_wishitem(other_user, self.prod1)
+        create_wishitem(self.user, self.prod1)
+        create_wishitem(self.user, self.prod2)
+
+        payload = {"products": [self.prod1.id]}
+        res = self.client.post(WISH_ITEM_BULK_REMOVE_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        wished_ids = self.user.wishitem_set.values_list("product", flat=True)
+        self.assertEqual(list(wished_ids), [self.prod2.id])
+        # Ensure other user's wishlist is untouched
+        self.assertTrue(other_user.wishitem_set.exists())
+
+
+class MoveWishItemsToCartAPITests(TestCase):
+    """Test moving wished products to the cart"""
+
+    def setUp(self):
+        self.user = create_user()
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        category = create_category()
+        self.prod1 = create_product(category)
+        self.prod2 = create_product(category)
+
+    def test_move_all_wishitems(self):
+        """Test moving all wished products creates the cart lines"""
+        create_wishitem(self.user, self.prod1)
+        create_wishitem(self.user, self.prod2)
+
+        res = self.client.post(WISH_ITEM_MOVE_TO_CART_URL, {}, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["moved"], [self.prod1.id, self.prod2.id])
+        self.assertEqual(res.data["skipped"], [])
+        cart = Cart.objects.get(user=self.user)
+        quantities = dict(cart.cartitem_set.values_list("product", "quantity"))
+        self.assertEqual(quantities, {self.prod1.id: 1, self.prod2.id: 1})
+        self.assertFalse(self.user.wishitem_set.exists())
+
+    def test_move_selected_wishitems(self):
+        """Test moving only given products"""
+        create_wishitem(self.user, self.prod1)
+        create_wishitem(self.user, self.prod2)
+
+        payload = {"products": [self.prod2.id]}
+        res = self.client.post(WISH_ITEM_MOVE_TO_CART_URL, payload, format="json")
+
+        self.assertEqual(res.data["moved"], [self.prod2.id])
+        wished_ids = self.user.wishitem_set.values_list("product", flat=True)
+        self.assertEqual(list(wished_ids), [self.prod1.id])
+
+    def test_move_increases_cart_quantity(self):
+        """Test product already in the cart gets increased quantity"""
+        cart = Cart.objects.create(user=self.user)
+        create_cartitem(cart, self.prod1, 2)
+        create_wishitem(self.user, self.prod1)
+
+        res = self.client.post(WISH_ITEM_MOVE_TO_CART_URL, {}, format="json")
+
+        self.assertEqual(res.data["moved"], [self.prod1.id])
+        cart_item = CartItem.objects.get(cart=cart, product=self.prod1)
+        self.assertEqual(cart_item.quantity, 3)
+
+    def test_move_out_of_stock_skipped(self):
+        """Test products without enough stock stay in the wishlist"""
+        self.prod1.stock = 0
+        self.prod1.save()
+        cart = Cart.objects.create(user=self.user)
+        self.prod2.stock = 1
+        self.prod2.save()
+        create_cartitem(cart, self.prod2, 1)
+        create_wishitem(self.user, self.prod1)
+        create_wishitem(self.user, self.prod2)
+
+        # Cart lookup, moving statement and two savepoint queries
+        with self.assertNumQueries(4):
+            res = self.client.post(WISH_ITEM_MOVE_TO_CART_URL, {}, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["moved"], [])
+        self.assertEqual(res.data["skipped"], [self.prod1.id, self.prod2.id])
+        self.assertEqual(self.user.wishitem_set.count(), 2)
+        self.assertFalse(CartItem.objects.filter(product=self.prod1).exists())
@@ -6,6 +6,7 @@ from .views import (
     ProfileImageAPIView,
     CartItemViewSet,
     WishItemViewSet,
+    GuestCartAPIView,
 )
 
 app_name = "user"
@@ -19,4 +20,5 @@ urlpatterns = [
     path("", include(router.urls)),
     path("me/", ProfileRUDView.as_view(), name="me"),
     path("me/upload-image/", ProfileImageAPIView.as_view(), name="upload-image"),
+    path("guest-cart/", GuestCartAPIView.as_view(), name="guest-cart"),
 ]
@@ -1,3 +1,5 @@
+from uuid import uuid4
+from django.db import transaction
 from django.contrib.auth import get_user_model
 from rest_framework import filters
 from rest_framework import viewsets, views
@@ -5,8 +7,13 @@ from rest_framework import generics
 from rest_framework import mixins
 from rest_framework import permissions
 from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
-from rest_framework.authentication import TokenAuthentication
+from authentication.backends import (
+    CachedTokenAuthentication,
+    SignedTokenAuthentication,
+)
 from drf_spectacular.utils import (
     extend_schema_view,
     extend_schema,
@@ -18,10 +25,35 @@ from .serializers import (
     UserImageSerializer,
     CartItemSerializer,
     CartItemExpandedSerializer,
+    CartSyncSerializer,
     WishItemSerializer,
     WishItemExpandedSerializer,
+    WishItemBulkSerializer,
+    WishItemMoveSerializer,
+    GuestCartItemSerializer,
+    GuestCartItemExpandedSerializer,
+)
+from .models import Cart, CartItem, WishItem
+from .cart_storage import (
+    get_guest_cart_storage,
+    get_guest_cart_key,
+    set_guest_cart_key,
 )
-from .models import Cart, WishItem
+from product.models import Product
+from core.views import CompiledListMixin, SparseFieldsMixin
+
+
+def get_full_user(request):
+    """
+    Return request user with all fields loaded. User authenticated by
+    signed token carries only id and staff flag, the rest of fields and
+    the address are loaded by one query
+    """
+    user = request.user
+    if not user.get_deferred_fields():
+        return user
+    queryset = get_user_model().objects.select_related("address")
+    return generics.get_object_or_404(queryset, pk=user.pk)
 
 
 @extend_schema_view(
@@ -36,6 +68,7 @@ from .models import Cart, WishItem
     )
 )
 class UserListRetrieveViewSet(
+    SparseFieldsMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
     viewsets.GenericViewSet,
@@ -43,7 +76,8 @@ class UserListRetrieveViewSet(
     """Manage User list and retrieve operations"""
 
     serializer_class = UserSerializer
-    queryset = get_user_model().objects.all().order_by("id")
+    # Address is output along with the user
+    queryset = get_user_model().objects.select_related("address").order_by("id")
     filter_backends = [filters.OrderingFilter]
     ordering_fields = ["created_at"]
 
@@ -52,23 +86,23 @@ class ProfileRUDView(generics.RetrieveUpdateDestroyAPIView):
     """Manage user profile retrieve, update, destroy operations"""
 
     permission_classes = [permissions.IsAuthenticated]
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [SignedTokenAuthentication, CachedTokenAuthentication]
     serializer_class = UserSerializer
 
     def get_object(self):
-        return self.request.user
+        return get_full_user(self.request)
 
 
 class ProfileImageAPIView(views.APIView):
     """Manage User profile image uploading"""
 
     permission_classes = [permissions.IsAuthenticated]
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [SignedTokenAuthentication, CachedTokenAuthentication]
     serializer_class = UserImageSerializer
 
     def post(self, request):
         image_serializer = self.serializer_class(
-            self.request.user,
+            get_full_user(request),
             request.data,
         )
         image_serializer.is_valid(raise_exception=True)
@@ -76,31 +110,69 @@ class ProfileImageAPIView(views.APIView):
         return Response(data=image_serializer.data, status=status.HTTP_200_OK)
 
 
-class CartItemViewSet(viewsets.ModelViewSet):
+class CartItemViewSet(SparseFieldsMixin, CompiledListMixin, viewsets.ModelViewSet):
     """Manage cart items"""
 
     permission_classes = [permissions.IsAuthenticated]
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [SignedTokenAuthentication, CachedTokenAuthentication]
     serializer_class = CartItemSerializer
 
-    # Limit cart items to user
+    # Limit cart items to user joining the cart instead of fetching it first
     def get_queryset(self):
-        cart = Cart.objects.get(user=self.request.user)
-        return cart.cartitem_set.all().order_by("id")
+        user_id = self.request.user.id
+        queryset = CartItem.objects.filter(cart__user_id=user_id).order_by("id")
+        # Load products along with cart items to expand them
+        if self.action in ["list", "retrieve", "sync"]:
+            return queryset.select_related("product")
+        return queryset
 
     def get_serializer_class(self):
         # Expand product data when list and retrieve actions
         if self.action in ["list", "retrieve"]:
             return CartItemExpandedSerializer
+        elif self.action == "sync":
+            return CartSyncSerializer
         return super().get_serializer_class()
 
     # Associate cart item with user's cart by default
     def perform_create(self, serializer):
-        cart = Cart.objects.get(user=self.request.user)
-        serializer.save(cart=cart)
+        serializer.save(cart_id=self.get_cart_id())
+
+    # Custom action to replace the whole cart content at once
+    @extend_schema(responses=CartItemExpandedSerializer(many=True))
+    @action(["put"], detail=False)
+    def sync(self, request):
+        """Make the cart content equal to the given {product_id: quantity} map"""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        with transaction.atomic():
+            CartItem.objects.sync(
+                self.get_cart_id(),
+                serializer.validated_data["items"],
+            )
+
+        cartitems_serializer = CartItemExpandedSerializer(
+            self.get_queryset(),
+            many=True,
+            context=self.get_serializer_context(),
+        )
+        return Response(cartitems_serializer.data, status.HTTP_200_OK)
+
+    def get_cart_id(self):
+        """
+        Return id of the user's cart, creating the cart on the first add.
+        Resolved once per request
+        """
+        if not hasattr(self, "_cart_id"):
+            cart, _ = Cart.objects.get_or_create(user=self.request.user)
+            self._cart_id = cart.id
+        return self._cart_id
 
 
 class WishItemViewSet(
+    SparseFieldsMixin,
+    CompiledListMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
@@ -110,20 +182,145 @@ class WishItemViewSet(
     """Manage whish items"""
 
     permission_classes = [permissions.IsAuthenticated]
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [SignedTokenAuthentication, CachedTokenAuthentication]
     serializer_class = WishItemSerializer
 
     # Limit wish items to user
     def get_queryset(self):
         user = self.request.user
-        return user.wishitem_set.all().order_by("id")
+        queryset = user.wishitem_set.all().order_by("id")
+        # Load products along with wish items to expand them
+        if self.action in ["list", "retrieve"]:
+            return queryset.select_related("product")
+        return queryset
 
     def get_serializer_class(self):
         # Expand product data when list and retrieve actions
         if self.action in ["list", "retrieve"]:
             return WishItemExpandedSerializer
+        elif self.action in ["bulk_add", "bulk_remove"]:
+            return WishItemBulkSerializer
+        elif self.action == "move_to_cart":
+            return WishItemMoveSerializer
         return super().get_serializer_class()
 
     # Associate the wish item with the user by default
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
+
+    # Custom action to wish many products with one query
+    @action(["post"], detail=False, url_path="bulk-add", url_name="bulk-add")
+    def bulk_add(self, request):
+        """Add products to the wishlist skipping already wished ones"""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        wishitems = [
+            WishItem(user=request.user, product_id=product_id)
+            for product_id in serializer.validated_data["products"]
+        ]
+        WishItem.objects.bulk_create(wishitems, ignore_conflicts=True)
+        return Response(serializer.data, status.HTTP_201_CREATED)
+
+    # Custom action to remove many products from wishlist with one query
+    @action(["post"], detail=False, url_path="bulk-remove", url_name="bulk-remove")
+    def bulk_remove(self, request):
+        """Remove products from the wishlist"""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        self.get_queryset().filter(
+            product__in=serializer.validated_data["products"],
+        ).delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    # Custom action to move wished products to the cart in one transaction
+    @action(["post"], detail=False, url_path="move-to-cart", url_name="move-to-cart")
+    def move_to_cart(self, request):
+        """
+        Move wished products to the cart. Products out of stock are
+        skipped and left in the wishlist
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        with transaction.atomic():
+            cart, _ = Cart.objects.get_or_create(user=request.user)
+            moved_ids, skipped_ids = CartItem.objects.move_from_wishlist(
+                cart.id,
+                request.user.id,
+                serializer.validated_data.get("products"),
+            )
+            if moved_ids:
+                self.get_queryset().filter(product__in=moved_ids).delete()
+
+        result_serializer = self.get_serializer(
+            {"moved": moved_ids, "skipped": skipped_ids},
+        )
+        return Response(result_serializer.data, status.HTTP_200_OK)
+
+
+class GuestCartAPIView(views.APIView):
+    """
+    Manage cart of unauthenticated user. Items are kept in the fast storage
+    under the key from signed cookie and moved to user's cart on login
+    """
+
+    permission_classes = [permissions.AllowAny]
+    authentication_classes = []
+    serializer_class = GuestCartItemSerializer
+
+    def get(self, request):
+        key = get_guest_cart_key(request)
+        return Response(self._get_cart_data(key))
+
+    def post(self, request):
+        serializer = self.serializer_class(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        # Start new guest cart if there is no one yet
+        key = get_guest_cart_key(request) or uuid4().hex
+        get_guest_cart_storage().add_item(
+            key,
+            serializer.validated_data["product"].id,
+            serializer.validated_data["quantity"],
+        )
+
+        response = Response(self._get_cart_data(key), status.HTTP_201_CREATED)
+        set_guest_cart_key(response, key)
+        return response
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "product",
+                OpenApiTypes.INT,
+                description="Product ID to remove. Whole cart is cleared if omitted",
+            ),
+        ]
+    )
+    def delete(self, request):
+        key = get_guest_cart_key(request)
+        product_id = request.query_params.get("product")
+        # Invalid ID must not clear the whole cart
+        if product_id is not None and not product_id.isdigit():
+            raise ValidationError({"product": ["A valid integer is required."]})
+
+        storage = get_guest_cart_storage()
+        if key and product_id is not None:
+            storage.remove_item(key, int(product_id))
+        elif key:
+            storage.clear(key)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    def _get_cart_data(self, key):
+        """Output cart items with all product data"""
+        items = get_guest_cart_storage().get_items(key) if key else {}
+        products = Product.objects.filter(id__in=items).order_by("id")
+        cartitems = [{"product": p, "quantity": items[p.id]} for p in products]
+        serializer = GuestCartItemExpandedSerializer(
+            cartitems,
+            many=True,
+            context={"request": self.request},
+        )
+        return serializer.data